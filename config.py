@@ -0,0 +1,104 @@
+import os
+
+"""
+Service Configuration
+
+Settings read from environment variables, with defaults suitable for running
+from a checkout of the repository.
+"""
+
+def _env_flag(name: str, default: bool = False) -> bool:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+def _env_number(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    return float(value) if value not in (None, "") else default
+
+# Directory holding the Swiss Ephemeris files
+EPHE_PATH = os.environ.get("VASTR_EPHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "ephe"))
+
+# Years the service must serve from the ephemeris files, and the body groups
+# (sun, moon, grahas) it needs them for; checked at startup
+EPHE_START_YEAR = int(_env_number("VASTR_EPHE_START_YEAR", 1800))
+EPHE_END_YEAR = int(_env_number("VASTR_EPHE_END_YEAR", 2399))
+EPHE_BODIES = tuple(body.strip().lower() for body in os.environ.get("VASTR_EPHE_BODIES", "sun,moon,grahas").split(",") if body.strip())
+
+# Refuse to start when the ephemeris files do not cover that range
+EPHE_STRICT = _env_flag("VASTR_EPHE_STRICT")
+
+# Load the ephemeris, timezone index and solvers at startup instead of on the
+# first request that needs them
+WARMUP = _env_flag("VASTR_WARMUP")
+
+# Shared cache for limb boundaries and sunrise/moonrise times: "memory"
+# (per process), "sqlite" (file shared by the processes on one host) or
+# "redis" (Redis-protocol server shared by all replicas)
+CACHE_BACKEND = os.environ.get("VASTR_CACHE_BACKEND", "memory").strip().lower()
+
+# SQLite file for the sqlite cache backend
+CACHE_PATH = os.environ.get("VASTR_CACHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache.sqlite3"))
+
+# Server URL for the redis cache backend
+CACHE_URL = os.environ.get("VASTR_CACHE_URL", "redis://localhost:6379/0")
+
+# File the in-process caches are snapshotted to (at shutdown and every
+# SNAPSHOT_INTERVAL seconds) and restored from at startup; unset or empty
+# disables snapshots, so tests, tools and read-only images write nothing
+SNAPSHOT_PATH = os.environ.get("VASTR_SNAPSHOT_PATH") or None
+
+# Seconds between periodic snapshots (0 = only at shutdown)
+SNAPSHOT_INTERVAL = _env_number("VASTR_SNAPSHOT_INTERVAL", 300.0)
+
+# Computations (ephemeris work) running at once; further requests queue
+MAX_CONCURRENCY = int(_env_number("VASTR_MAX_CONCURRENCY", os.cpu_count() or 4))
+
+# Requests allowed to wait for a computation slot; beyond this they get 503
+MAX_QUEUE = int(_env_number("VASTR_MAX_QUEUE", 64))
+
+# Longest wait (seconds) for a computation slot before a request gets 503
+QUEUE_TIMEOUT = _env_number("VASTR_QUEUE_TIMEOUT", 10.0)
+
+# Per-client request rate (requests/second, 0 = unlimited) and burst size
+RATE_LIMIT = _env_number("VASTR_RATE_LIMIT", 0.0)
+RATE_BURST = _env_number("VASTR_RATE_BURST", 10.0)
+
+# Header identifying clients for the rate limit (e.g. X-API-Key, or
+# X-Forwarded-For behind a proxy); the peer address when unset
+CLIENT_ID_HEADER = os.environ.get("VASTR_CLIENT_ID_HEADER") or None
+
+# Precomputed Sun/Moon longitude table (tools/build_series.py) used by the limb
+# solvers instead of Swiss Ephemeris inside its range; unset to disable
+SERIES_PATH = os.environ.get("VASTR_SERIES_PATH") or None
+
+# Window (microseconds) over which the Sun/Moon positions requested by
+# concurrent computations are collected and evaluated as one batch
+# (utils/batching.py); 0 disables batching
+EPHE_BATCH_WINDOW_US = _env_number("VASTR_EPHE_BATCH_WINDOW_US", 0.0)
+
+# Pending positions that dispatch a batch before the window ends
+EPHE_BATCH_MAX = int(_env_number("VASTR_EPHE_BATCH_MAX", 256))
+
+# Directory of read-only tables (Delta-T and leap seconds) shared by all
+# worker processes through memory-mapped files; empty to keep them private
+TABLES_DIR = os.environ.get("VASTR_TABLES_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "tables")) or None
+
+# Load the timezone polygon index (~55 MB) into each process instead of
+# reading it through the OS page cache shared by all processes
+TIMEZONE_IN_MEMORY = _env_flag("VASTR_TIMEZONE_IN_MEMORY")
+
+# Token that, sent in the X-Vastr-Profile header, profiles a request; the
+# header is ignored when unset
+PROFILE_TOKEN = os.environ.get("VASTR_PROFILE_TOKEN") or None
+
+# Fraction of all requests profiled (0 = only on request)
+PROFILE_SAMPLE_RATE = _env_number("VASTR_PROFILE_SAMPLE_RATE", 0.0)
+
+# Stack sampling interval for profiles, in milliseconds
+PROFILE_INTERVAL_MS = _env_number("VASTR_PROFILE_INTERVAL_MS", 1.0)
+
+# Directory the profiles are written to, and how many of the newest are kept
+PROFILE_DIR = os.environ.get("VASTR_PROFILE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles"))
+PROFILE_KEEP = int(_env_number("VASTR_PROFILE_KEEP", 100))
@@ -0,0 +1,234 @@
+from datetime import datetime
+import logging
+from typing import Dict, List, Optional, Tuple, Union
+import numpy as np
+import pytz
+from utils.astronomy import get_sun_moon_longitude_arrays, timestamps_to_jd, location_cell
+from utils.timezones import get_timezone_name
+from core.timeline import LIMBS, limb_transitions
+
+logger = logging.getLogger(__name__)
+
+"""
+Array API for Bulk Panchanga Classification
+
+Library interface for analytics code that imports vastr directly: arrays of
+instants (and optionally locations) in, structured NumPy arrays out, with
+no per-row dicts or strings. Sun/Moon longitudes are evaluated in batches
+(see get_sun_moon_longitude_arrays) and the limbs are classified with array
+arithmetic on them. Boundaries come from one forward-walked transition
+timeline per limb and run of nearby instants (see limb_transitions), looked
+up for all rows with np.searchsorted, so their cost scales with the time
+span covered rather than with the number of rows.
+
+Example:
+    from core.arrays import panchanga_array
+    rows = panchanga_array(df["timestamp"].to_numpy())
+    df["tithi"] = rows["tithi"]
+"""
+
+# Limbs classified, in field order
+ARRAY_LIMBS = ("tithi", "karana", "nakshatra", "yoga")
+
+# Fields of the structured result: limb numbers as in the calculate_*
+# functions (tithi 1-30, karana 1-11, nakshatra 1-27, yoga 1-27), vara as
+# datetime.weekday() (0 = Monday/Soma ... 6 = Sunday/Ravi), and the Julian
+# days (UT) each limb starts and ends (NaN without boundaries)
+PANCHANGA_DTYPE = np.dtype([("jd_ut", "f8"), ("vara", "i1")] + [
+    field for limb in ARRAY_LIMBS for field in ((limb, "i1"), (f"{limb}_start", "f8"), (f"{limb}_end", "f8"))
+])
+
+# Instants further apart than this (in days) get separate timelines, so
+# sparse instants do not walk the limbs across the gaps between them; it
+# exceeds the longest segment of any limb, so the timelines never overlap
+CLUSTER_GAP_DAYS = 2.0
+
+# Limb number for each segment index of the 360° cycle
+_NUMBERS = {limb: np.array([spec.number(index) for index in range(spec.segments)], dtype=np.int8)
+            for limb, spec in LIMBS.items()}
+
+
+def limb_indices(limb: str, sun_lon: np.ndarray, moon_lon: np.ndarray) -> np.ndarray:
+    """
+    Segment indices (0-based) of a limb for arrays of Sun/Moon longitudes.
+
+    Args:
+        limb (str): One of tithi, karana, nakshatra, yoga
+        sun_lon (np.ndarray): Sidereal Sun longitudes in degrees
+        moon_lon (np.ndarray): Sidereal Moon longitudes in degrees
+
+    Returns:
+        np.ndarray: Segment indices
+    """
+    spec = LIMBS[limb]
+    angle = spec.angle(np.asarray(sun_lon, dtype=float), np.asarray(moon_lon, dtype=float))
+    return (angle // spec.span).astype(np.int64) % spec.segments
+
+
+def classify_longitudes(sun_lon: np.ndarray, moon_lon: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Vectorised tithi, get_karana_number, get_nakshatra_number and
+    get_yoga_number for arrays of Sun/Moon longitudes.
+
+    Args:
+        sun_lon (np.ndarray): Sidereal Sun longitudes in degrees
+        moon_lon (np.ndarray): Sidereal Moon longitudes in degrees
+
+    Returns:
+        dict: Limb -> array of limb numbers (int8)
+    """
+    return {limb: _NUMBERS[limb][limb_indices(limb, sun_lon, moon_lon)] for limb in ARRAY_LIMBS}
+
+
+def _clusters(jds: np.ndarray) -> List[Tuple[float, float]]:
+    """First and last instant of each run of instants no more than CLUSTER_GAP_DAYS apart."""
+    jds = np.unique(jds)
+    breaks = np.flatnonzero(np.diff(jds) > CLUSTER_GAP_DAYS)
+    starts = np.concatenate(([0], breaks + 1))
+    ends = np.concatenate((breaks, [len(jds) - 1]))
+    return [(jds[start], jds[end]) for start, end in zip(starts.tolist(), ends.tolist())]
+
+
+def _limb_boundaries(limb: str, jds: np.ndarray, indices: np.ndarray, lat: float = 0.0, lon: float = 0.0,
+                     topocentric: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Start and end Julian days of the limb segments the instants fall in.
+
+    Args:
+        limb (str): One of tithi, karana, nakshatra, yoga
+        jds (np.ndarray): Julian days (UT)
+        indices (np.ndarray): Segment index of each instant (see limb_indices)
+        lat (float): Latitude (topocentric mode only)
+        lon (float): Longitude (topocentric mode only)
+        topocentric (bool): Use topocentric positions for the observer location
+
+    Returns:
+        tuple: Arrays (start, end) of Julian days (UT)
+    """
+    segments = [segment for first, last in _clusters(jds)
+                for segment in limb_transitions(limb, first, last, lat, lon, topocentric)]
+    starts = np.array([segment.start for segment in segments])
+    ends = np.array([segment.end for segment in segments])
+    segment_indices = np.array([segment.index for segment in segments])
+
+    position = np.clip(np.searchsorted(starts, jds, side="right") - 1, 0, len(segments) - 1)
+    # Within the solver tolerance of a boundary the classified index can be
+    # the neighbouring segment's; use that segment so the row is consistent
+    for step in (1, -1):
+        mismatch = segment_indices[position] != indices
+        neighbour = np.clip(position + step, 0, len(segments) - 1)
+        position = np.where(mismatch & (segment_indices[neighbour] == indices), neighbour, position)
+    return starts[position], ends[position]
+
+
+def _as_timestamps(timestamps: Union[np.ndarray, List]) -> np.ndarray:
+    """Unix timestamps (float seconds) from numbers or datetime64 values."""
+    values = np.asarray(timestamps)
+    if values.dtype.kind == "M":
+        if np.isnat(values).any():
+            raise ValueError("Timestamps must not be NaT")
+        return values.astype("datetime64[us]").astype(np.int64) / 1e6
+    values = values.astype(float)
+    if not np.isfinite(values).all():
+        raise ValueError("Timestamps must be finite")
+    return values
+
+
+def _weekdays(timestamps: np.ndarray, lat: Optional[np.ndarray], lon: Optional[np.ndarray], local_time: bool) -> np.ndarray:
+    """datetime.weekday() of the UTC date, or with local_time the location's local date."""
+    # 1970-01-01 was a Thursday (3)
+    if not local_time:
+        return ((np.floor(timestamps / 86400) + 3) % 7).astype(np.int8)
+    # UTC offsets are looked up per distinct location and UTC day, and per
+    # row only on days the offset changes (DST transitions)
+    offsets = np.empty(len(timestamps))
+    locations, location_rows = np.unique(np.column_stack((lat, lon)), axis=0, return_inverse=True)
+    zones = np.array([get_timezone_name(row_lat, row_lon) for row_lat, row_lon in locations.tolist()])[location_rows.ravel()]
+    for name in np.unique(zones).tolist():
+        tz = pytz.timezone(name)
+
+        def utc_offsets(values: np.ndarray) -> np.ndarray:
+            return np.array([datetime.fromtimestamp(ts, tz).utcoffset().total_seconds() for ts in values.tolist()])
+
+        rows = np.flatnonzero(zones == name)
+        days, day_rows = np.unique(np.floor(timestamps[rows] / 86400), return_inverse=True)
+        day_start, day_end = utc_offsets(days * 86400), utc_offsets(days * 86400 + 86399)
+        offsets[rows] = day_start[day_rows]
+        changing = rows[day_start[day_rows] != day_end[day_rows]]
+        offsets[changing] = utc_offsets(timestamps[changing])
+    return ((np.floor((timestamps + offsets) / 86400) + 3) % 7).astype(np.int8)
+
+
+def panchanga_array(timestamps: Union[np.ndarray, List], lat: Union[float, np.ndarray, None] = None,
+                    lon: Union[float, np.ndarray, None] = None, boundaries: bool = True,
+                    topocentric: bool = False, local_time: bool = False) -> np.ndarray:
+    """
+    Classify many instants into vara, tithi, karana, nakshatra and yoga.
+
+    Rows agree with compute_panchanga, which solves its boundaries on the
+    same limb timelines: limb numbers and vara exactly, start and end times
+    to within the solver tolerance (~0.01 s). Limbs are geocentric unless
+    topocentric is set, in which case they are computed at the centre of
+    each row's location cell, and vara follows the UTC date unless
+    local_time is set.
+
+    Args:
+        timestamps: Unix timestamps (float seconds of UTC) or datetime64 values
+        lat: Latitude per row, or one for all rows (topocentric and local_time only)
+        lon: Longitude per row, or one for all rows (topocentric and local_time only)
+        boundaries (bool): Also find when each limb starts and ends
+        topocentric (bool): Use topocentric Sun/Moon positions for the locations
+        local_time (bool): Take the vara from the local date at each location
+
+    Returns:
+        np.ndarray: Structured array of PANCHANGA_DTYPE, one row per timestamp
+
+    Raises:
+        ValueError: If a timestamp is not finite, or locations are missing or
+            do not match the timestamps
+    """
+    timestamps = _as_timestamps(timestamps).ravel()
+    n = len(timestamps)
+    if (topocentric or local_time) and (lat is None or lon is None):
+        raise ValueError("lat and lon are required for topocentric or local_time")
+    if lat is not None and lon is not None:
+        try:
+            lat, lon = (np.broadcast_to(np.asarray(value, dtype=float), (n,)) for value in (lat, lon))
+        except ValueError:
+            raise ValueError("lat and lon must be scalars or have one value per timestamp")
+        if (np.abs(lat) > 90).any() or (np.abs(lon) > 180).any():
+            raise ValueError("Latitude must be within ±90 and longitude within ±180")
+
+    result = np.zeros(n, dtype=PANCHANGA_DTYPE)
+    if not n:
+        return result
+    _, jd_ut = timestamps_to_jd(timestamps)
+    result["jd_ut"] = jd_ut
+    result["vara"] = _weekdays(timestamps, lat, lon, local_time)
+
+    # Geocentric limbs do not depend on the location, so all rows form one group
+    if topocentric:
+        locations, location_rows = np.unique(np.column_stack((lat, lon)), axis=0, return_inverse=True)
+        cells = np.array([location_cell(row_lat, row_lon) for row_lat, row_lon in locations.tolist()])
+        unique_cells, cell_of_location = np.unique(cells, axis=0, return_inverse=True)
+        group = cell_of_location.ravel()[location_rows.ravel()]
+        groups = [(tuple(cell), np.flatnonzero(group == i)) for i, cell in enumerate(unique_cells.tolist())]
+    else:
+        groups = [((0.0, 0.0), np.arange(n))]
+
+    for (cell_lat, cell_lon), rows in groups:
+        jds = jd_ut[rows]
+        sun_lon, _, moon_lon, _ = get_sun_moon_longitude_arrays(jds, cell_lat, cell_lon, topocentric)
+        for limb in ARRAY_LIMBS:
+            indices = limb_indices(limb, sun_lon, moon_lon)
+            result[limb][rows] = _NUMBERS[limb][indices]
+            if boundaries:
+                starts, ends = _limb_boundaries(limb, jds, indices, cell_lat, cell_lon, topocentric)
+                result[f"{limb}_start"][rows] = starts
+                result[f"{limb}_end"][rows] = ends
+            else:
+                result[f"{limb}_start"][rows] = np.nan
+                result[f"{limb}_end"][rows] = np.nan
+
+    logger.debug(f"Classified {n} instants in {len(groups)} location groups")
+    return result
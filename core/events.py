@@ -0,0 +1,107 @@
+import logging
+from typing import Iterable, List, Set, Union
+from core.timeline import LIMBS, Segment, limb_angle, solve_crossing
+
+logger = logging.getLogger(__name__)
+
+"""
+Limb Event Search
+
+Finds the next occurrences of given limb values (e.g. the next Ekadashi,
+Purnima or Pushya nakshatra) without stepping through days: from the current
+angle the search jumps straight to the target angle using the limb's mean
+motion, then refines each boundary with one root solve.
+"""
+
+# Most occurrences returned by one search
+MAX_OCCURRENCES = 100
+
+def resolve_targets(limb: str, targets: Iterable[Union[int, str]]) -> Set[int]:
+    """
+    Resolve target limb values given as numbers or names to limb numbers.
+
+    Names match case-insensitively and may select several numbers, e.g.
+    "Ekadashi" is tithi 11 and 26.
+
+    Args:
+        limb (str): One of tithi, karana, nakshatra, yoga
+        targets (Iterable): Limb numbers and/or names
+
+    Returns:
+        set: Limb numbers
+
+    Raises:
+        ValueError: If the limb or a target is unknown
+    """
+    if limb not in LIMBS:
+        raise ValueError(f"Unknown limb: {limb}. Allowed: {', '.join(LIMBS)}")
+    info = LIMBS[limb].info
+    numbers: Set[int] = set()
+    for target in targets:
+        if isinstance(target, int) or (isinstance(target, str) and target.isdigit()):
+            number = int(target)
+            if number not in info:
+                raise ValueError(f"Unknown {limb} number: {number}")
+            numbers.add(number)
+        else:
+            matches = {number for number, details in info.items() if details["name"].lower() == str(target).strip().lower()}
+            if not matches:
+                raise ValueError(f"Unknown {limb} name: {target}")
+            numbers |= matches
+    if not numbers:
+        raise ValueError("At least one target is required")
+    return numbers
+
+def find_next_occurrences(limb: str, numbers: Set[int], jd_start: float, count: int = 1,
+                          lat: float = 0.0, lon: float = 0.0, topocentric: bool = False) -> List[Segment]:
+    """
+    Find the next occurrences of the given limb numbers.
+
+    An occurrence already in progress at jd_start is included (its start
+    lies before jd_start). Each further occurrence costs two root solves,
+    one for its start and one for its end.
+
+    Args:
+        limb (str): One of tithi, karana, nakshatra, yoga
+        numbers (set): Limb numbers to look for
+        jd_start (float): Search start, Julian day (UT)
+        count (int): Number of occurrences to return
+        lat (float): Latitude (topocentric mode only)
+        lon (float): Longitude (topocentric mode only)
+        topocentric (bool): Use topocentric positions for the observer location
+
+    Returns:
+        list: Segments in chronological order
+    """
+    spec = LIMBS[limb]
+    indices = [index for index in range(spec.segments) if spec.number(index) in numbers]
+    cycle_days = 360 / spec.mean_motion
+
+    angle, _ = limb_angle(limb, jd_start, lat, lon, topocentric)
+    current = int(angle // spec.span) % spec.segments
+    occurrences: List[Segment] = []
+
+    if current in indices:
+        start = solve_crossing(limb, current * spec.span, jd_start - (angle - current * spec.span) / spec.mean_motion,
+                               lat, lon, topocentric)
+        end = solve_crossing(limb, (current + 1) * spec.span % 360, start + spec.span / spec.mean_motion, lat, lon, topocentric)
+        occurrences.append(Segment(start, end, current, spec.number(current)))
+        jd, angle = end, (current + 1) * spec.span % 360
+    else:
+        jd = jd_start
+
+    while len(occurrences) < count:
+        # Nearest target start ahead of the current angle
+        distances = [((index * spec.span - angle) % 360, index) for index in indices]
+        distance, index = min(distances)
+        target = index * spec.span
+        start = solve_crossing(limb, target, jd + distance / spec.mean_motion, lat, lon, topocentric)
+        if start < jd - 1e-6:
+            # Converged on the previous crossing of the same angle
+            start = solve_crossing(limb, target, start + cycle_days, lat, lon, topocentric)
+        end = solve_crossing(limb, (index + 1) * spec.span % 360, start + spec.span / spec.mean_motion, lat, lon, topocentric)
+        occurrences.append(Segment(start, end, index, spec.number(index)))
+        jd, angle = end, (index + 1) * spec.span % 360
+
+    logger.debug(f"Found {len(occurrences)} occurrences of {limb} {sorted(numbers)} from JD {jd_start}")
+    return occurrences
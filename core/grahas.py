@@ -0,0 +1,142 @@
+import logging
+from typing import Any, Dict, List, Optional
+import swisseph as swe
+from utils.astronomy import get_chart_positions
+from core.ingress import RASHI_INFO
+from core.nakshatra import NAKSHATRA_INFO, NAKSHATRA_SPAN
+
+logger = logging.getLogger(__name__)
+
+"""
+Graha Positions (Charts)
+
+Sidereal (Lahiri) positions of the nine grahas, the ascendant and the
+whole-sign house cusps with their sign, nakshatra and pada, for one or many
+instants at a location. Each instant is converted to a Julian day once and
+all bodies plus the houses are evaluated together (see get_chart_positions). Rahu is the mean lunar
+node and Ketu the point opposite it, so both come from one evaluation.
+"""
+
+# Grahas in traditional order
+GRAHAS = {
+    "Sun": swe.SUN,
+    "Moon": swe.MOON,
+    "Mars": swe.MARS,
+    "Mercury": swe.MERCURY,
+    "Jupiter": swe.JUPITER,
+    "Venus": swe.VENUS,
+    "Saturn": swe.SATURN,
+    "Rahu": swe.MEAN_NODE,
+    "Ketu": swe.MEAN_NODE
+}
+
+# House system of the returned cusps (see CHART_HOUSE_SYSTEM)
+HOUSE_SYSTEM = "whole_sign"
+
+# Most instants served by one chart request
+MAX_CHART_INSTANTS = 1000
+
+# Nakshatra quarter in degrees
+PADA_SPAN = NAKSHATRA_SPAN / 4
+
+def resolve_grahas(names: Optional[List[str]]) -> List[str]:
+    """
+    Normalise graha names (case-insensitive), keeping the traditional order.
+
+    Args:
+        names (list, optional): Graha names, all grahas when omitted
+
+    Returns:
+        list: Canonical names
+
+    Raises:
+        ValueError: If a name is unknown
+    """
+    if names is None:
+        return list(GRAHAS)
+    canonical = {name.lower(): name for name in GRAHAS}
+    unknown = [name for name in names if name.strip().lower() not in canonical]
+    if unknown:
+        raise ValueError(f"Unknown grahas: {', '.join(unknown)}. Allowed: {', '.join(GRAHAS)}")
+    wanted = {canonical[name.strip().lower()] for name in names}
+    return [name for name in GRAHAS if name in wanted]
+
+def zodiac_position(longitude: float) -> Dict[str, Any]:
+    """
+    Sign, nakshatra and pada of a sidereal longitude.
+
+    Args:
+        longitude (float): Sidereal longitude in degrees
+
+    Returns:
+        dict: longitude, sign (1-12) and sign_name, degree within the sign,
+            nakshatra (1-27) and nakshatra_name, pada (1-4)
+    """
+    longitude %= 360
+    sign = int(longitude // 30) % 12 + 1
+    nakshatra = int(longitude // NAKSHATRA_SPAN) % 27 + 1
+    return {
+        "longitude": longitude,
+        "sign": sign,
+        "sign_name": RASHI_INFO[sign]["name"],
+        "degree": longitude - (sign - 1) * 30,
+        "nakshatra": nakshatra,
+        "nakshatra_name": NAKSHATRA_INFO[nakshatra]["name"],
+        "pada": int((longitude % NAKSHATRA_SPAN) // PADA_SPAN) + 1
+    }
+
+def compute_chart(jd_ut: float, lat: float, lon: float, grahas: List[str], ascendant: bool = True) -> Dict[str, Any]:
+    """
+    Positions of the requested grahas, the ascendant and the houses at one instant.
+
+    Args:
+        jd_ut (float): Julian day (UT)
+        lat (float): Latitude
+        lon (float): Longitude
+        grahas (list): Canonical graha names (see resolve_grahas)
+        ascendant (bool): Whether to include the ascendant and houses
+
+    Returns:
+        dict: grahas (name -> position with latitude, speed and retrograde
+            flag), ascendant (position, or None) and houses (system and the
+            12 cusp positions, or None)
+    """
+    bodies = list(dict.fromkeys(GRAHAS[name] for name in grahas))
+    positions, lagna, cusps = get_chart_positions(jd_ut, bodies, lat if ascendant else None, lon if ascendant else None)
+    by_body = dict(zip(bodies, positions))
+
+    result: Dict[str, Any] = {}
+    for name in grahas:
+        longitude, latitude, speed = by_body[GRAHAS[name]]
+        if name == "Ketu":
+            longitude, latitude = longitude + 180, -latitude
+        result[name] = {**zodiac_position(longitude), "latitude": latitude, "speed": speed, "retrograde": speed < 0}
+    return {
+        "grahas": result,
+        "ascendant": zodiac_position(lagna) if lagna is not None else None,
+        "houses": {"system": HOUSE_SYSTEM, "cusps": [zodiac_position(cusp) for cusp in cusps]} if cusps is not None else None
+    }
+
+def compute_charts(jds: List[float], lat: float, lon: float, grahas: Optional[List[str]] = None, ascendant: bool = True) -> List[Dict[str, Any]]:
+    """
+    Charts for many instants at one location.
+
+    Args:
+        jds (list): Julian days (UT)
+        lat (float): Latitude
+        lon (float): Longitude
+        grahas (list, optional): Graha names, all when omitted
+        ascendant (bool): Whether to include the ascendant and houses
+
+    Returns:
+        list: One chart (see compute_chart) per instant, in order
+
+    Raises:
+        ValueError: If there are no or too many instants, or a graha is unknown
+    """
+    if not jds:
+        raise ValueError("At least one instant is required")
+    if len(jds) > MAX_CHART_INSTANTS:
+        raise ValueError(f"At most {MAX_CHART_INSTANTS} instants per request")
+    names = resolve_grahas(grahas)
+    return [compute_chart(jd, lat, lon, names, ascendant) for jd in jds]
@@ -0,0 +1,137 @@
+import logging
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Tuple
+import swisseph as swe
+from utils.astronomy import get_body_longitude
+from utils.profiling import solver_frame
+
+logger = logging.getLogger(__name__)
+
+"""
+Sign Ingress (Sankranti) Tables
+
+Instants when the Sun, the planets Mars to Saturn and the lunar nodes enter
+a new sidereal (Lahiri) sign. All ingresses of a body in a year are found in
+one daily sweep of its longitude, each sign change refined by bisection, and
+the resulting table is cached per (body, year), so repeat queries are
+lookups. Ingresses never change, so the cache needs no expiry.
+"""
+
+# Sidereal signs: number -> Sanskrit and English name
+RASHI_INFO = {
+    1: {"name": "Mesha", "english": "Aries"},
+    2: {"name": "Vrishabha", "english": "Taurus"},
+    3: {"name": "Mithuna", "english": "Gemini"},
+    4: {"name": "Karka", "english": "Cancer"},
+    5: {"name": "Simha", "english": "Leo"},
+    6: {"name": "Kanya", "english": "Virgo"},
+    7: {"name": "Tula", "english": "Libra"},
+    8: {"name": "Vrishchika", "english": "Scorpio"},
+    9: {"name": "Dhanu", "english": "Sagittarius"},
+    10: {"name": "Makara", "english": "Capricorn"},
+    11: {"name": "Kumbha", "english": "Aquarius"},
+    12: {"name": "Meena", "english": "Pisces"}
+}
+
+# Bodies with ingress tables. Rahu is the mean lunar node and Ketu the point
+# opposite it.
+INGRESS_BODIES = {
+    "Sun": swe.SUN,
+    "Mars": swe.MARS,
+    "Mercury": swe.MERCURY,
+    "Jupiter": swe.JUPITER,
+    "Venus": swe.VENUS,
+    "Saturn": swe.SATURN,
+    "Rahu": swe.MEAN_NODE,
+    "Ketu": swe.MEAN_NODE
+}
+
+# Sweep step in days; short enough that no body can leave a sign and
+# return within one step (Mercury, the fastest, moves < 2.3°/day)
+SWEEP_STEP = 1.0
+
+# Refine each ingress to this many days (~0.1 s)
+INGRESS_TOLERANCE = 1e-6
+
+# Years served by the ingress tables
+MIN_YEAR = 1800
+MAX_YEAR = 2399
+
+
+class Ingress(NamedTuple):
+    jd: float  # Julian day (UT) of the sign change
+    sign: int  # Sign entered (1-12)
+    previous: int  # Sign left (1-12)
+    retrograde: bool  # Entered moving backwards
+
+
+def _longitude(jd: float, body: str) -> Tuple[float, float]:
+    lon, speed = get_body_longitude(jd, INGRESS_BODIES[body])
+    if body == "Ketu":
+        lon = (lon + 180) % 360
+    return lon, speed
+
+def _sign(lon: float) -> int:
+    return int(lon // 30) % 12 + 1
+
+@solver_frame(limb_arg="body")
+def _refine(body: str, jd_before: float, jd_after: float, sign_before: int) -> float:
+    """Bisect the sign change between two instants down to INGRESS_TOLERANCE."""
+    while jd_after - jd_before > INGRESS_TOLERANCE:
+        middle = (jd_before + jd_after) / 2
+        if _sign(_longitude(middle, body)[0]) == sign_before:
+            jd_before = middle
+        else:
+            jd_after = middle
+    return jd_after
+
+@lru_cache(maxsize=1024)
+def ingress_table(body: str, year: int) -> Tuple[Ingress, ...]:
+    """
+    All sign ingresses of a body during a (UTC) calendar year.
+
+    Args:
+        body (str): One of INGRESS_BODIES
+        year (int): Gregorian year between MIN_YEAR and MAX_YEAR
+
+    Returns:
+        tuple: Ingresses in chronological order
+
+    Raises:
+        ValueError: If the body or year is not supported
+    """
+    if body not in INGRESS_BODIES:
+        raise ValueError(f"Unknown body: {body}. Allowed: {', '.join(INGRESS_BODIES)}")
+    if not MIN_YEAR <= year <= MAX_YEAR:
+        raise ValueError(f"Year must be between {MIN_YEAR} and {MAX_YEAR}")
+
+    jd = swe.julday(year, 1, 1, 0.0)
+    jd_end = swe.julday(year + 1, 1, 1, 0.0)
+    sign = _sign(_longitude(jd, body)[0])
+    ingresses: List[Ingress] = []
+    while jd < jd_end:
+        jd_next = min(jd + SWEEP_STEP, jd_end)
+        lon, _ = _longitude(jd_next, body)
+        next_sign = _sign(lon)
+        if next_sign != sign:
+            jd_ingress = _refine(body, jd, jd_next, sign)
+            _, speed = _longitude(jd_ingress, body)
+            ingresses.append(Ingress(jd_ingress, next_sign, sign, speed < 0))
+            sign = next_sign
+        jd = jd_next
+
+    logger.debug(f"Solved {len(ingresses)} {body} ingresses for {year}")
+    return tuple(ingresses)
+
+def ingresses_for_year(year: int, bodies: List[str]) -> Dict[str, Tuple[Ingress, ...]]:
+    """
+    Ingress tables for several bodies in one year.
+
+    Args:
+        year (int): Gregorian year
+        bodies (list): Names from INGRESS_BODIES
+
+    Returns:
+        dict: Body name -> ingresses in chronological order
+    """
+    return {body: ingress_table(body, year) for body in bodies}
@@ -1,8 +1,9 @@
 from datetime import datetime, timedelta, timezone
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from utils.astronomy import get_sun_moon_positions, datetime_to_jd, jd_to_datetime
 from core.tithi import calculate_tithi
+from utils.profiling import solver_frame
 
 logger = logging.getLogger(__name__)
 
@@ -92,7 +93,8 @@ KARANA_DEGREE_MAP = {
     (30, True): (10, 354, 360),  # Naga (Amavasya)
 }
 
-def find_karana_boundary(dt: datetime, lat: float, lon: float, target_diff: float) -> datetime:
+@solver_frame("karana", iteration="iteration")
+def find_karana_boundary(dt: datetime, lat: float, lon: float, target_diff: float, topocentric: bool = False) -> datetime:
     """Find the exact time when Moon-Sun longitude difference equals target_diff.
     
     Args:
@@ -100,6 +102,7 @@ def find_karana_boundary(dt: datetime, lat: float, lon: float, target_diff: floa
         lat (float): Latitude
         lon (float): Longitude
         target_diff (float): Target Moon-Sun longitude difference in degrees
+        topocentric (bool): Use topocentric positions for the observer location
         
     Returns:
         datetime: Time when Moon-Sun difference equals target_diff
@@ -107,7 +110,7 @@ def find_karana_boundary(dt: datetime, lat: float, lon: float, target_diff: floa
     jd_et, _ = datetime_to_jd(dt)
     
     # Get current difference to determine search direction
-    sun_pos, moon_pos = get_sun_moon_positions(dt, lat, lon)
+    sun_pos, moon_pos = get_sun_moon_positions(dt, lat, lon, topocentric)
     current_diff = (moon_pos["longitude"] - sun_pos["longitude"]) % 360
     
     # Determine search window based on current position
@@ -126,11 +129,11 @@ def find_karana_boundary(dt: datetime, lat: float, lon: float, target_diff: floa
         left = jd_et - search_window
         right = jd_et
     
-    for _ in range(32):
+    for iteration in range(32):
         mid = (left + right) / 2
         mid_dt = jd_to_datetime(mid)
         
-        sun_pos, moon_pos = get_sun_moon_positions(mid_dt, lat, lon)
+        sun_pos, moon_pos = get_sun_moon_positions(mid_dt, lat, lon, topocentric)
         current_diff = (moon_pos["longitude"] - sun_pos["longitude"]) % 360
         
         if abs(current_diff - target_diff) < 1e-8:
@@ -169,13 +172,18 @@ def get_karana_number(moon_sun_diff: float, tithi_number: int) -> int:
     
     return karana_number
 
-def calculate_karana(dt: datetime, lat: float, lon: float) -> dict:
+def calculate_karana(dt: datetime, lat: float, lon: float, positions: Optional[tuple] = None, boundaries: bool = True, topocentric: bool = False, tithi: Optional[dict] = None) -> dict:
     """Calculate karana for given datetime and location.
     
     Args:
         dt (datetime): Input datetime (UTC)
         lat (float): Latitude
         lon (float): Longitude
+        positions (tuple, optional): Precomputed (sun_pos, moon_pos) for dt
+        boundaries (bool): Whether to search for start/end times
+        topocentric (bool): Use topocentric positions for the observer location
+        tithi (dict, optional): Already calculated tithi for dt, reused instead
+            of solving the tithi boundaries a second time
         
     Returns:
         dict: Karana information including number, name, favorable (Favorable/Unfavorable), and boundaries
@@ -188,27 +196,39 @@ def calculate_karana(dt: datetime, lat: float, lon: float) -> dict:
             dt = dt.astimezone(timezone.utc)
         
         # Get current Moon-Sun longitude difference
-        sun_pos, moon_pos = get_sun_moon_positions(dt, lat, lon)
+        sun_pos, moon_pos = positions or get_sun_moon_positions(dt, lat, lon, topocentric)
         moon_sun_diff = (moon_pos["longitude"] - sun_pos["longitude"]) % 360
         
         # Get tithi information
-        tithi_info = calculate_tithi(dt, lat, lon)
+        tithi_info = tithi
+        if tithi_info is None or (boundaries and tithi_info["start"] is None):
+            tithi_info = calculate_tithi(dt, lat, lon, positions=(sun_pos, moon_pos), boundaries=boundaries, topocentric=topocentric)
         tithi_number = tithi_info["number"]
-        tithi_start = datetime.strptime(tithi_info["start"], "%Y-%m-%dT%H:%M:%S.%f+00:00").replace(tzinfo=timezone.utc)
-        tithi_end = datetime.strptime(tithi_info["end"], "%Y-%m-%dT%H:%M:%S.%f+00:00").replace(tzinfo=timezone.utc)
         
         # Get karana number and info
         karana_num = get_karana_number(moon_sun_diff, tithi_number)
         karana_info = KARANA_INFO[karana_num]
         
+        if not boundaries:
+            return {
+                "number": karana_num,
+                "name": karana_info["name"],
+                "favorable": karana_info["favorable"],
+                "start": None,
+                "end": None
+            }
+        
+        tithi_start = datetime.strptime(tithi_info["start"], "%Y-%m-%dT%H:%M:%S.%f+00:00").replace(tzinfo=timezone.utc)
+        tithi_end = datetime.strptime(tithi_info["end"], "%Y-%m-%dT%H:%M:%S.%f+00:00").replace(tzinfo=timezone.utc)
+        
         # Calculate exact karana boundaries based on astronomical positions
         if moon_sun_diff % 12 < 6:  # First half of tithi
             start_time = tithi_start
             # Find exact time when moon-sun difference crosses 6°
-            end_time = find_karana_boundary(dt, lat, lon, (int(moon_sun_diff / 12) * 12) + 6)
+            end_time = find_karana_boundary(dt, lat, lon, (int(moon_sun_diff / 12) * 12) + 6, topocentric)
         else:  # Second half of tithi
             # Find exact time when moon-sun difference crosses 6°
-            start_time = find_karana_boundary(dt, lat, lon, (int(moon_sun_diff / 12) * 12) + 6)
+            start_time = find_karana_boundary(dt, lat, lon, (int(moon_sun_diff / 12) * 12) + 6, topocentric)
             end_time = tithi_end
         
         result = {
@@ -0,0 +1,237 @@
+import logging
+from functools import lru_cache
+from typing import Any, Dict, NamedTuple, Optional, Union
+from utils.astronomy import get_sun_moon_longitudes, jd_to_datetime
+from core.events import resolve_targets
+from core.timeline import LIMBS, limb_angle, solve_crossing
+
+logger = logging.getLogger(__name__)
+
+"""
+Lunar Months (Masa) and Lunisolar Dates
+
+Amanta lunar months (new moon to new moon) named after the sidereal sign the
+Sun is in when they begin, with adhika (intercalary) month detection, paksha
+and the Vikram/Shaka samvat years, plus conversion between Gregorian instants
+and lunisolar dates in both directions.
+
+New moons are indexed by lunation number (0 = the first new moon after
+J2000) and each is solved once and cached, so finding the lunation of any
+instant is an index estimate from the mean synodic month plus at most a
+step or two, and converting a lunisolar date back costs one tithi solve.
+"""
+
+# Mean synodic month in days
+SYNODIC_MONTH = 29.530588853
+
+# Julian day (UT) of the new moon of 6 January 2000, lunation 0
+NEW_MOON_EPOCH = 2451550.26
+
+# Lunar months in order, Chaitra = 1
+MASA_NAMES = {
+    1: "Chaitra",
+    2: "Vaishakha",
+    3: "Jyeshtha",
+    4: "Ashadha",
+    5: "Shravana",
+    6: "Bhadrapada",
+    7: "Ashwin",
+    8: "Kartika",
+    9: "Margashirsha",
+    10: "Pausha",
+    11: "Magha",
+    12: "Phalguna"
+}
+
+# Samvat years relative to the Gregorian year in which Chaitra begins
+VIKRAM_OFFSET = 57
+SHAKA_OFFSET = -78
+
+
+class LunarMonth(NamedTuple):
+    lunation: int  # Lunation number since NEW_MOON_EPOCH
+    start: float  # Julian day (UT) of the starting new moon
+    end: float  # Julian day (UT) of the next new moon
+    masa: int  # 1 (Chaitra) - 12 (Phalguna)
+    adhika: bool  # Intercalary month: no solar ingress between its new moons
+    vikram_samvat: int
+    shaka_samvat: int
+
+
+@lru_cache(maxsize=4096)
+def new_moon(lunation: int) -> float:
+    """
+    Julian day (UT) of a new moon (Moon-Sun elongation 0°).
+
+    Args:
+        lunation (int): Lunation number, 0 = the first new moon after J2000
+
+    Returns:
+        float: Julian day (UT)
+    """
+    return solve_crossing("tithi", 0.0, NEW_MOON_EPOCH + lunation * SYNODIC_MONTH)
+
+def lunation_at(jd_ut: float) -> int:
+    """
+    Number of the lunation (new moon to new moon) containing an instant.
+
+    Args:
+        jd_ut (float): Julian day (UT)
+
+    Returns:
+        int: Lunation number
+    """
+    # The mean estimate is at most ~half a day off the true new moon
+    lunation = int((jd_ut - NEW_MOON_EPOCH) // SYNODIC_MONTH)
+    while new_moon(lunation) > jd_ut:
+        lunation -= 1
+    while new_moon(lunation + 1) <= jd_ut:
+        lunation += 1
+    return lunation
+
+def _sun_sign(jd_ut: float) -> int:
+    """Sidereal sign of the Sun, 0 (Mesha) - 11 (Meena)."""
+    return int(get_sun_moon_longitudes(jd_ut)[0] // 30) % 12
+
+@lru_cache(maxsize=4096)
+def lunar_month(lunation: int) -> LunarMonth:
+    """
+    Name and year of an amanta lunar month.
+
+    A month takes its name from the sign the Sun occupies at its starting new
+    moon (Sun in Meena begins Chaitra). When the Sun does not change sign
+    before the next new moon the month is adhika and shares its name with the
+    following (nija) month.
+
+    Args:
+        lunation (int): Lunation number
+
+    Returns:
+        LunarMonth: The month's span, name, adhika flag and samvat years
+    """
+    start, end = new_moon(lunation), new_moon(lunation + 1)
+    sign = _sun_sign(start)
+    masa = (sign + 1) % 12 + 1
+    adhika = _sun_sign(end) == sign
+    # Chaitra begins in March or April, so stepping back to it by mean months
+    # lands in the right Gregorian year even across an adhika month
+    year = jd_to_datetime(start - (masa - 1) * SYNODIC_MONTH).year
+    return LunarMonth(lunation, start, end, masa, adhika, year + VIKRAM_OFFSET, year + SHAKA_OFFSET)
+
+def resolve_masa(value: Union[int, str]) -> int:
+    """
+    Resolve a masa given as a number (1-12) or name to its number.
+
+    Raises:
+        ValueError: If the masa is unknown
+    """
+    if isinstance(value, int) or str(value).isdigit():
+        if int(value) in MASA_NAMES:
+            return int(value)
+    else:
+        for number, name in MASA_NAMES.items():
+            if name.lower() == str(value).strip().lower():
+                return number
+    raise ValueError(f"Unknown masa: {value}")
+
+def lunar_date(jd_ut: float) -> Dict[str, Any]:
+    """
+    Lunisolar date of an instant: masa, paksha, tithi and samvat years.
+
+    Args:
+        jd_ut (float): Julian day (UT)
+
+    Returns:
+        dict: masa number and name, adhika flag, paksha, tithi number and name,
+            Vikram and Shaka samvat, and the month's start/end (Julian days)
+    """
+    month = lunar_month(lunation_at(jd_ut))
+    angle, _ = limb_angle("tithi", jd_ut)
+    tithi = int(angle // LIMBS["tithi"].span) % 30 + 1
+    return {
+        "masa": month.masa,
+        "name": MASA_NAMES[month.masa],
+        "adhika": month.adhika,
+        "paksha": "Shukla" if tithi <= 15 else "Krishna",
+        "tithi": tithi,
+        "tithi_name": LIMBS["tithi"].info[tithi]["name"],
+        "vikram_samvat": month.vikram_samvat,
+        "shaka_samvat": month.shaka_samvat,
+        "start": month.start,
+        "end": month.end
+    }
+
+def find_lunar_month(vikram_samvat: int, masa: int, adhika: bool = False) -> LunarMonth:
+    """
+    Find the lunar month with a given name in a Vikram samvat year.
+
+    Args:
+        vikram_samvat (int): Vikram samvat year
+        masa (int): 1 (Chaitra) - 12 (Phalguna)
+        adhika (bool): Whether the intercalary month of that name is wanted
+
+    Returns:
+        LunarMonth: The matching month
+
+    Raises:
+        ValueError: If the year has no such month (e.g. no adhika month of that name)
+    """
+    # Mid-March of the year Chaitra begins in, advanced by mean months
+    year = vikram_samvat - VIKRAM_OFFSET
+    guess = (year - 2000) * 365.2425 + 74 + (masa - 1) * SYNODIC_MONTH + 2451544.5
+    around = lunation_at(guess)
+    for lunation in range(around - 2, around + 3):
+        month = lunar_month(lunation)
+        if month.masa == masa and month.adhika == adhika and month.vikram_samvat == vikram_samvat:
+            return month
+    kind = "Adhika " if adhika else ""
+    raise ValueError(f"No {kind}{MASA_NAMES[masa]} in Vikram samvat {vikram_samvat}")
+
+def gregorian_date(vikram_samvat: int, masa: Union[int, str], tithi: Union[int, str],
+                   paksha: Optional[str] = None, adhika: bool = False) -> Dict[str, Any]:
+    """
+    Convert a lunisolar date to the span of its tithi.
+
+    Args:
+        vikram_samvat (int): Vikram samvat year
+        masa (int or str): Masa number (1-12) or name
+        tithi (int or str): Tithi number (1-30, or 1-15 within the paksha) or name
+        paksha (str, optional): "Shukla" or "Krishna"; needed for tithi 1-15 given
+            within the Krishna paksha and for names shared by both pakshas
+        adhika (bool): Whether the date is in the adhika month of that name
+
+    Returns:
+        dict: tithi number and name with its start/end (Julian days) and the month
+
+    Raises:
+        ValueError: If the date does not exist or the input is ambiguous
+    """
+    month = find_lunar_month(vikram_samvat, resolve_masa(masa), adhika)
+
+    candidates = resolve_targets("tithi", [tithi])
+    if paksha is not None:
+        if paksha.strip().lower() not in ("shukla", "krishna"):
+            raise ValueError(f"Unknown paksha: {paksha}")
+        krishna = paksha.strip().lower() == "krishna"
+        # Numbers 1-15 count within the paksha; names already select their paksha
+        if krishna and (isinstance(tithi, int) or (isinstance(tithi, str) and tithi.isdigit())):
+            candidates = {number + 15 if number <= 15 else number for number in candidates}
+        candidates = {number for number in candidates if (number > 15) == krishna}
+        if not candidates:
+            raise ValueError(f"Tithi {tithi} is not in the {paksha.strip().capitalize()} paksha")
+    if len(candidates) != 1:
+        raise ValueError(f"Tithi {tithi} is ambiguous without a valid paksha")
+    number = candidates.pop()
+
+    spec = LIMBS["tithi"]
+    start_angle = (number - 1) * spec.span
+    start = solve_crossing("tithi", start_angle, month.start + start_angle / spec.mean_motion)
+    end = solve_crossing("tithi", number * spec.span % 360, start + spec.span / spec.mean_motion)
+    return {
+        "tithi": number,
+        "tithi_name": spec.info[number]["name"],
+        "paksha": "Shukla" if number <= 15 else "Krishna",
+        "start": start,
+        "end": end,
+        "month": month
+    }
@@ -0,0 +1,59 @@
+from datetime import date, timedelta, tzinfo
+import logging
+from typing import Any, Dict, Iterator, List, Optional
+from utils.astronomy import get_moon_day_series, jd_to_iso
+from utils.timezones import get_timezone
+
+logger = logging.getLogger(__name__)
+
+"""
+Moonrise and Moonset
+
+Moonrise and moonset per local day for a location and date range. The Moon
+rises about 50 minutes later each day, so some days have no moonrise or no
+moonset at all; those are reported as null rather than borrowed from a
+neighbouring day.
+"""
+
+# Longest date range served by one moon times request
+MAX_MOON_DAYS = 366
+
+def moon_times(moonrise: Optional[float], moonset: Optional[float], tz: Optional[tzinfo] = None) -> Dict[str, Optional[str]]:
+    """Format a (moonrise, moonset) pair of Julian days as ISO timestamps."""
+    return {
+        "moonrise": jd_to_iso(moonrise, tz) if moonrise is not None else None,
+        "moonset": jd_to_iso(moonset, tz) if moonset is not None else None
+    }
+
+def generate_moon_times(start: date, end: date, lat: float, lon: float, local_time: bool = False) -> Iterator[Dict[str, Any]]:
+    """
+    Moonrise and moonset for a location over a date range.
+
+    Args:
+        start (date): First local calendar date
+        end (date): Last local calendar date (inclusive)
+        lat (float): Latitude
+        lon (float): Longitude
+        local_time (bool): Use the location's timezone for the local days and
+            output timestamps instead of local mean time and UTC
+
+    Returns:
+        Iterator[dict]: One row per day with date, moonrise and moonset
+
+    Raises:
+        ValueError: If the date range is empty or too long
+    """
+    days = (end - start).days + 1
+    if days < 1:
+        raise ValueError("End date must not be before start date")
+    if days > MAX_MOON_DAYS:
+        raise ValueError(f"Date range must not exceed {MAX_MOON_DAYS} days")
+
+    tz = get_timezone(lat, lon) if local_time else None
+    series = get_moon_day_series(start, days, lat, lon, tz)
+    return _moon_rows(start, series, tz)
+
+def _moon_rows(start: date, series: List[tuple], tz: Optional[tzinfo]) -> Iterator[Dict[str, Any]]:
+    """Format moon time rows one day at a time from a precomputed series."""
+    for offset, (moonrise, moonset) in enumerate(series):
+        yield {"date": (start + timedelta(days=offset)).isoformat(), **moon_times(moonrise, moonset, tz)}
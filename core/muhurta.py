@@ -0,0 +1,158 @@
+from datetime import date, datetime, timedelta, tzinfo
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Set, Union
+from utils.astronomy import get_daylight_intervals, local_midnight_jd, location_cell, jd_to_iso
+from utils.intervals import Interval, complement, intersect, merge
+from utils.timezones import get_timezone
+from core.events import resolve_targets
+from core.timeline import LIMBS, Segment, limb_transitions
+from core.vara import VARA_INFO, calculate_vara
+
+logger = logging.getLogger(__name__)
+
+"""
+Muhurta Search
+
+Finds the time windows in a date range where several conditions hold at
+once: limb values (tithi, nakshatra, yoga, karana), weekday and day/night.
+Each condition becomes a sorted list of intervals built once for the whole
+range (one limb timeline, one sunrise/sunset sweep), and the windows are
+their intersection, so the cost grows with the number of transitions rather
+than with any time resolution.
+"""
+
+# Conditions that can be filtered on, besides daylight
+MUHURTA_LIMBS = ("tithi", "nakshatra", "yoga", "karana", "vara")
+
+# Longest date range served by one search
+MAX_MUHURTA_DAYS = 366
+
+# Values of the daylight condition
+DAYLIGHT_VALUES = ("day", "night")
+
+def _vara_targets(targets: Iterable[Union[int, str]]) -> Set[str]:
+    """Resolve vara names (Sanskrit or English) to VARA_INFO keys."""
+    varas: Set[str] = set()
+    for target in targets:
+        name = str(target).strip().lower()
+        matches = {vara for vara, info in VARA_INFO.items() if name in (vara.lower(), info["name"].lower())}
+        if not matches:
+            raise ValueError(f"Unknown vara: {target}")
+        varas |= matches
+    return varas
+
+def allowed_values(limb: str, include: Optional[Iterable[Union[int, str]]] = None,
+                   exclude: Optional[Iterable[Union[int, str]]] = None,
+                   favorable: Optional[Iterable[str]] = None) -> Set[Union[int, str]]:
+    """
+    Resolve a limb filter to the set of limb values it allows.
+
+    Args:
+        limb (str): One of MUHURTA_LIMBS
+        include (Iterable, optional): Allowed numbers/names, all when omitted
+        exclude (Iterable, optional): Numbers/names to rule out
+        favorable (Iterable, optional): Allowed `favorable` ratings,
+            e.g. ["Favorable", "Neutral"]
+
+    Returns:
+        set: Allowed limb numbers (vara names for vara)
+
+    Raises:
+        ValueError: If the limb or a value is unknown
+    """
+    if limb == "vara":
+        info = VARA_INFO
+        resolve = _vara_targets
+    elif limb in LIMBS:
+        info = LIMBS[limb].info
+        resolve = lambda targets: resolve_targets(limb, targets)
+    else:
+        raise ValueError(f"Unknown limb: {limb}. Allowed: {', '.join(MUHURTA_LIMBS)}")
+
+    allowed = set(resolve(include)) if include else set(info)
+    if exclude:
+        allowed -= resolve(exclude)
+    if favorable:
+        ratings = {rating.strip().lower() for rating in favorable}
+        allowed = {value for value in allowed if info[value]["favorable"].lower() in ratings}
+    return allowed
+
+def limb_intervals(segments: List[Segment], allowed: Set[int]) -> List[Interval]:
+    """Merged intervals of the timeline segments whose limb number is allowed."""
+    return merge((segment.start, segment.end) for segment in segments if segment.number in allowed)
+
+def vara_intervals(start: date, days: int, lon: float, tz: Optional[tzinfo], allowed: Set[str]) -> List[Interval]:
+    """Merged intervals of the local civil days whose vara is allowed."""
+    intervals = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        if calculate_vara(datetime(day.year, day.month, day.day))["vara"] in allowed:
+            intervals.append((local_midnight_jd(day, lon, tz), local_midnight_jd(day + timedelta(days=1), lon, tz)))
+    return merge(intervals)
+
+def find_muhurtas(start: date, end: date, lat: float, lon: float, filters: Dict[str, Set[Union[int, str]]],
+                  daylight: Optional[str] = None, min_minutes: float = 0, topocentric: bool = False,
+                  local_time: bool = False) -> List[Dict[str, Any]]:
+    """
+    Find the windows in a date range where all conditions hold.
+
+    Args:
+        start (date): First local calendar date
+        end (date): Last local calendar date (inclusive)
+        lat (float): Latitude
+        lon (float): Longitude
+        filters (dict): Allowed values per limb of MUHURTA_LIMBS (see allowed_values);
+            limbs without a filter are unrestricted
+        daylight (str, optional): "day" (sunrise to sunset) or "night" (sunset to sunrise)
+        min_minutes (float): Drop windows shorter than this
+        topocentric (bool): Use topocentric positions for the observer location
+        local_time (bool): Use the location's timezone for the local days and
+            output timestamps instead of local mean time and UTC
+
+    Returns:
+        list: Windows in chronological order, each with start, end and duration_minutes
+
+    Raises:
+        ValueError: If the date range or a condition is invalid
+    """
+    days = (end - start).days + 1
+    if days < 1:
+        raise ValueError("End date must not be before start date")
+    if days > MAX_MUHURTA_DAYS:
+        raise ValueError(f"Date range must not exceed {MAX_MUHURTA_DAYS} days")
+    if daylight is not None and daylight not in DAYLIGHT_VALUES:
+        raise ValueError(f"Daylight must be one of {', '.join(DAYLIGHT_VALUES)}")
+
+    tz = get_timezone(lat, lon) if local_time else None
+    jd_first = local_midnight_jd(start, lon, tz)
+    jd_last = local_midnight_jd(end + timedelta(days=1), lon, tz)
+    # Topocentric limbs are evaluated at the location cell centre, as in compute_panchanga
+    limb_lat, limb_lon = location_cell(lat, lon) if topocentric else (lat, lon)
+
+    windows: List[Interval] = [(jd_first, jd_last)]
+    for limb, allowed in filters.items():
+        if limb == "vara":
+            intervals = vara_intervals(start, days, lon, tz, allowed)
+        else:
+            segments = limb_transitions(limb, jd_first, jd_last, limb_lat, limb_lon, topocentric)
+            intervals = limb_intervals(segments, allowed)
+        windows = intersect(windows, intervals)
+        if not windows:
+            break
+
+    if windows and daylight is not None:
+        days_lit = get_daylight_intervals(jd_first, jd_last, lat, lon)
+        lit = days_lit if daylight == "day" else complement(days_lit, jd_first, jd_last)
+        windows = intersect(windows, lit)
+
+    result = [
+        {
+            "start": jd_to_iso(window_start, tz),
+            "end": jd_to_iso(window_end, tz),
+            "duration_minutes": round((window_end - window_start) * 1440, 1)
+        }
+        for window_start, window_end in windows
+        if (window_end - window_start) * 1440 >= min_minutes
+    ]
+    logger.debug(f"Found {len(result)} muhurta windows between {start} and {end}")
+    return result
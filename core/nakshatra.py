@@ -1,8 +1,9 @@
 from datetime import datetime, timedelta, timezone
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from utils.astronomy import get_sun_moon_positions, datetime_to_jd, jd_to_datetime
 import swisseph as swe
+from utils.profiling import solver_frame
 
 logger = logging.getLogger(__name__)
 
@@ -85,7 +86,8 @@ def get_nakshatra_number(moon_longitude: float) -> int:
     nakshatra = int(moon_longitude / NAKSHATRA_SPAN) + 1
     return nakshatra
 
-def find_nakshatra_boundary(dt: datetime, lat: float, lon: float, nakshatra: int, direction: int, recursion_depth: int = 0) -> datetime:
+@solver_frame("nakshatra", depth="recursion_depth", iteration="i")
+def find_nakshatra_boundary(dt: datetime, lat: float, lon: float, nakshatra: int, direction: int, recursion_depth: int = 0, topocentric: bool = False) -> datetime:
     """
     Find the exact boundary of a nakshatra based on traditional Vedic astrology principles.
     Each nakshatra spans exactly 13°20' (13.3333... degrees).
@@ -97,6 +99,7 @@ def find_nakshatra_boundary(dt: datetime, lat: float, lon: float, nakshatra: int
         nakshatra (int): Nakshatra number (1-27)
         direction (int): Search direction (-1 for start, 1 for end)
         recursion_depth (int): Current recursion depth (for safety)
+        topocentric (bool): Use topocentric positions for the observer location
     
     Returns:
         datetime: The datetime of the nakshatra boundary
@@ -118,7 +121,7 @@ def find_nakshatra_boundary(dt: datetime, lat: float, lon: float, nakshatra: int
         target_lon = ((nakshatra - 1) * NAKSHATRA_SPAN) % 360
 
     # Get Moon's current position
-    _, moon_pos = get_sun_moon_positions(dt, lat, lon)
+    _, moon_pos = get_sun_moon_positions(dt, lat, lon, topocentric)
     current_lon = moon_pos["longitude"]
     
     # Initialize search window based on Moon's average daily motion (13.2 degrees/day)
@@ -144,7 +147,7 @@ def find_nakshatra_boundary(dt: datetime, lat: float, lon: float, nakshatra: int
     for i in range(60):  # Increased iterations for better precision
         mid = (left + right) / 2
         mid_dt = jd_to_datetime(mid)
-        _, moon_pos = get_sun_moon_positions(mid_dt, lat, lon)
+        _, moon_pos = get_sun_moon_positions(mid_dt, lat, lon, topocentric)
         current_lon = moon_pos["longitude"]
 
         # Normalize longitude difference for comparison
@@ -170,9 +173,9 @@ def find_nakshatra_boundary(dt: datetime, lat: float, lon: float, nakshatra: int
     verify_before = boundary_dt - timedelta(minutes=30)  # Increased verification window
     verify_after = boundary_dt + timedelta(minutes=30)
     
-    _, pos_before = get_sun_moon_positions(verify_before, lat, lon)
-    _, pos_at = get_sun_moon_positions(boundary_dt, lat, lon)
-    _, pos_after = get_sun_moon_positions(verify_after, lat, lon)
+    _, pos_before = get_sun_moon_positions(verify_before, lat, lon, topocentric)
+    _, pos_at = get_sun_moon_positions(boundary_dt, lat, lon, topocentric)
+    _, pos_after = get_sun_moon_positions(verify_after, lat, lon, topocentric)
     
     lon_before = pos_before["longitude"]
     lon_at = pos_at["longitude"]
@@ -188,16 +191,16 @@ def find_nakshatra_boundary(dt: datetime, lat: float, lon: float, nakshatra: int
         if diff_before > 0 or diff_after < 0 or abs(diff_at) > 0.01:
             logger.warning(f"End boundary verification failed (before: {diff_before}°, at: {diff_at}°, after: {diff_after}°)")
             new_dt = boundary_dt + timedelta(hours=2)  # Increased adjustment
-            return find_nakshatra_boundary(new_dt, lat, lon, nakshatra, direction, recursion_depth + 1)
+            return find_nakshatra_boundary(new_dt, lat, lon, nakshatra, direction, recursion_depth + 1, topocentric)
     else:  # Start boundary
         if diff_before < 0 or diff_after > 0 or abs(diff_at) > 0.01:
             logger.warning(f"Start boundary verification failed (before: {diff_before}°, at: {diff_at}°, after: {diff_after}°)")
             new_dt = boundary_dt - timedelta(hours=2)  # Increased adjustment
-            return find_nakshatra_boundary(new_dt, lat, lon, nakshatra, direction, recursion_depth + 1)
+            return find_nakshatra_boundary(new_dt, lat, lon, nakshatra, direction, recursion_depth + 1, topocentric)
 
     return boundary_dt
 
-def calculate_nakshatra(dt: datetime, lat: float, lon: float) -> dict:
+def calculate_nakshatra(dt: datetime, lat: float, lon: float, positions: Optional[tuple] = None, boundaries: bool = True, topocentric: bool = False) -> dict:
     """
     Calculate nakshatra for given datetime and location.
     
@@ -205,6 +208,9 @@ def calculate_nakshatra(dt: datetime, lat: float, lon: float) -> dict:
         dt (datetime): Input datetime (UTC)
         lat (float): Latitude
         lon (float): Longitude
+        positions (tuple, optional): Precomputed (sun_pos, moon_pos) for dt
+        boundaries (bool): Whether to search for start/end times
+        topocentric (bool): Use topocentric positions for the observer location
         
     Returns:
         dict: Nakshatra information including number, name, favorable status, constellation, and boundaries
@@ -222,7 +228,7 @@ def calculate_nakshatra(dt: datetime, lat: float, lon: float) -> dict:
             logger.info(f"Converted input datetime to UTC: {dt}")
         
         # Get Moon's position
-        _, moon_pos = get_sun_moon_positions(dt, lat, lon)
+        _, moon_pos = positions or get_sun_moon_positions(dt, lat, lon, topocentric)
         moon_longitude = moon_pos["longitude"]
         
         # Calculate nakshatra number
@@ -237,12 +243,22 @@ def calculate_nakshatra(dt: datetime, lat: float, lon: float) -> dict:
         # Get constellation information
         constellation = CONSTELLATION_INFO[nakshatra_num]
         
+        if not boundaries:
+            return {
+                "number": nakshatra_num,
+                "name": nakshatra_name,
+                "favorable": nakshatra_favorable,
+                "constellation": constellation,
+                "start": None,
+                "end": None
+            }
+        
         # Find end time of current nakshatra
-        end_time = find_nakshatra_boundary(dt, lat, lon, nakshatra_num, 1)
+        end_time = find_nakshatra_boundary(dt, lat, lon, nakshatra_num, 1, topocentric=topocentric)
         
         # Find start time by finding end time of previous nakshatra
         prev_nakshatra = nakshatra_num - 1 if nakshatra_num > 1 else 27
-        start_time = find_nakshatra_boundary(end_time - timedelta(days=1), lat, lon, prev_nakshatra, 1)
+        start_time = find_nakshatra_boundary(end_time - timedelta(days=1), lat, lon, prev_nakshatra, 1, topocentric=topocentric)
         
         # Validate duration (nakshatras typically last between 22-26 hours)
         duration = (end_time - start_time).total_seconds()
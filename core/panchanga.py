@@ -0,0 +1,308 @@
+from datetime import datetime, timezone, tzinfo
+import logging
+from typing import Dict, Any, Callable, Iterable, Optional
+from utils.astronomy import get_sun_moon_positions, get_sun_day_times, get_moon_day_series, local_day, lookup_elevation, datetime_to_jd, jd_to_iso, ensure_ephemeris, location_cell, cache_version, PolarDayNightError
+from utils.cache import make_cache
+from utils.timezones import get_timezone, warm_up_timezones
+from core.vara import calculate_vara
+from core.tithi import calculate_tithi, TITHI_SPAN
+from core.nakshatra import calculate_nakshatra, NAKSHATRA_SPAN
+from core.yoga import calculate_yoga, YOGA_SPAN
+from core.karana import calculate_karana, KARANA_SPAN
+from core.timeline import LIMBS, Segment, limb_transitions
+from core.masa import lunar_date
+from core.segments import day_segments
+from core.moon_times import moon_times
+
+logger = logging.getLogger(__name__)
+
+# Parts of the panchanga returned by default, in response order
+PANCHANGA_FIELDS = ("sun", "moon", "times", "vara", "tithi", "nakshatra", "yoga", "karana")
+
+# Parts computed only when requested explicitly
+OPTIONAL_FIELDS = ("masa", "segments", "moon_times")
+
+# Parts that need the Sun/Moon positions at the requested instant
+POSITION_FIELDS = {"sun", "moon", "tithi", "nakshatra", "yoga", "karana"}
+
+# Julian day of the J2000.0 epoch
+J2000 = 2451545.0
+
+# Per limb: span in degrees, the angle the limb is measured on, and the mean
+# (sidereal, Lahiri) value of that angle at J2000 with its daily motion.
+# The mean angle is within ~10° of the true one, which is enough to tell
+# apart successive occurrences of the same limb number.
+LIMB_ANGLES = {
+    "tithi": (TITHI_SPAN, lambda sun, moon: (moon - sun) % 360, 297.85, 12.190749),
+    "karana": (KARANA_SPAN, lambda sun, moon: (moon - sun) % 360, 297.85, 12.190749),
+    "nakshatra": (NAKSHATRA_SPAN, lambda sun, moon: moon % 360, 194.46, 13.176358),
+    "yoga": (YOGA_SPAN, lambda sun, moon: (sun + moon) % 360, 91.07, 14.161967),
+}
+
+# Limb calculations, in the order their boundaries are solved
+LIMB_CALCULATORS = (("tithi", calculate_tithi), ("nakshatra", calculate_nakshatra),
+                    ("yoga", calculate_yoga), ("karana", calculate_karana))
+
+# Half-width (days, ~9 s) of the timeline walked around the instant, which
+# contains the segment the instant is classified into even when it lies
+# within the solver tolerance of a boundary
+SEGMENT_WINDOW_DAYS = 1e-4
+
+# Solved limb boundaries, shared by every request that falls inside the same
+# limb occurrence. Keyed by (limb, occurrence, location cell); the cell is None
+# for geocentric results, which do not depend on the observer.
+_boundary_cache = make_cache("limb_boundary", 20000, cache_version)
+
+def limb_occurrence(limb: str, jd_ut: float, sun_lon: float, moon_lon: float) -> int:
+    """
+    Number the occurrence of a limb segment containing the given instant.
+
+    Successive segments of a limb get consecutive integers (e.g. every tithi
+    since J2000 has its own number), so the result identifies one specific
+    tithi/nakshatra/yoga/karana regardless of which instant inside it was used.
+
+    Args:
+        limb (str): One of tithi, karana, nakshatra, yoga
+        jd_ut (float): Julian day (UT) of the instant
+        sun_lon (float): Sun's sidereal longitude at the instant
+        moon_lon (float): Moon's sidereal longitude at the instant
+
+    Returns:
+        int: Absolute segment number
+    """
+    span, angle_of, mean_at_epoch, daily_motion = LIMB_ANGLES[limb]
+    angle = angle_of(sun_lon, moon_lon)
+    mean_angle = mean_at_epoch + daily_motion * (jd_ut - J2000)
+    turns = round((mean_angle - angle) / 360)
+    return int((angle + 360 * turns) // span)
+
+def limb_segment(limb: str, jd_ut: float, sun_lon: float, moon_lon: float, lat: float = 0.0, lon: float = 0.0,
+                 topocentric: bool = False) -> Segment:
+    """
+    Start and end of the limb segment an instant falls in, solved on the
+    limb's timeline (see core.timeline) like /calendar, /events and the
+    array API.
+
+    Args:
+        limb (str): One of tithi, karana, nakshatra, yoga
+        jd_ut (float): Julian day (UT) of the instant
+        sun_lon (float): Sun's sidereal longitude at the instant
+        moon_lon (float): Moon's sidereal longitude at the instant
+        lat (float): Latitude (topocentric mode only)
+        lon (float): Longitude (topocentric mode only)
+        topocentric (bool): Use topocentric positions for the observer location
+
+    Returns:
+        Segment: The segment the longitudes classify the instant into
+    """
+    spec = LIMBS[limb]
+    index = int(spec.angle(sun_lon, moon_lon) // spec.span) % spec.segments
+    segments = limb_transitions(limb, jd_ut - SEGMENT_WINDOW_DAYS, jd_ut + SEGMENT_WINDOW_DAYS, lat, lon, topocentric)
+    # Nearest segment with the classified index
+    return min(segments, key=lambda segment: (segment.index != index, max(segment.start - jd_ut, jd_ut - segment.end, 0.0)))
+
+def _with_cached_boundaries(limb: str, occurrence: Optional[int], cell: Optional[tuple], calculate: Callable[[bool], dict]) -> dict:
+    """Run a limb calculation, taking its start/end from the boundary cache when known."""
+    if occurrence is None:
+        return calculate(True)
+    key = (limb, occurrence, cell)
+    cached = _boundary_cache.get(key)
+    if cached is not None:
+        info = calculate(False)
+        info["start"], info["end"] = cached
+        return info
+    info = calculate(True)
+    _boundary_cache.put(key, (info["start"], info["end"]))
+    return info
+
+def _to_local_time(result: Dict[str, Any], tz: tzinfo) -> None:
+    """Convert every timestamp in a panchanga result to local time, in place."""
+    for part in result.values():
+        for key in ("sunrise", "sunset", "moonrise", "moonset", "start", "end"):
+            if isinstance(part, dict) and part.get(key):
+                part[key] = datetime.fromisoformat(part[key]).astimezone(tz).isoformat()
+
+def compute_panchanga(dt: datetime, lat: float, lon: float, fields: Optional[Iterable[str]] = None, boundaries: bool = True, topocentric: bool = False, local_time: bool = False) -> Dict[str, Any]:
+    """
+    Calculate the requested Panchanga elements for a given datetime and location.
+
+    Only the requested parts are computed: the Sun/Moon positions are taken
+    once and shared by all limbs, boundary searches run only when
+    `boundaries` is set, and sunrise/sunset (with its elevation lookup) only
+    when `times` is requested. A numbers-only request therefore costs two
+    ephemeris calls.
+
+    Boundaries are solved on the limb timelines of core.timeline (Newton
+    root solves on get_sun_moon_longitudes, so they use the longitude series
+    and batching where configured) and cached per limb occurrence, so any
+    later request falling inside the same tithi/nakshatra/yoga/karana skips
+    the solvers.
+    In topocentric mode the limbs and Sun/Moon positions are computed for the
+    centre of the observer's location cell (see LOCATION_CELL_DEG): results
+    are within ~5" of longitude (~10 s of boundary time) of the exact ones,
+    and all users in one cell share the same cached boundaries.
+
+    The lunar month (`masa`), the day-division segments (`segments`:
+    Rahu Kalam, Yamaganda, Gulika, Choghadiya, Hora) and moonrise/moonset
+    (`moon_times`) are not part of the default fields. The masa is always geocentric, as new moons are reckoned
+    for the Earth's centre; the segments share the cached sunrise/sunset
+    triple with `times`.
+
+    With `local_time` the location's timezone is resolved, sunrise/sunset and
+    vara follow the local calendar date of dt, and all timestamps are
+    returned with the local UTC offset.
+
+    Args:
+        dt (datetime): Input datetime (UTC)
+        lat (float): Latitude
+        lon (float): Longitude
+        fields (Iterable[str], optional): Parts to compute from PANCHANGA_FIELDS and
+            OPTIONAL_FIELDS, defaults to all of PANCHANGA_FIELDS
+        boundaries (bool): Whether to search for limb start/end times
+        topocentric (bool): Use topocentric Sun/Moon positions for the observer
+        local_time (bool): Use the local timezone for day boundaries and output
+
+    Returns:
+        dict: Requested Panchanga elements keyed by field name
+    """
+    requested = set(PANCHANGA_FIELDS if fields is None else fields)
+    unknown = requested - set(PANCHANGA_FIELDS + OPTIONAL_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown panchanga fields: {', '.join(sorted(unknown))}")
+
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    tz = get_timezone(lat, lon) if local_time else None
+
+    # Limbs are evaluated at the cell centre in topocentric mode
+    cell = location_cell(lat, lon) if topocentric else None
+    limb_lat, limb_lon = cell if cell else (lat, lon)
+    # Topocentric boundaries computed with the fallback elevation are not cached
+    cache_boundaries = not topocentric or lookup_elevation(limb_lat, limb_lon)[1]
+
+    result: Dict[str, Any] = {}
+    positions = None
+    jd_ut = None
+    if requested & POSITION_FIELDS:
+        positions = get_sun_moon_positions(dt, limb_lat, limb_lon, topocentric)
+        sun_pos, moon_pos = positions
+        if "sun" in requested:
+            result["sun"] = sun_pos
+        if "moon" in requested:
+            result["moon"] = moon_pos
+        if boundaries:
+            _, jd_ut = datetime_to_jd(dt)
+
+    def occurrence(limb: str) -> Optional[int]:
+        if jd_ut is None or not cache_boundaries:
+            return None
+        return limb_occurrence(limb, jd_ut, positions[0]["longitude"], positions[1]["longitude"])
+
+    # The day sunrise/sunset and moon times are taken for: the local date
+    # with local_time, else the UTC date (see local_day)
+    day, day_tz = local_day(dt, tz)
+
+    if "times" in requested or "segments" in requested:
+        # Если для координат/даты физически нет восхода/заката (полярный
+        # день/ночь), возвращаем их как null.
+        try:
+            sunrise_dt, sunset_dt, next_sunrise_dt = get_sun_day_times(dt, lat, lon, tz)
+        except PolarDayNightError as e:
+            logger.warning(f"Polar day/night condition at {dt} for lat={lat}, lon={lon}: {e}")
+            sunrise_dt = sunset_dt = next_sunrise_dt = None
+        if "times" in requested:
+            result["times"] = {
+                "sunrise": sunrise_dt.isoformat() if sunrise_dt else None,
+                "sunset": sunset_dt.isoformat() if sunset_dt else None
+            }
+        if "segments" in requested:
+            # Segments need a full day and night: sunrise, then sunset, then the next sunrise
+            result["segments"] = None
+            if sunrise_dt and next_sunrise_dt and sunrise_dt < sunset_dt:
+                result["segments"] = day_segments(datetime_to_jd(sunrise_dt)[1], datetime_to_jd(sunset_dt)[1],
+                                                  datetime_to_jd(next_sunrise_dt)[1], day, tz)
+
+    if "moon_times" in requested:
+        # Same day and midnight-to-midnight window as sunrise/sunset
+        moonrise, moonset = get_moon_day_series(day, 1, lat, lon, day_tz)[0]
+        result["moon_times"] = moon_times(moonrise, moonset)
+
+    if "vara" in requested:
+        result["vara"] = calculate_vara(dt.astimezone(tz) if tz else dt)
+
+    if "masa" in requested:
+        masa = lunar_date(jd_ut if jd_ut is not None else datetime_to_jd(dt)[1])
+        masa["start"], masa["end"] = jd_to_iso(masa["start"]), jd_to_iso(masa["end"])
+        result["masa"] = masa
+
+    def calculate_limb(limb: str, calculate: Callable, solve: bool) -> dict:
+        info = calculate(dt, limb_lat, limb_lon, positions=positions, boundaries=False, topocentric=topocentric)
+        if solve:
+            segment = limb_segment(limb, jd_ut, positions[0]["longitude"], positions[1]["longitude"],
+                                   limb_lat, limb_lon, topocentric)
+            info["start"], info["end"] = jd_to_iso(segment.start), jd_to_iso(segment.end)
+        return info
+
+    for limb, calculate in LIMB_CALCULATORS:
+        if limb not in requested:
+            continue
+        if boundaries:
+            result[limb] = _with_cached_boundaries(limb, occurrence(limb), cell,
+                                                   lambda solve: calculate_limb(limb, calculate, solve))
+        else:
+            result[limb] = calculate_limb(limb, calculate, False)
+
+    if tz:
+        _to_local_time(result, tz)
+    return result
+
+def round_datetime(dt: datetime, precision: float) -> datetime:
+    """
+    Round a datetime to the nearest multiple of `precision` seconds (since the Unix epoch).
+
+    Args:
+        dt (datetime): Timezone-aware datetime
+        precision (float): Step in seconds, e.g. 60 for whole minutes
+
+    Returns:
+        datetime: Rounded datetime in the same timezone
+    """
+    timestamp = round(dt.timestamp() / precision) * precision
+    return datetime.fromtimestamp(timestamp, tz=dt.tzinfo)
+
+def panchanga_key(dt: datetime, lat: float, lon: float, fields: Optional[Iterable[str]] = None, boundaries: bool = True, topocentric: bool = False, local_time: bool = False) -> tuple:
+    """
+    Normalised compute_panchanga inputs: equal keys give equal results.
+
+    The location is reduced to what the requested parts depend on. Sunrise,
+    segments, moon times and local time need the exact coordinates.
+    Otherwise topocentric limbs need only the location cell, and geocentric
+    ones need no location at all. The instant keeps its UTC offset, since
+    the vara and the sunrise day follow the date in the request's offset.
+
+    Args:
+        Same as compute_panchanga
+
+    Returns:
+        tuple: Hashable key
+    """
+    requested = frozenset(PANCHANGA_FIELDS if fields is None else fields)
+    if local_time or requested & {"times", "segments", "moon_times"}:
+        location = (round(lat, 6), round(lon, 6))
+    elif topocentric:
+        location = location_cell(lat, lon)
+    else:
+        location = None
+    return (dt.timestamp(), dt.utcoffset(), location, requested, boundaries, topocentric, local_time)
+
+def warm_up() -> None:
+    """
+    Pay one-off initialisation costs before serving.
+
+    Initialises the ephemeris, loads the timezone index and runs one small
+    calculation so the first real request does not pay for them.
+    """
+    ensure_ephemeris()
+    warm_up_timezones()
+    compute_panchanga(datetime.now(timezone.utc), 0.0, 0.0, fields=("tithi", "nakshatra", "yoga", "karana"), boundaries=False)
+    logger.info("Warm-up complete")
@@ -0,0 +1,153 @@
+from datetime import date, datetime, timedelta, tzinfo
+import logging
+from typing import Any, Dict, Iterator, List, Optional
+from utils.astronomy import get_sun_day_series, jd_to_iso
+from utils.timezones import get_timezone
+from core.vara import calculate_vara
+
+logger = logging.getLogger(__name__)
+
+"""
+Day-Division Segments
+
+Rahu Kalam, Yamaganda, Gulika Kalam, Choghadiya and Hora. All of them split
+the day (sunrise to sunset) and the night (sunset to next sunrise) into equal
+parts, so they follow from one (sunrise, sunset, next sunrise) triple and the
+weekday, with no further ephemeris work.
+"""
+
+# Longest date range served by one segments request
+MAX_SEGMENT_DAYS = 366
+
+# Which eighth of the day (1-8) each kalam occupies, by weekday (Sunday first)
+RAHU_KALAM_PART = (8, 2, 7, 5, 6, 4, 3)
+YAMAGANDA_PART = (5, 4, 3, 2, 1, 7, 6)
+GULIKA_PART = (7, 6, 5, 4, 3, 2, 1)
+
+# Choghadiya cycle and favorability
+CHOGHADIYA_INFO = (
+    {"name": "Udveg", "favorable": "Unfavorable"},
+    {"name": "Char", "favorable": "Neutral"},
+    {"name": "Labh", "favorable": "Favorable"},
+    {"name": "Amrit", "favorable": "Favorable"},
+    {"name": "Kaal", "favorable": "Unfavorable"},
+    {"name": "Shubh", "favorable": "Favorable"},
+    {"name": "Rog", "favorable": "Unfavorable"}
+)
+
+# First choghadiya of the day and of the night by weekday (Sunday first), as
+# indices into CHOGHADIYA_INFO. Day choghadiyas advance one step through the
+# cycle, night choghadiyas go back two.
+CHOGHADIYA_DAY_START = (0, 3, 6, 2, 5, 1, 4)
+CHOGHADIYA_NIGHT_START = (5, 1, 4, 0, 3, 6, 2)
+
+# Hora lords in Chaldean order; each hora passes to the next lord
+HORA_LORDS = ("Saturn", "Jupiter", "Mars", "Sun", "Venus", "Mercury", "Moon")
+
+# Lord of the first hora (sunrise) by weekday, Sunday first
+DAY_LORDS = ("Sun", "Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn")
+
+def _weekday(day: date) -> int:
+    """Weekday with Sunday = 0."""
+    return (day.weekday() + 1) % 7
+
+def _part(start: float, end: float, parts: int, index: int) -> tuple[float, float]:
+    length = (end - start) / parts
+    return start + index * length, start + (index + 1) * length
+
+def day_segments(sunrise: float, sunset: float, next_sunrise: float, day: date,
+                 tz: Optional[tzinfo] = None) -> Dict[str, Any]:
+    """
+    Day-division segments for one day.
+
+    Args:
+        sunrise (float): Julian day (UT) of sunrise
+        sunset (float): Julian day (UT) of sunset
+        next_sunrise (float): Julian day (UT) of the following sunrise
+        day (date): Calendar date the weekday is taken from
+        tz (tzinfo, optional): Timezone for the output timestamps (UTC when omitted)
+
+    Returns:
+        dict: rahu_kalam, yamaganda, gulika (start/end), and choghadiya and hora
+            lists for day and night
+    """
+    weekday = _weekday(day)
+
+    def span(start: float, end: float) -> Dict[str, str]:
+        return {"start": jd_to_iso(start, tz), "end": jd_to_iso(end, tz)}
+
+    def kalam(parts: tuple) -> Dict[str, str]:
+        return span(*_part(sunrise, sunset, 8, parts[weekday] - 1))
+
+    choghadiya: Dict[str, List[Dict[str, str]]] = {"day": [], "night": []}
+    for period, (start, end, first, step) in {
+        "day": (sunrise, sunset, CHOGHADIYA_DAY_START[weekday], 1),
+        "night": (sunset, next_sunrise, CHOGHADIYA_NIGHT_START[weekday], -2)
+    }.items():
+        for index in range(8):
+            info = CHOGHADIYA_INFO[(first + step * index) % 7]
+            choghadiya[period].append({**info, **span(*_part(start, end, 8, index))})
+
+    first_lord = HORA_LORDS.index(DAY_LORDS[weekday])
+    hora: List[Dict[str, str]] = []
+    for index in range(24):
+        start, end = _part(sunrise, sunset, 12, index) if index < 12 else _part(sunset, next_sunrise, 12, index - 12)
+        hora.append({"lord": HORA_LORDS[(first_lord + index) % 7], **span(start, end)})
+
+    return {
+        "rahu_kalam": kalam(RAHU_KALAM_PART),
+        "yamaganda": kalam(YAMAGANDA_PART),
+        "gulika": kalam(GULIKA_PART),
+        "choghadiya": choghadiya,
+        "hora": hora
+    }
+
+def generate_segments(start: date, end: date, lat: float, lon: float, local_time: bool = False) -> Iterator[Dict[str, Any]]:
+    """
+    Day-division segments for a location over a date range.
+
+    The (sunrise, sunset, next sunrise) triples for the whole range come from
+    one sweep, so a month costs about 60 rise/set searches in total.
+
+    Args:
+        start (date): First local calendar date
+        end (date): Last local calendar date (inclusive)
+        lat (float): Latitude
+        lon (float): Longitude
+        local_time (bool): Use the location's timezone for the local days and
+            output timestamps instead of local mean time and UTC
+
+    Returns:
+        Iterator[dict]: One row per day with date, vara, sunrise, sunset and the
+            segments; days without a sunrise/sunset (polar day/night) carry null
+            times and segments
+
+    Raises:
+        ValueError: If the date range is empty or too long
+    """
+    days = (end - start).days + 1
+    if days < 1:
+        raise ValueError("End date must not be before start date")
+    if days > MAX_SEGMENT_DAYS:
+        raise ValueError(f"Date range must not exceed {MAX_SEGMENT_DAYS} days")
+
+    tz = get_timezone(lat, lon) if local_time else None
+    triples = get_sun_day_series(start, days, lat, lon, tz)
+    return _segment_rows(start, triples, tz)
+
+def _segment_rows(start: date, triples: List[Optional[tuple]], tz: Optional[tzinfo]) -> Iterator[Dict[str, Any]]:
+    """Format segment rows one day at a time from precomputed sunrise triples."""
+    for offset, triple in enumerate(triples):
+        day = start + timedelta(days=offset)
+        row: Dict[str, Any] = {
+            "date": day.isoformat(),
+            "vara": calculate_vara(datetime(day.year, day.month, day.day))["vara"],
+            "sunrise": None,
+            "sunset": None,
+            "segments": None
+        }
+        if triple is not None:
+            sunrise, sunset, next_sunrise = triple
+            row["sunrise"], row["sunset"] = jd_to_iso(sunrise, tz), jd_to_iso(sunset, tz)
+            row["segments"] = day_segments(sunrise, sunset, next_sunrise, day, tz)
+        yield row
@@ -0,0 +1,243 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from datetime import tzinfo
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from starlette.concurrency import run_in_threadpool
+from utils.astronomy import jd_to_iso, location_cell, next_sunrise_jd
+from core.timeline import LIMBS, Segment, limb_transitions, solve_crossing
+
+logger = logging.getLogger(__name__)
+
+"""
+Live Transition Subscriptions
+
+Pushes limb (tithi, karana, nakshatra, yoga) and sunrise transitions to
+subscribed clients as they happen. Subscribers observing the same thing share
+one channel: geocentric limbs are the same for everyone, topocentric limbs
+are shared per location cell and sunrises per location. A single hub task
+keeps the next due transition of every channel in a heap, sleeps until the
+earliest one, solves the following transition of that channel and fans the
+event out, so the work per transition is independent of the number of
+subscribers.
+"""
+
+# Limbs pushed to subscribers
+SUBSCRIPTION_LIMBS = ("tithi", "karana", "nakshatra", "yoga")
+
+# Longest single sleep of the hub task, so clock adjustments are picked up
+MAX_SLEEP_SECONDS = 60.0
+
+# Idle streams get a comment line this often so proxies keep them open
+KEEPALIVE_SECONDS = 15.0
+
+# Unix epoch as a Julian day
+UNIX_EPOCH_JD = 2440587.5
+
+# Retry interval for a location where the Sun currently does not rise
+POLAR_RETRY_DAYS = 1.0
+
+ChannelKey = Tuple[Any, ...]
+
+def jd_now() -> float:
+    """Current Julian day (UTC, within a second of UT1)."""
+    return time.time() / 86400.0 + UNIX_EPOCH_JD
+
+
+class Subscription:
+    """One client's subscription; events are delivered through `queue`."""
+
+    def __init__(self, lat: float, lon: float, topocentric: bool = False):
+        self.lat = lat
+        self.lon = lon
+        self.topocentric = topocentric
+        self.queue: asyncio.Queue = asyncio.Queue()
+        cell = location_cell(lat, lon) if topocentric else None
+        self.channels: List[ChannelKey] = [(limb, cell) for limb in SUBSCRIPTION_LIMBS]
+        self.channels.append(("sunrise", round(lat, 6), round(lon, 6)))
+
+
+class TransitionHub:
+    """
+    Shared timer heap serving every subscription.
+
+    Channels are created when their first subscriber arrives and dropped with
+    the last one; heap entries of dropped or rescheduled channels are skipped
+    when they come due.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, ChannelKey]] = []
+        self._due: Dict[ChannelKey, float] = {}
+        self._state: Dict[ChannelKey, Any] = {}
+        self._subscribers: Dict[ChannelKey, Set[Subscription]] = {}
+        self._counter = itertools.count()
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len({subscription for subscribers in self._subscribers.values() for subscription in subscribers})
+
+    def _schedule(self, key: ChannelKey, jd: float) -> None:
+        self._due[key] = jd
+        heapq.heappush(self._heap, (jd, next(self._counter), key))
+        if self._wake is not None and self._heap[0][2] == key:
+            # New earliest timer: cut the current sleep short
+            self._wake.set()
+
+    def _initial_state(self, key: ChannelKey, jd: float) -> Tuple[Any, float]:
+        """Current state of a channel and when it next changes (blocking)."""
+        if key[0] == "sunrise":
+            _, lat, lon = key
+            sunrise = next_sunrise_jd(jd, lat, lon)
+            return sunrise, sunrise if sunrise is not None else jd + POLAR_RETRY_DAYS
+        limb, cell = key
+        lat, lon = cell if cell else (0.0, 0.0)
+        segment = limb_transitions(limb, jd, jd, lat, lon, cell is not None)[0]
+        return segment, segment.end
+
+    def _advance(self, key: ChannelKey, state: Any, due: float) -> Tuple[Any, Optional[Tuple[str, Any]], float]:
+        """Next state of a due channel, the event to push and the next due time (blocking)."""
+        if key[0] == "sunrise":
+            _, lat, lon = key
+            sunrise = state
+            following = next_sunrise_jd((sunrise or due) + 0.01, lat, lon)
+            event = ("sunrise", sunrise) if sunrise is not None else None
+            return following, event, following if following is not None else due + POLAR_RETRY_DAYS
+        limb, cell = key
+        lat, lon = cell if cell else (0.0, 0.0)
+        spec = LIMBS[limb]
+        previous: Segment = state
+        index = (previous.index + 1) % spec.segments
+        boundary = ((index + 1) % spec.segments) * spec.span
+        end = solve_crossing(limb, boundary, previous.end + spec.span / spec.mean_motion, lat, lon, cell is not None)
+        segment = Segment(previous.end, end, index, spec.number(index))
+        return segment, (limb, segment), segment.end
+
+    async def subscribe(self, lat: float, lon: float, topocentric: bool = False,
+                        run: Callable[..., Awaitable[Any]] = run_in_threadpool) -> Subscription:
+        """
+        Register a subscription, creating the channels it needs.
+
+        Args:
+            lat (float): Latitude
+            lon (float): Longitude
+            topocentric (bool): Follow topocentric limbs for the location cell
+            run: Runs the blocking solves for new channels (e.g. under
+                admission control); a worker thread by default
+
+        Returns:
+            Subscription: Receives (kind, payload) events on its queue, where kind
+                is a limb name with a Segment payload or "sunrise" with a Julian day
+        """
+        self._ensure_running()
+        subscription = Subscription(lat, lon, topocentric)
+        now = jd_now()
+        try:
+            for key in subscription.channels:
+                if key not in self._subscribers:
+                    state, due = await run(self._initial_state, key, now)
+                    if key not in self._subscribers:
+                        self._subscribers[key] = set()
+                        self._state[key] = state
+                        self._schedule(key, due)
+                self._subscribers[key].add(subscription)
+        except BaseException:
+            # Failed or cancelled part-way: release the channels joined so far
+            self.unsubscribe(subscription)
+            raise
+        logger.debug(f"Subscribed lat={lat}, lon={lon}, topocentric={topocentric}; {len(self._subscribers)} channels")
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Remove a subscription and drop channels nobody follows any more."""
+        for key in subscription.channels:
+            subscribers = self._subscribers.get(key)
+            if subscribers is None:
+                continue
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[key]
+                self._state.pop(key, None)
+                self._due.pop(key, None)
+
+    def _ensure_running(self) -> None:
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            # Discard entries of dropped or rescheduled channels
+            while self._heap and self._due.get(self._heap[0][2]) != self._heap[0][0]:
+                heapq.heappop(self._heap)
+            delay = (self._heap[0][0] - jd_now()) * 86400.0 if self._heap else MAX_SLEEP_SECONDS
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=min(delay, MAX_SLEEP_SECONDS))
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+                continue
+
+            previous_due, _, key = heapq.heappop(self._heap)
+            state = self._state[key]
+            try:
+                # The solves (and sunrise's elevation lookup) block, so they run off the event loop
+                state, event, due = await run_in_threadpool(self._advance, key, state, previous_due)
+            except Exception as e:
+                logger.error(f"Error advancing subscription channel {key}: {str(e)}")
+                due = jd_now() + MAX_SLEEP_SECONDS / 86400.0
+                event = None
+            # Dropped (or dropped and recreated) while advancing
+            if self._due.get(key) != previous_due:
+                continue
+            self._state[key] = state
+            self._schedule(key, due)
+            if event is not None:
+                for subscription in self._subscribers[key]:
+                    subscription.queue.put_nowait(event)
+
+    async def close(self) -> None:
+        """Stop the hub task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+def transition_message(kind: str, payload: Any, tz: Optional[tzinfo] = None) -> Dict[str, Any]:
+    """
+    Format a subscription event for clients.
+
+    Args:
+        kind (str): Limb name or "sunrise"
+        payload: Segment for limbs, Julian day for sunrise
+        tz (tzinfo, optional): Timezone for the timestamps (UTC when omitted)
+
+    Returns:
+        dict: {"type": kind, kind: details}
+    """
+    if kind == "sunrise":
+        return {"type": "sunrise", "sunrise": jd_to_iso(payload, tz)}
+    info = LIMBS[kind].info[payload.number]
+    return {
+        "type": kind,
+        kind: {
+            "number": payload.number,
+            "name": info["name"],
+            "favorable": info["favorable"],
+            "start": jd_to_iso(payload.start, tz),
+            "end": jd_to_iso(payload.end, tz)
+        }
+    }
+
+
+# Hub shared by all subscriptions of the process
+hub = TransitionHub()
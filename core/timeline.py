@@ -0,0 +1,168 @@
+import bisect
+import logging
+from typing import Callable, Dict, List, NamedTuple, Optional
+from utils.astronomy import get_sun_moon_longitudes
+from utils.profiling import solver_frame
+from core.tithi import TITHI_SPAN, TITHI_INFO
+from core.nakshatra import NAKSHATRA_SPAN, NAKSHATRA_INFO
+from core.yoga import YOGA_SPAN, YOGA_INFO
+from core.karana import KARANA_SPAN, KARANA_INFO, KARANA_DEGREE_MAP
+
+logger = logging.getLogger(__name__)
+
+"""
+Limb Transition Timelines
+
+Forward-walked sequences of limb segments (tithi, karana, nakshatra, yoga)
+for a time range. Each transition is found with a single Newton root solve
+seeded from the mean motion of the limb's angle, so the cost of a timeline
+scales with the number of transitions rather than with any time resolution.
+"""
+
+# Stop refining once the angle is within this many degrees of the boundary
+# (~0.01 s of time at the Moon's speed)
+ANGLE_TOLERANCE = 1e-6
+
+# Upper bound on Newton steps per transition
+MAX_ITERATIONS = 12
+
+
+class LimbSpec(NamedTuple):
+    span: float  # Degrees per segment
+    segments: int  # Segments per full 360° cycle
+    mean_motion: float  # Mean daily motion of the angle in degrees
+    angle: Callable[[float, float], float]  # (sun_lon, moon_lon) -> angle
+    speed: Callable[[float, float], float]  # (sun_speed, moon_speed) -> angle speed
+    number: Callable[[int], int]  # Segment index (0-based) -> limb number
+    info: Dict[int, Dict[str, str]]  # Limb number -> name/favorable
+
+
+def _karana_number(segment: int) -> int:
+    """Karana number for a 6° segment of the Moon-Sun elongation."""
+    return KARANA_DEGREE_MAP[(segment // 2 + 1, segment % 2 == 1)][0]
+
+
+# Mean motions: Moon-Sun elongation ~12.2°/day (13.2°/day of the Moon less the
+# Sun's ~1°/day), Moon ~13.2°/day, Sun+Moon ~14.2°/day
+LIMBS: Dict[str, LimbSpec] = {
+    "tithi": LimbSpec(TITHI_SPAN, 30, 12.19, lambda sun, moon: (moon - sun) % 360,
+                      lambda sun_speed, moon_speed: moon_speed - sun_speed, lambda segment: segment + 1, TITHI_INFO),
+    "karana": LimbSpec(KARANA_SPAN, 60, 12.19, lambda sun, moon: (moon - sun) % 360,
+                       lambda sun_speed, moon_speed: moon_speed - sun_speed, _karana_number, KARANA_INFO),
+    "nakshatra": LimbSpec(NAKSHATRA_SPAN, 27, 13.2, lambda sun, moon: moon % 360,
+                          lambda sun_speed, moon_speed: moon_speed, lambda segment: segment + 1, NAKSHATRA_INFO),
+    "yoga": LimbSpec(YOGA_SPAN, 27, 14.2, lambda sun, moon: (sun + moon) % 360,
+                     lambda sun_speed, moon_speed: sun_speed + moon_speed, lambda segment: segment + 1, YOGA_INFO),
+}
+
+
+class Segment(NamedTuple):
+    start: float  # Julian day (UT) the segment begins
+    end: float  # Julian day (UT) the segment ends
+    index: int  # Segment index within the 360° cycle (0-based)
+    number: int  # Limb number (e.g. tithi 1-30, karana 1-11)
+
+
+def limb_angle(limb: str, jd_ut: float, lat: float = 0.0, lon: float = 0.0, topocentric: bool = False) -> tuple[float, float]:
+    """
+    Angle a limb is measured on, and its daily speed, at a Julian day (UT).
+
+    Args:
+        limb (str): One of tithi, karana, nakshatra, yoga
+        jd_ut (float): Julian day (UT)
+        lat (float): Latitude (topocentric mode only)
+        lon (float): Longitude (topocentric mode only)
+        topocentric (bool): Use topocentric positions for the observer location
+
+    Returns:
+        tuple: (angle in degrees 0-360, speed in degrees/day)
+    """
+    spec = LIMBS[limb]
+    sun_lon, sun_speed, moon_lon, moon_speed = get_sun_moon_longitudes(jd_ut, lat, lon, topocentric)
+    return spec.angle(sun_lon, moon_lon), spec.speed(sun_speed, moon_speed)
+
+
+@solver_frame(limb_arg="limb", iteration="iteration")
+def solve_crossing(limb: str, target: float, jd_guess: float, lat: float = 0.0, lon: float = 0.0, topocentric: bool = False) -> float:
+    """
+    Find the instant near jd_guess when a limb's angle equals target.
+
+    Newton iteration on the angle using the ephemeris speeds; from a mean
+    motion estimate it typically converges in 3-4 steps.
+
+    Args:
+        limb (str): One of tithi, karana, nakshatra, yoga
+        target (float): Target angle in degrees
+        jd_guess (float): Initial estimate, Julian day (UT)
+        lat (float): Latitude (topocentric mode only)
+        lon (float): Longitude (topocentric mode only)
+        topocentric (bool): Use topocentric positions for the observer location
+
+    Returns:
+        float: Julian day (UT) of the crossing
+    """
+    spec = LIMBS[limb]
+    jd = jd_guess
+    for iteration in range(MAX_ITERATIONS):
+        angle, speed = limb_angle(limb, jd, lat, lon, topocentric)
+        diff = (angle - target + 180) % 360 - 180
+        if abs(diff) < ANGLE_TOLERANCE:
+            return jd
+        # Guard against a (non-physical) vanishing speed
+        jd -= diff / (speed if speed > 1 else spec.mean_motion)
+    logger.warning(f"{limb} crossing of {target}° did not converge near JD {jd_guess}")
+    return jd
+
+
+def limb_transitions(limb: str, jd_start: float, jd_end: float, lat: float = 0.0, lon: float = 0.0, topocentric: bool = False) -> List[Segment]:
+    """
+    Walk the segments of a limb forward across a time range.
+
+    Args:
+        limb (str): One of tithi, karana, nakshatra, yoga
+        jd_start (float): Range start, Julian day (UT)
+        jd_end (float): Range end, Julian day (UT)
+        lat (float): Latitude (topocentric mode only)
+        lon (float): Longitude (topocentric mode only)
+        topocentric (bool): Use topocentric positions for the observer location
+
+    Returns:
+        list: Consecutive segments, the first containing jd_start and the last
+            containing jd_end
+    """
+    spec = LIMBS[limb]
+    angle, _ = limb_angle(limb, jd_start, lat, lon, topocentric)
+    index = int(angle // spec.span) % spec.segments
+
+    # Solve the start of the current segment, then walk forward end to end
+    start = solve_crossing(limb, index * spec.span, jd_start - (angle - index * spec.span) / spec.mean_motion,
+                           lat, lon, topocentric)
+    segments = []
+    while True:
+        boundary = ((index + 1) % spec.segments) * spec.span
+        end = solve_crossing(limb, boundary, start + spec.span / spec.mean_motion, lat, lon, topocentric)
+        segments.append(Segment(start, end, index, spec.number(index)))
+        if end > jd_end:
+            break
+        start = end
+        index = (index + 1) % spec.segments
+
+    logger.debug(f"Walked {len(segments)} {limb} segments between JD {jd_start} and {jd_end}")
+    return segments
+
+
+def segment_at(segments: List[Segment], jd: float) -> Optional[Segment]:
+    """
+    Look up the segment in force at a Julian day.
+
+    Args:
+        segments (list): Consecutive segments as returned by limb_transitions
+        jd (float): Julian day (UT)
+
+    Returns:
+        Segment: The segment containing jd, or None if jd is outside the timeline
+    """
+    position = bisect.bisect_right(segments, jd, key=lambda segment: segment.start) - 1
+    if position < 0 or jd >= segments[position].end:
+        return None
+    return segments[position]
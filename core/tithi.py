@@ -1,8 +1,9 @@
 from datetime import datetime, timedelta, timezone
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from utils.astronomy import get_sun_moon_positions, datetime_to_jd, jd_to_datetime
 import swisseph as swe
+from utils.profiling import solver_frame
 
 logger = logging.getLogger(__name__)
 
@@ -43,7 +44,7 @@ TITHI_INFO = {
     30: {"name": "Amavasya", "favorable": "Unfavorable"}  # good for rituals, bad for new ventures
 }
 
-def get_lunar_phase(dt: datetime, lat: float, lon: float) -> float:
+def get_lunar_phase(dt: datetime, lat: float, lon: float, topocentric: bool = False) -> float:
     """
     Calculate lunar phase using positions from astronomy utils.
     Phase is purely based on longitudinal difference between Moon and Sun.
@@ -52,6 +53,7 @@ def get_lunar_phase(dt: datetime, lat: float, lon: float) -> float:
         dt (datetime): Date and time (UTC)
         lat (float): Latitude
         lon (float): Longitude
+        topocentric (bool): Use topocentric positions for the observer location
     
     Returns:
         float: Lunar phase in degrees (0-360)
@@ -59,7 +61,7 @@ def get_lunar_phase(dt: datetime, lat: float, lon: float) -> float:
     logger.debug(f"=== Starting lunar phase calculation ===")
     logger.debug(f"Input datetime (UTC): {dt}")
     
-    sun_pos, moon_pos = get_sun_moon_positions(dt, lat, lon)
+    sun_pos, moon_pos = get_sun_moon_positions(dt, lat, lon, topocentric)
     sun_lon = sun_pos["longitude"]
     moon_lon = moon_pos["longitude"]
     
@@ -73,7 +75,8 @@ def get_lunar_phase(dt: datetime, lat: float, lon: float) -> float:
     logger.debug(f"=== Lunar phase calculation complete ===")
     return phase
 
-def find_tithi_boundary(dt: datetime, lat: float, lon: float, target_diff: float) -> datetime:
+@solver_frame("tithi", iteration="iteration")
+def find_tithi_boundary(dt: datetime, lat: float, lon: float, target_diff: float, topocentric: bool = False) -> datetime:
     """Find the exact time when Moon-Sun longitude difference equals target_diff.
     
     Args:
@@ -81,6 +84,7 @@ def find_tithi_boundary(dt: datetime, lat: float, lon: float, target_diff: float
         lat (float): Latitude
         lon (float): Longitude
         target_diff (float): Target Moon-Sun longitude difference in degrees
+        topocentric (bool): Use topocentric positions for the observer location
         
     Returns:
         datetime: Time when Moon-Sun difference equals target_diff
@@ -88,7 +92,7 @@ def find_tithi_boundary(dt: datetime, lat: float, lon: float, target_diff: float
     jd_et, _ = datetime_to_jd(dt)
     
     # Get current difference to determine search direction
-    sun_pos, moon_pos = get_sun_moon_positions(dt, lat, lon)
+    sun_pos, moon_pos = get_sun_moon_positions(dt, lat, lon, topocentric)
     current_diff = (moon_pos["longitude"] - sun_pos["longitude"]) % 360
     
     # Determine search window based on current position
@@ -107,11 +111,11 @@ def find_tithi_boundary(dt: datetime, lat: float, lon: float, target_diff: float
         left = jd_et - search_window
         right = jd_et
     
-    for _ in range(32):
+    for iteration in range(32):
         mid = (left + right) / 2
         mid_dt = jd_to_datetime(mid)
         
-        sun_pos, moon_pos = get_sun_moon_positions(mid_dt, lat, lon)
+        sun_pos, moon_pos = get_sun_moon_positions(mid_dt, lat, lon, topocentric)
         current_diff = (moon_pos["longitude"] - sun_pos["longitude"]) % 360
         
         if abs(current_diff - target_diff) < 1e-8:
@@ -124,13 +128,16 @@ def find_tithi_boundary(dt: datetime, lat: float, lon: float, target_diff: float
             
     return jd_to_datetime(right)
 
-def calculate_tithi(dt: datetime, lat: float, lon: float) -> dict:
+def calculate_tithi(dt: datetime, lat: float, lon: float, positions: Optional[tuple] = None, boundaries: bool = True, topocentric: bool = False) -> dict:
     """Calculate tithi for given datetime and location.
     
     Args:
         dt (datetime): Input datetime (UTC)
         lat (float): Latitude
         lon (float): Longitude
+        positions (tuple, optional): Precomputed (sun_pos, moon_pos) for dt
+        boundaries (bool): Whether to search for start/end times
+        topocentric (bool): Use topocentric positions for the observer location
         
     Returns:
         dict: Tithi information including number, name, favorable status, and boundaries
@@ -143,7 +150,7 @@ def calculate_tithi(dt: datetime, lat: float, lon: float) -> dict:
             dt = dt.astimezone(timezone.utc)
         
         # Get current Moon-Sun longitude difference
-        sun_pos, moon_pos = get_sun_moon_positions(dt, lat, lon)
+        sun_pos, moon_pos = positions or get_sun_moon_positions(dt, lat, lon, topocentric)
         moon_sun_diff = (moon_pos["longitude"] - sun_pos["longitude"]) % 360
         
         # Calculate tithi number (1-30)
@@ -156,13 +163,22 @@ def calculate_tithi(dt: datetime, lat: float, lon: float) -> dict:
         tithi_name = tithi_info["name"]
         tithi_favorable = tithi_info["favorable"]
         
+        if not boundaries:
+            return {
+                "number": tithi_number,
+                "name": tithi_name,
+                "favorable": tithi_favorable,
+                "start": None,
+                "end": None
+            }
+        
         # Calculate tithi boundaries
         tithi_start_diff = (tithi_number - 1) * TITHI_SPAN
         tithi_end_diff = tithi_number * TITHI_SPAN
         
         # Find exact times when moon-sun difference crosses tithi boundaries
-        start_time = find_tithi_boundary(dt, lat, lon, tithi_start_diff)
-        end_time = find_tithi_boundary(dt, lat, lon, tithi_end_diff)
+        start_time = find_tithi_boundary(dt, lat, lon, tithi_start_diff, topocentric)
+        end_time = find_tithi_boundary(dt, lat, lon, tithi_end_diff, topocentric)
         
         result = {
             "number": tithi_number,
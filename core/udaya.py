@@ -0,0 +1,123 @@
+from datetime import date, datetime, timedelta, timezone, tzinfo
+import logging
+from typing import Any, Dict, Iterator, List, Optional
+from utils.astronomy import get_sunrise_series, local_midnight_jd, location_cell, jd_to_iso
+from core.timeline import LIMBS, Segment, limb_transitions
+from core.vara import calculate_vara
+from utils.timezones import get_timezone
+
+logger = logging.getLogger(__name__)
+
+"""
+Udaya (Sunrise-Anchored) Calendar
+
+Daily panchanga for one location where each day carries the limbs in force at
+its local sunrise. Limbs that begin and end between two sunrises never prevail
+at a sunrise and are reported as skipped (kshaya) on the day they fall in;
+limbs prevailing at two consecutive sunrises are flagged as repeated (vriddhi).
+"""
+
+# Limbs reported for each day, in output order
+CALENDAR_LIMBS = ("tithi", "nakshatra", "yoga", "karana")
+
+# Longest date range served by one calendar request
+MAX_CALENDAR_DAYS = 732
+
+def _segment_info(limb: str, segment: Segment, tz: Optional[tzinfo]) -> Dict[str, Any]:
+    info = LIMBS[limb].info[segment.number]
+    return {
+        "number": segment.number,
+        "name": info["name"],
+        "favorable": info["favorable"],
+        "start": jd_to_iso(segment.start, tz),
+        "end": jd_to_iso(segment.end, tz)
+    }
+
+def generate_calendar(start: date, end: date, lat: float, lon: float, topocentric: bool = False, local_time: bool = False) -> Iterator[Dict[str, Any]]:
+    """
+    Generate the sunrise-anchored daily panchanga for a location and date range.
+
+    The sunrises are computed in a single sweep and each limb is looked up
+    at every sunrise in one forward-walked transition timeline for the whole
+    range, so the cost grows with the number of days and limb transitions
+    rather than with repeated full panchanga calculations.
+
+    Args:
+        start (date): First local calendar date
+        end (date): Last local calendar date (inclusive)
+        lat (float): Latitude
+        lon (float): Longitude
+        topocentric (bool): Use topocentric positions for the observer location
+        local_time (bool): Use the location's timezone for the local days and
+            output timestamps instead of local mean time and UTC
+
+    Returns:
+        Iterator[dict]: One row per day with date, sunrise, vara and the limbs in force at
+            sunrise; each limb has `repeated` (vriddhi) and `skipped` (kshaya) entries.
+            Days without a sunrise (polar day/night) carry null sunrise and limbs.
+
+    Raises:
+        ValueError: If the date range is empty or too long
+    """
+    days = (end - start).days + 1
+    if days < 1:
+        raise ValueError("End date must not be before start date")
+    if days > MAX_CALENDAR_DAYS:
+        raise ValueError(f"Date range must not exceed {MAX_CALENDAR_DAYS} days")
+
+    tz = get_timezone(lat, lon) if local_time else None
+
+    # One extra sunrise closes the last day's sunrise-to-sunrise window
+    sunrises = get_sunrise_series(start, days + 1, lat, lon, tz)
+    jd_first = local_midnight_jd(start, lon, tz)
+    jd_last = local_midnight_jd(end + timedelta(days=2), lon, tz)
+    # Topocentric limbs are evaluated at the location cell centre, as in compute_panchanga
+    limb_lat, limb_lon = location_cell(lat, lon) if topocentric else (lat, lon)
+    timelines = {
+        limb: limb_transitions(limb, jd_first, jd_last, limb_lat, limb_lon, topocentric)
+        for limb in CALENDAR_LIMBS
+    }
+    return _calendar_rows(start, days, sunrises, timelines, tz)
+
+def _calendar_rows(start: date, days: int, sunrises: List[Optional[float]], timelines: Dict[str, List[Segment]], tz: Optional[tzinfo]) -> Iterator[Dict[str, Any]]:
+    """Format calendar rows one day at a time from precomputed sunrises and timelines."""
+    positions = {limb: 0 for limb in CALENDAR_LIMBS}
+    previous: Dict[str, Optional[Segment]] = {limb: None for limb in CALENDAR_LIMBS}
+
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        sunrise = sunrises[offset]
+        row: Dict[str, Any] = {
+            "date": day.isoformat(),
+            "sunrise": jd_to_iso(sunrise, tz) if sunrise is not None else None,
+            "vara": calculate_vara(datetime(day.year, day.month, day.day, tzinfo=timezone.utc))
+        }
+
+        next_sunrise = sunrises[offset + 1]
+        for limb in CALENDAR_LIMBS:
+            if sunrise is None:
+                row[limb] = None
+                previous[limb] = None
+                continue
+
+            # Sunrises only move forward, so walk the timeline with a cursor
+            timeline = timelines[limb]
+            position = positions[limb]
+            while timeline[position].end <= sunrise:
+                position += 1
+            positions[limb] = position
+            current = timeline[position]
+
+            info = _segment_info(limb, current, tz)
+            info["repeated"] = previous[limb] is not None and previous[limb].start == current.start
+            skipped: List[Dict[str, Any]] = []
+            if next_sunrise is not None:
+                following = position + 1
+                while following < len(timeline) and timeline[following].end <= next_sunrise:
+                    skipped.append(_segment_info(limb, timeline[following], tz))
+                    following += 1
+            info["skipped"] = skipped
+            row[limb] = info
+            previous[limb] = current
+
+        yield row
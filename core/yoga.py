@@ -1,7 +1,8 @@
 from datetime import datetime, timedelta, timezone
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from utils.astronomy import get_sun_moon_positions, datetime_to_jd, jd_to_datetime
+from utils.profiling import solver_frame
 
 logger = logging.getLogger(__name__)
 
@@ -55,7 +56,8 @@ def get_yoga_number(sun_longitude: float, moon_longitude: float) -> int:
     yoga = int(total_longitude / YOGA_SPAN) + 1
     return yoga
 
-def find_yoga_boundary(dt: datetime, lat: float, lon: float, yoga: int, direction: int, recursion_depth: int = 0) -> datetime:
+@solver_frame("yoga", depth="recursion_depth", iteration="i")
+def find_yoga_boundary(dt: datetime, lat: float, lon: float, yoga: int, direction: int, recursion_depth: int = 0, topocentric: bool = False) -> datetime:
     """
     Find the exact boundary of a yoga based on traditional Vedic astrology principles.
     Each yoga spans exactly 13°20' (13.3333... degrees).
@@ -67,6 +69,7 @@ def find_yoga_boundary(dt: datetime, lat: float, lon: float, yoga: int, directio
         yoga (int): Yoga number (1-27)
         direction (int): Search direction (-1 for start, 1 for end)
         recursion_depth (int): Current recursion depth (for safety)
+        topocentric (bool): Use topocentric positions for the observer location
     
     Returns:
         datetime: The datetime of the yoga boundary
@@ -87,7 +90,7 @@ def find_yoga_boundary(dt: datetime, lat: float, lon: float, yoga: int, directio
         target_total = ((yoga - 1) * YOGA_SPAN) % 360
 
     # Get current positions
-    sun_pos, moon_pos = get_sun_moon_positions(dt, lat, lon)
+    sun_pos, moon_pos = get_sun_moon_positions(dt, lat, lon, topocentric)
     current_total = (sun_pos["longitude"] + moon_pos["longitude"]) % 360
     
     # Initialize search window based on average daily motion
@@ -113,7 +116,7 @@ def find_yoga_boundary(dt: datetime, lat: float, lon: float, yoga: int, directio
     for i in range(60):  # Increased iterations for better precision
         mid = (left + right) / 2
         mid_dt = jd_to_datetime(mid)
-        sun_pos, moon_pos = get_sun_moon_positions(mid_dt, lat, lon)
+        sun_pos, moon_pos = get_sun_moon_positions(mid_dt, lat, lon, topocentric)
         current_total = (sun_pos["longitude"] + moon_pos["longitude"]) % 360
 
         # Normalize longitude difference for comparison
@@ -139,9 +142,9 @@ def find_yoga_boundary(dt: datetime, lat: float, lon: float, yoga: int, directio
     verify_before = boundary_dt - timedelta(minutes=30)  # Increased verification window
     verify_after = boundary_dt + timedelta(minutes=30)
     
-    sun_before, moon_before = get_sun_moon_positions(verify_before, lat, lon)
-    sun_at, moon_at = get_sun_moon_positions(boundary_dt, lat, lon)
-    sun_after, moon_after = get_sun_moon_positions(verify_after, lat, lon)
+    sun_before, moon_before = get_sun_moon_positions(verify_before, lat, lon, topocentric)
+    sun_at, moon_at = get_sun_moon_positions(boundary_dt, lat, lon, topocentric)
+    sun_after, moon_after = get_sun_moon_positions(verify_after, lat, lon, topocentric)
     
     total_before = (sun_before["longitude"] + moon_before["longitude"]) % 360
     total_at = (sun_at["longitude"] + moon_at["longitude"]) % 360
@@ -157,16 +160,16 @@ def find_yoga_boundary(dt: datetime, lat: float, lon: float, yoga: int, directio
         if diff_before > 0 or diff_after < 0 or abs(diff_at) > 0.01:
             logger.warning(f"End boundary verification failed (before: {diff_before}°, at: {diff_at}°, after: {diff_after}°)")
             new_dt = boundary_dt + timedelta(hours=2)  # Increased adjustment
-            return find_yoga_boundary(new_dt, lat, lon, yoga, direction, recursion_depth + 1)
+            return find_yoga_boundary(new_dt, lat, lon, yoga, direction, recursion_depth + 1, topocentric)
     else:  # Start boundary
         if diff_before < 0 or diff_after > 0 or abs(diff_at) > 0.01:
             logger.warning(f"Start boundary verification failed (before: {diff_before}°, at: {diff_at}°, after: {diff_after}°)")
             new_dt = boundary_dt - timedelta(hours=2)  # Increased adjustment
-            return find_yoga_boundary(new_dt, lat, lon, yoga, direction, recursion_depth + 1)
+            return find_yoga_boundary(new_dt, lat, lon, yoga, direction, recursion_depth + 1, topocentric)
 
     return boundary_dt
 
-def calculate_yoga(dt: datetime, lat: float, lon: float) -> dict:
+def calculate_yoga(dt: datetime, lat: float, lon: float, positions: Optional[tuple] = None, boundaries: bool = True, topocentric: bool = False) -> dict:
     """
     Calculate yoga for given datetime and location.
     
@@ -174,6 +177,9 @@ def calculate_yoga(dt: datetime, lat: float, lon: float) -> dict:
         dt (datetime): Input datetime (UTC)
         lat (float): Latitude
         lon (float): Longitude
+        positions (tuple, optional): Precomputed (sun_pos, moon_pos) for dt
+        boundaries (bool): Whether to search for start/end times
+        topocentric (bool): Use topocentric positions for the observer location
         
     Returns:
         dict: Yoga information including number, name, favorable status, and boundaries
@@ -191,7 +197,7 @@ def calculate_yoga(dt: datetime, lat: float, lon: float) -> dict:
             logger.info(f"Converted input datetime to UTC: {dt}")
         
         # Get Sun and Moon positions
-        sun_pos, moon_pos = get_sun_moon_positions(dt, lat, lon)
+        sun_pos, moon_pos = positions or get_sun_moon_positions(dt, lat, lon, topocentric)
         sun_longitude = sun_pos["longitude"]
         moon_longitude = moon_pos["longitude"]
         
@@ -204,12 +210,21 @@ def calculate_yoga(dt: datetime, lat: float, lon: float) -> dict:
         yoga_name = yoga_info["name"]
         yoga_favorable = yoga_info["favorable"]
         
+        if not boundaries:
+            return {
+                "number": yoga_num,
+                "name": yoga_name,
+                "favorable": yoga_favorable,
+                "start": None,
+                "end": None
+            }
+        
         # Find end time of current yoga
-        end_time = find_yoga_boundary(dt, lat, lon, yoga_num, 1)
+        end_time = find_yoga_boundary(dt, lat, lon, yoga_num, 1, topocentric=topocentric)
         
         # Find start time by finding end time of previous yoga
         prev_yoga = yoga_num - 1 if yoga_num > 1 else 27
-        start_time = find_yoga_boundary(end_time - timedelta(days=1), lat, lon, prev_yoga, 1)
+        start_time = find_yoga_boundary(end_time - timedelta(days=1), lat, lon, prev_yoga, 1, topocentric=topocentric)
         
         # Validate duration (yogas typically last between 22-26 hours)
         duration = (end_time - start_time).total_seconds()
@@ -1,43 +1,132 @@
-import os
-from datetime import datetime
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from datetime import datetime, tzinfo
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
+import asyncio
 import pytz
-import swisseph as swe
+import json
 import logging
 from pydantic import BaseModel
 from typing import Optional
 
-from models.request_models import PanchangaRequest
-from models.response_models import PanchangaResponse, SunPosition, MoonPosition, Times, VaraInfo, TithiInfo, Nakshatra, Yoga, Karana
-from utils.astronomy import get_sun_moon_positions, get_sunrise_sunset_times, PolarDayNightError
-from core.vara import calculate_vara
-from core.tithi import calculate_tithi
-from core.nakshatra import calculate_nakshatra
-from core.yoga import calculate_yoga
-from core.karana import calculate_karana
+from models.request_models import PanchangaRequest, CalendarRequest, EventSearchRequest, MuhurtaRequest, IngressRequest, LunarDateRequest, GregorianDateRequest, SegmentsRequest, MoonTimesRequest, GrahasRequest, parse_fields
+from models.response_models import PanchangaResponse, SunPosition, MoonPosition, Times, VaraInfo, TithiInfo, Nakshatra, Yoga, Karana, EventOccurrence, EventSearchResponse, MuhurtaResponse, IngressEvent, IngressResponse, MasaInfo, GregorianDateResponse, Chart, GrahasResponse
+from config import EPHE_PATH, EPHE_START_YEAR, EPHE_END_YEAR, EPHE_BODIES, EPHE_STRICT, WARMUP, MAX_CONCURRENCY, MAX_QUEUE, QUEUE_TIMEOUT, RATE_LIMIT, RATE_BURST, CLIENT_ID_HEADER, PROFILE_TOKEN, PROFILE_SAMPLE_RATE, PROFILE_INTERVAL_MS, PROFILE_DIR, PROFILE_KEEP, EPHE_BATCH_WINDOW_US, EPHE_BATCH_MAX, SNAPSHOT_PATH, SNAPSHOT_INTERVAL
+from core.panchanga import compute_panchanga, panchanga_key, round_datetime, warm_up
+from core.udaya import generate_calendar
+from core.segments import generate_segments
+from core.moon_times import generate_moon_times
+from core.subscriptions import KEEPALIVE_SECONDS, SUBSCRIPTION_LIMBS, hub, transition_message
+from core.events import resolve_targets, find_next_occurrences
+from core.ingress import RASHI_INFO, ingresses_for_year
+from core.grahas import compute_charts
+from core.masa import lunar_date, gregorian_date
+from core.muhurta import MUHURTA_LIMBS, allowed_values, find_muhurtas
+from core.timeline import LIMBS
+from utils.astronomy import datetime_to_jd, jd_to_iso, location_cell, set_ephemeris_batcher
+from utils.timezones import get_timezone
+from utils.admission import AdmissionController, AdmissionRejected, RateLimiter
+from utils.singleflight import SingleFlight
+from utils.batching import EphemerisBatcher
+from utils.snapshot import load_snapshot, save_snapshot
+from utils.ephemeris import check_ephemeris_coverage
+from utils.profiling import PROFILE_HEADER, Profiler, ProfilingMiddleware, run_in_threadpool
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize Swiss Ephemeris
-ephe_path = os.path.join(os.path.dirname(__file__), "ephe")
-logger.debug(f"Setting ephemeris path to: {ephe_path}")
-logger.debug(f"Ephemeris directory exists: {os.path.exists(ephe_path)}")
-logger.debug(f"Ephemeris directory contents: {os.listdir(ephe_path)}")
-swe.set_ephe_path(ephe_path)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # File check only (no ephemeris I/O): catches a bundle that does not
+    # cover the served years before requests silently fall back to Moshier
+    check_ephemeris_coverage(EPHE_PATH, EPHE_START_YEAR, EPHE_END_YEAR, EPHE_BODIES, EPHE_STRICT)
+    # The ephemeris and timezone index load lazily on first use; with
+    # VASTR_WARMUP set they are loaded before the first request instead
+    if WARMUP:
+        warm_up()
+    global batcher
+    if EPHE_BATCH_WINDOW_US > 0:
+        batcher = EphemerisBatcher(EPHE_BATCH_WINDOW_US / 1e6, EPHE_BATCH_MAX)
+        set_ephemeris_batcher(batcher)
+    # Restore the caches of the previous run before serving, and keep
+    # snapshotting them so that a crash loses at most one interval
+    snapshots = None
+    if SNAPSHOT_PATH:
+        await run_in_threadpool(load_snapshot, SNAPSHOT_PATH)
+        if SNAPSHOT_INTERVAL > 0:
+            snapshots = asyncio.create_task(snapshot_periodically(SNAPSHOT_PATH, SNAPSHOT_INTERVAL))
+    yield
+    await hub.close()
+    set_ephemeris_batcher(None)
+    if snapshots is not None:
+        snapshots.cancel()
+    if SNAPSHOT_PATH:
+        await run_in_threadpool(save_snapshot, SNAPSHOT_PATH)
 
-# Set Ayanamsa to Lahiri (Indian)
-swe.set_sid_mode(swe.SIDM_LAHIRI)
+async def snapshot_periodically(path: str, interval: float):
+    """Snapshot the caches every interval seconds."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(save_snapshot, path)
+        except Exception as e:
+            logger.error(f"Cache snapshot failed: {str(e)}")
 
 # Create FastAPI app
 app = FastAPI(
     title="Vastr Panchanga API",
     description="API for calculating Vedic astrological elements (Panchanga)",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Bounded pool for the ephemeris work of the computation endpoints
+admission = AdmissionController(MAX_CONCURRENCY, MAX_QUEUE, QUEUE_TIMEOUT,
+                                RateLimiter(RATE_LIMIT, RATE_BURST) if RATE_LIMIT > 0 else None)
+
+# Identical /panchanga computations in flight at the same time run once
+panchanga_flights = SingleFlight("panchanga")
+
+# Batches of the Sun/Moon positions of concurrent computations, if enabled
+batcher: Optional[EphemerisBatcher] = None
+
+# Sampled profiles of requests sent with the profiling token, or picked at random
+profiler = Profiler(PROFILE_TOKEN, PROFILE_SAMPLE_RATE, PROFILE_INTERVAL_MS / 1000, PROFILE_DIR, PROFILE_KEEP)
+
+def client_id(request: Request) -> Optional[str]:
+    """Client identity for the rate limit: the configured header, else the peer address."""
+    client = request.headers.get(CLIENT_ID_HEADER) if CLIENT_ID_HEADER else None
+    if client is None and request.client is not None:
+        client = request.client.host
+    return client
+
+def _local_timezone(latitude: Optional[float], longitude: Optional[float], local_time: bool) -> Optional[tzinfo]:
+    """Timezone of the location for local_time output, else None; may read the timezone index, so call it in a worker thread."""
+    return get_timezone(latitude, longitude) if local_time else None
+
+async def admission_slot(request: Request):
+    """Hold a computation slot for the duration of the request (including streaming)."""
+    started = await admission.acquire(client_id(request))
+    try:
+        yield
+    finally:
+        admission.release(started)
+
+async def run_admitted(func, *args, **kwargs):
+    """Run a blocking computation in a worker thread once a computation slot is free."""
+    started = await admission.acquire()
+    try:
+        return await run_in_threadpool(func, *args, **kwargs)
+    finally:
+        admission.release(started)
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected(request: Request, exc: AdmissionRejected):
+    detail = "Rate limit exceeded" if exc.status_code == 429 else "Server busy, retry later"
+    return JSONResponse(status_code=exc.status_code, content={"detail": detail}, headers={"Retry-After": str(exc.retry_after)})
+
 # Enable CORS
 app.add_middleware(
     CORSMiddleware,
@@ -47,61 +136,377 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-@app.post("/panchanga", response_model=PanchangaResponse)
-async def calculate_panchanga(request: PanchangaRequest):
+app.add_middleware(ProfilingMiddleware, profiler=profiler)
+
+@app.post("/panchanga", response_model=PanchangaResponse, response_model_exclude_unset=True)
+async def calculate_panchanga(
+    request: PanchangaRequest,
+    http_request: Request,
+    fields: Optional[str] = Query(None, description="Comma-separated parts to compute, e.g. tithi,nakshatra"),
+    boundaries: Optional[bool] = Query(None, description="Whether to compute limb start/end times"),
+):
     """
     Calculate Panchanga elements for a given datetime and location.
+
+    Only the parts named in `fields` are computed and returned; with
+    `boundaries=false` the limb start/end searches are skipped. Query
+    parameters take precedence over the same options in the body.
+
+    Concurrent requests with the same normalised inputs share one
+    computation; only that computation takes an admission slot.
     """
+    admission.check_rate(client_id(http_request))
+    try:
+        selected = parse_fields(fields) if fields is not None else request.fields
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if boundaries is None:
+        boundaries = request.boundaries
+
     try:
         # Convert datetime to UTC
         dt = datetime.fromisoformat(request.datetime.replace('Z', '+00:00'))
         if dt.tzinfo is None:
             dt = pytz.UTC.localize(dt)
+        if request.precision:
+            dt = round_datetime(dt, request.precision)
         
-        # Calculate positions
-        sun_pos, moon_pos = get_sun_moon_positions(dt, request.latitude, request.longitude)
-        
-        # Calculate sunrise and sunset. Если для координат/даты физически нет
-        # восхода/заката (полярный день/ночь), возвращаем их как null, но
-        # остальные элементы панчанги всё равно считаем.
+        options = dict(fields=selected, boundaries=boundaries, topocentric=request.topocentric, local_time=request.local_time)
+        key = panchanga_key(dt, request.latitude, request.longitude, **options)
+        result = await panchanga_flights.do(key, lambda: run_admitted(compute_panchanga, dt, request.latitude, request.longitude, **options))
+        return PanchangaResponse(**result)
+    except AdmissionRejected:
+        raise
+    except Exception as e:
+        logger.error(f"Error calculating Panchanga: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/calendar")
+async def calculate_calendar(request: CalendarRequest, _slot: None = Depends(admission_slot)):
+    """
+    Sunrise-anchored daily Panchanga for a location over a date range.
+
+    Streams one JSON object per line (NDJSON), one per local day, with the
+    limbs in force at that day's sunrise and their skipped (kshaya) and
+    repeated (vriddhi) flags.
+    """
+    try:
+        rows = await run_in_threadpool(generate_calendar, request.start_date, request.end_date, request.latitude, request.longitude, request.topocentric, request.local_time)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error calculating calendar: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return StreamingResponse((json.dumps(row) + "\n" for row in rows), media_type="application/x-ndjson")
+
+@app.post("/segments")
+async def calculate_segments(request: SegmentsRequest, _slot: None = Depends(admission_slot)):
+    """
+    Day-division segments (Rahu Kalam, Yamaganda, Gulika, Choghadiya, Hora)
+    for a location over a date range.
+
+    Streams one JSON object per line (NDJSON), one per local day. The
+    sunrise/sunset triples for the whole range come from a single sweep.
+    """
+    try:
+        rows = await run_in_threadpool(generate_segments, request.start_date, request.end_date or request.start_date, request.latitude, request.longitude, request.local_time)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error calculating segments: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return StreamingResponse((json.dumps(row) + "\n" for row in rows), media_type="application/x-ndjson")
+
+@app.post("/moon-times")
+async def calculate_moon_times(request: MoonTimesRequest, _slot: None = Depends(admission_slot)):
+    """
+    Moonrise and moonset for a location over a date range.
+
+    Streams one JSON object per line (NDJSON), one per local day; days on
+    which the Moon does not rise or set carry null for that event.
+    """
+    try:
+        rows = await run_in_threadpool(generate_moon_times, request.start_date, request.end_date or request.start_date, request.latitude, request.longitude, request.local_time)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error calculating moon times: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return StreamingResponse((json.dumps(row) + "\n" for row in rows), media_type="application/x-ndjson")
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.get("/subscribe")
+async def subscribe_transitions(
+    http_request: Request,
+    latitude: float = Query(..., ge=-90, le=90),
+    longitude: float = Query(..., ge=-180, le=180),
+    topocentric: bool = Query(False, description="Follow topocentric limbs for the location"),
+    local_time: bool = Query(False, description="Local timezone for output times"),
+):
+    """
+    Live limb and sunrise transitions as Server-Sent Events.
+
+    Sends the current panchanga as a `state` event, then a `transition`
+    event whenever the tithi, karana, nakshatra or yoga changes or the Sun
+    rises at the location, instead of the client polling /panchanga.
+
+    The stream counts against the client's rate limit, and its initial
+    solves take computation slots like any other request; if none is free
+    the stream ends with an `error` event carrying `retry_after`.
+    """
+    admission.check_rate(client_id(http_request))
+
+    async def stream():
+        # Registered inside the try, so the channels are released however the stream ends
+        subscription = None
         try:
-            sunrise_dt, sunset_dt = get_sunrise_sunset_times(dt, request.latitude, request.longitude)
-            sunrise_str = sunrise_dt.isoformat()
-            sunset_str = sunset_dt.isoformat()
-        except PolarDayNightError as e:
-            logger.warning(f"Polar day/night condition for request {request}: {e}")
-            sunrise_str = None
-            sunset_str = None
-        
-        # Calculate Vara
-        vara = calculate_vara(dt)
-        
-        # Calculate Tithi
-        tithi = calculate_tithi(dt, request.latitude, request.longitude)
-        
-        # Calculate Nakshatra
-        nakshatra = calculate_nakshatra(dt, request.latitude, request.longitude)
-        
-        # Calculate Yoga
-        yoga = calculate_yoga(dt, request.latitude, request.longitude)
-        
-        # Calculate Karana
-        karana = calculate_karana(dt, request.latitude, request.longitude)
-        
-        return PanchangaResponse(
-            sun=sun_pos,
-            moon=moon_pos,
-            times={"sunrise": sunrise_str, "sunset": sunset_str},
-            vara=vara,
-            tithi=tithi,
-            nakshatra=nakshatra,
-            yoga=yoga,
-            karana=karana
+            subscription = await hub.subscribe(latitude, longitude, topocentric, run=run_admitted)
+            tz, state = await run_admitted(lambda: (
+                _local_timezone(latitude, longitude, local_time),
+                compute_panchanga(datetime.now(pytz.UTC), latitude, longitude,
+                                  ("times", "vara") + SUBSCRIPTION_LIMBS, True, topocentric, local_time)))
+            yield _sse("state", state)
+            while True:
+                try:
+                    kind, payload = await asyncio.wait_for(subscription.queue.get(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield _sse("transition", transition_message(kind, payload, tz))
+        except AdmissionRejected as e:
+            # The response has started, so a rejection ends the stream instead of a 503
+            yield _sse("error", {"detail": "Server busy, retry later", "retry_after": e.retry_after})
+        except Exception as e:
+            # The response has started, so the error ends the stream instead of a 500
+            logger.error(f"Error streaming transitions: {str(e)}")
+            yield _sse("error", {"detail": str(e)})
+        finally:
+            if subscription is not None:
+                hub.unsubscribe(subscription)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@app.post("/events", response_model=EventSearchResponse)
+async def search_events(request: EventSearchRequest, _slot: None = Depends(admission_slot)):
+    """
+    Find the next occurrences of limb values from a start time.
+
+    E.g. the next Ekadashi (`{"limb": "tithi", "targets": ["Ekadashi"]}`),
+    Purnima (tithi 15) or Pushya nakshatra (nakshatra 8). An occurrence in
+    progress at the start time is included.
+    """
+    if (request.topocentric or request.local_time) and (request.latitude is None or request.longitude is None):
+        raise HTTPException(status_code=422, detail="Latitude and longitude are required for topocentric or local_time")
+    try:
+        numbers = resolve_targets(request.limb, request.targets)
+        start = datetime.fromisoformat(request.start.replace('Z', '+00:00'))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    try:
+        if start.tzinfo is None:
+            start = pytz.UTC.localize(start)
+        _, jd_start = datetime_to_jd(start)
+        # Topocentric limbs are evaluated at the location cell centre, as in compute_panchanga
+        lat, lon = location_cell(request.latitude, request.longitude) if request.topocentric else (0.0, 0.0)
+
+        tz, segments = await run_in_threadpool(lambda: (
+            _local_timezone(request.latitude, request.longitude, request.local_time),
+            find_next_occurrences(request.limb, numbers, jd_start, request.count, lat, lon, request.topocentric)))
+        info = LIMBS[request.limb].info
+        occurrences = [
+            EventOccurrence(
+                number=segment.number,
+                name=info[segment.number]["name"],
+                favorable=info[segment.number]["favorable"],
+                start=jd_to_iso(segment.start, tz),
+                end=jd_to_iso(segment.end, tz)
+            )
+            for segment in segments
+        ]
+        return EventSearchResponse(limb=request.limb, occurrences=occurrences)
+    except Exception as e:
+        logger.error(f"Error searching events: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/muhurta", response_model=MuhurtaResponse)
+async def search_muhurta(request: MuhurtaRequest, _slot: None = Depends(admission_slot)):
+    """
+    Find the windows in a date range where all given conditions hold.
+
+    Each of tithi, nakshatra, yoga, karana and vara takes an include list,
+    an exclude list and/or allowed `favorable` ratings; `daylight` restricts
+    the windows to sunrise-sunset ("day") or sunset-sunrise ("night").
+    """
+    try:
+        filters = {}
+        for limb in MUHURTA_LIMBS:
+            condition = getattr(request, limb)
+            if condition is not None:
+                filters[limb] = allowed_values(limb, condition.include, condition.exclude, condition.favorable)
+        windows = await run_in_threadpool(find_muhurtas, request.start_date, request.end_date, request.latitude, request.longitude, filters,
+                                request.daylight, request.min_duration_minutes, request.topocentric, request.local_time)
+        return MuhurtaResponse(windows=windows)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error searching muhurta: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/ingress", response_model=IngressResponse)
+async def calculate_ingress(request: IngressRequest, _slot: None = Depends(admission_slot)):
+    """
+    Sidereal sign ingresses of the Sun (sankrantis) and optionally the
+    planets and lunar nodes for a year.
+
+    Tables are solved once per body and year and then served from memory.
+    """
+    if request.local_time and (request.latitude is None or request.longitude is None):
+        raise HTTPException(status_code=422, detail="Latitude and longitude are required for local_time")
+    try:
+        tz, tables = await run_in_threadpool(lambda: (
+            _local_timezone(request.latitude, request.longitude, request.local_time),
+            ingresses_for_year(request.year, request.bodies)))
+        ingresses = {
+            body: [
+                IngressEvent(
+                    time=jd_to_iso(ingress.jd, tz),
+                    sign=ingress.sign,
+                    sign_name=RASHI_INFO[ingress.sign]["name"],
+                    previous_sign=ingress.previous,
+                    retrograde=ingress.retrograde,
+                    sankranti=f"{RASHI_INFO[ingress.sign]['name']} Sankranti" if body == "Sun" else None
+                )
+                for ingress in table
+            ]
+            for body, table in tables.items()
+        }
+        return IngressResponse(year=request.year, ingresses=ingresses)
+    except Exception as e:
+        logger.error(f"Error calculating ingresses: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _masa_info(jd: float, tz) -> MasaInfo:
+    info = lunar_date(jd)
+    info["start"], info["end"] = jd_to_iso(info["start"], tz), jd_to_iso(info["end"], tz)
+    return MasaInfo(**info)
+
+@app.post("/lunar-date", response_model=MasaInfo)
+async def convert_to_lunar_date(request: LunarDateRequest, _slot: None = Depends(admission_slot)):
+    """
+    Convert an instant to its lunisolar date: amanta masa (with adhika flag),
+    paksha, tithi and Vikram/Shaka samvat year.
+    """
+    if request.local_time and (request.latitude is None or request.longitude is None):
+        raise HTTPException(status_code=422, detail="Latitude and longitude are required for local_time")
+    try:
+        dt = datetime.fromisoformat(request.datetime.replace('Z', '+00:00'))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    try:
+        if dt.tzinfo is None:
+            dt = pytz.UTC.localize(dt)
+        jd = datetime_to_jd(dt)[1]
+        return await run_in_threadpool(lambda: _masa_info(jd, _local_timezone(request.latitude, request.longitude, request.local_time)))
+    except Exception as e:
+        logger.error(f"Error converting to lunar date: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/gregorian-date", response_model=GregorianDateResponse)
+async def convert_to_gregorian_date(request: GregorianDateRequest, _slot: None = Depends(admission_slot)):
+    """
+    Convert a lunisolar date (Vikram samvat, masa, paksha, tithi) to the
+    start and end of that tithi, e.g. Shukla Ekadashi of Kartika 2082.
+    """
+    if request.local_time and (request.latitude is None or request.longitude is None):
+        raise HTTPException(status_code=422, detail="Latitude and longitude are required for local_time")
+    try:
+        result = await run_in_threadpool(gregorian_date, request.vikram_samvat, request.masa, request.tithi, request.paksha, request.adhika)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    try:
+        def convert():
+            tz = _local_timezone(request.latitude, request.longitude, request.local_time)
+            return tz, _masa_info(result["start"] + 1e-6, tz)
+
+        tz, masa = await run_in_threadpool(convert)
+        return GregorianDateResponse(
+            tithi=result["tithi"],
+            tithi_name=result["tithi_name"],
+            paksha=result["paksha"],
+            start=jd_to_iso(result["start"], tz),
+            end=jd_to_iso(result["end"], tz),
+            masa=masa
         )
     except Exception as e:
-        logger.error(f"Error calculating Panchanga: {str(e)}")
+        logger.error(f"Error converting to Gregorian date: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/grahas", response_model=GrahasResponse)
+async def calculate_grahas(request: GrahasRequest, _slot: None = Depends(admission_slot)):
+    """
+    Sidereal positions of the grahas (Sun through Saturn, Rahu and Ketu),
+    the ascendant and the whole-sign house cusps, with sign, nakshatra and
+    pada, for one or many instants.
+
+    Each instant is converted once and all requested bodies are evaluated
+    together.
+    """
+    def charts_for_instants():
+        instants = []
+        for value in request.datetimes:
+            dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+            instants.append(dt if dt.tzinfo is not None else pytz.UTC.localize(dt))
+        jds = [datetime_to_jd(dt)[1] for dt in instants]
+        return (instants, _local_timezone(request.latitude, request.longitude, request.local_time),
+                compute_charts(jds, request.latitude, request.longitude, request.grahas, request.ascendant))
+
+    try:
+        instants, tz, charts = await run_in_threadpool(charts_for_instants)
+        return GrahasResponse(charts=[
+            Chart(datetime=(dt.astimezone(tz) if tz else dt).isoformat(), **chart)
+            for dt, chart in zip(instants, charts)
+        ])
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error calculating grahas: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/profiles/{profile_id}")
+async def get_profile(
+    profile_id: str,
+    http_request: Request,
+    format: str = Query("speedscope", description="speedscope (JSON) or collapsed (folded stacks)"),
+):
+    """
+    A stored request profile, for the profiling token in the X-Vastr-Profile header.
+
+    Open speedscope files at https://www.speedscope.app; collapsed stacks
+    work with flamegraph.pl and most flame graph viewers.
+    """
+    if not profiler.authorized(http_request.headers.get(PROFILE_HEADER)):
+        raise HTTPException(status_code=403, detail="Profiling token required")
+    if format not in ("speedscope", "collapsed"):
+        raise HTTPException(status_code=422, detail="Format must be speedscope or collapsed")
+    path = profiler.path(profile_id, format)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="application/json" if format == "speedscope" else "text/plain")
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Admission control, request coalescing and ephemeris batching metrics in Prometheus text format."""
+    text = admission.metrics_text() + panchanga_flights.metrics_text() + (batcher.metrics_text() if batcher is not None else "")
+    return PlainTextResponse(text, media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000) 
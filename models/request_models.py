@@ -1,10 +1,68 @@
-from typing import Optional
+from datetime import date
+from typing import List, Optional, Union
 from pydantic import BaseModel, field_validator
 
+from core.panchanga import PANCHANGA_FIELDS, OPTIONAL_FIELDS
+from core.events import MAX_OCCURRENCES
+from core.ingress import INGRESS_BODIES, MIN_YEAR, MAX_YEAR
+from core.grahas import MAX_CHART_INSTANTS, resolve_grahas
+
+def parse_fields(value: Union[str, List[str], None]) -> Optional[List[str]]:
+    """
+    Normalise a field selection given either as a list or as a
+    comma-separated string (e.g. "tithi,nakshatra").
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.split(",")
+    fields = [field.strip().lower() for field in value if field.strip()]
+    allowed = PANCHANGA_FIELDS + OPTIONAL_FIELDS
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(allowed)}")
+    return fields
+
 class PanchangaRequest(BaseModel):
     datetime: str
     latitude: float
     longitude: float
+    fields: Optional[List[str]] = None  # Parts to compute, all when omitted
+    boundaries: bool = True  # Whether to compute limb start/end times
+    topocentric: bool = False  # Topocentric Sun/Moon for the observer location
+    local_time: bool = False  # Local timezone for day boundaries and output times
+    precision: Optional[float] = None  # Round the datetime to this many seconds
+
+    @field_validator('latitude')
+    def validate_latitude(cls, v):
+        if not -90 <= v <= 90:
+            raise ValueError('Latitude must be between -90 and 90')
+        return v
+
+    @field_validator('longitude')
+    def validate_longitude(cls, v):
+        if not -180 <= v <= 180:
+            raise ValueError('Longitude must be between -180 and 180')
+        return v
+
+    @field_validator('fields', mode='before')
+    def validate_fields(cls, v):
+        return parse_fields(v)
+
+    @field_validator('precision')
+    def validate_precision(cls, v):
+        if v is not None and not 0 < v <= 86400:
+            raise ValueError('Precision must be between 0 and 86400 seconds')
+        return v
+
+
+class CalendarRequest(BaseModel):
+    start_date: date  # First local calendar date (YYYY-MM-DD)
+    end_date: date  # Last local calendar date, inclusive
+    latitude: float
+    longitude: float
+    topocentric: bool = False  # Topocentric Sun/Moon for the observer location
+    local_time: bool = False  # Local timezone for day boundaries and output times
 
     @field_validator('latitude')
     def validate_latitude(cls, v):
@@ -16,4 +74,227 @@ class PanchangaRequest(BaseModel):
     def validate_longitude(cls, v):
         if not -180 <= v <= 180:
             raise ValueError('Longitude must be between -180 and 180')
-        return v 
\ No newline at end of file
+        return v
+
+
+class EventSearchRequest(BaseModel):
+    limb: str  # tithi, karana, nakshatra or yoga
+    targets: List[Union[int, str]]  # Limb numbers and/or names, e.g. [11, 26] or ["Ekadashi"]
+    start: str  # ISO datetime to search from
+    count: int = 1  # Number of occurrences to return
+    latitude: Optional[float] = None  # Required for topocentric and local_time
+    longitude: Optional[float] = None
+    topocentric: bool = False  # Topocentric Sun/Moon for the observer location
+    local_time: bool = False  # Local timezone for output times
+
+    @field_validator('limb')
+    def validate_limb(cls, v):
+        v = v.strip().lower()
+        if v not in ("tithi", "karana", "nakshatra", "yoga"):
+            raise ValueError('Limb must be one of tithi, karana, nakshatra, yoga')
+        return v
+
+    @field_validator('count')
+    def validate_count(cls, v):
+        if not 1 <= v <= MAX_OCCURRENCES:
+            raise ValueError(f'Count must be between 1 and {MAX_OCCURRENCES}')
+        return v
+
+    @field_validator('latitude')
+    def validate_latitude(cls, v):
+        if v is not None and not -90 <= v <= 90:
+            raise ValueError('Latitude must be between -90 and 90')
+        return v
+
+    @field_validator('longitude')
+    def validate_longitude(cls, v):
+        if v is not None and not -180 <= v <= 180:
+            raise ValueError('Longitude must be between -180 and 180')
+        return v
+
+
+class LimbFilter(BaseModel):
+    include: Optional[List[Union[int, str]]] = None  # Allowed numbers/names, all when omitted
+    exclude: Optional[List[Union[int, str]]] = None  # Numbers/names to rule out
+    favorable: Optional[List[str]] = None  # Allowed ratings, e.g. ["Favorable", "Neutral"]
+
+
+class MuhurtaRequest(BaseModel):
+    start_date: date  # First local calendar date (YYYY-MM-DD)
+    end_date: date  # Last local calendar date, inclusive
+    latitude: float
+    longitude: float
+    tithi: Optional[LimbFilter] = None
+    nakshatra: Optional[LimbFilter] = None
+    yoga: Optional[LimbFilter] = None
+    karana: Optional[LimbFilter] = None
+    vara: Optional[LimbFilter] = None  # Vara names, Sanskrit (Shani) or English (Saturday)
+    daylight: Optional[str] = None  # "day" (sunrise to sunset) or "night"
+    min_duration_minutes: float = 0  # Drop shorter windows
+    topocentric: bool = False  # Topocentric Sun/Moon for the observer location
+    local_time: bool = False  # Local timezone for day boundaries and output times
+
+    @field_validator('latitude')
+    def validate_latitude(cls, v):
+        if not -90 <= v <= 90:
+            raise ValueError('Latitude must be between -90 and 90')
+        return v
+
+    @field_validator('longitude')
+    def validate_longitude(cls, v):
+        if not -180 <= v <= 180:
+            raise ValueError('Longitude must be between -180 and 180')
+        return v
+
+    @field_validator('daylight')
+    def validate_daylight(cls, v):
+        if v is not None and v not in ("day", "night"):
+            raise ValueError('Daylight must be day or night')
+        return v
+
+
+class IngressRequest(BaseModel):
+    year: int
+    bodies: List[str] = ["Sun"]  # Any of Sun, Mars, Mercury, Jupiter, Venus, Saturn, Rahu, Ketu
+    latitude: Optional[float] = None  # Required for local_time
+    longitude: Optional[float] = None
+    local_time: bool = False  # Local timezone for output times
+
+    @field_validator('year')
+    def validate_year(cls, v):
+        if not MIN_YEAR <= v <= MAX_YEAR:
+            raise ValueError(f'Year must be between {MIN_YEAR} and {MAX_YEAR}')
+        return v
+
+    @field_validator('bodies')
+    def validate_bodies(cls, v):
+        names = {name.lower(): name for name in INGRESS_BODIES}
+        unknown = [body for body in v if body.strip().lower() not in names]
+        if unknown:
+            raise ValueError(f"Unknown bodies: {', '.join(unknown)}. Allowed: {', '.join(INGRESS_BODIES)}")
+        return [names[body.strip().lower()] for body in v]
+
+    @field_validator('latitude')
+    def validate_latitude(cls, v):
+        if v is not None and not -90 <= v <= 90:
+            raise ValueError('Latitude must be between -90 and 90')
+        return v
+
+    @field_validator('longitude')
+    def validate_longitude(cls, v):
+        if v is not None and not -180 <= v <= 180:
+            raise ValueError('Longitude must be between -180 and 180')
+        return v
+
+
+class LunarDateRequest(BaseModel):
+    datetime: str
+    latitude: Optional[float] = None  # Required for local_time
+    longitude: Optional[float] = None
+    local_time: bool = False  # Local timezone for output times
+
+    @field_validator('latitude')
+    def validate_latitude(cls, v):
+        if v is not None and not -90 <= v <= 90:
+            raise ValueError('Latitude must be between -90 and 90')
+        return v
+
+    @field_validator('longitude')
+    def validate_longitude(cls, v):
+        if v is not None and not -180 <= v <= 180:
+            raise ValueError('Longitude must be between -180 and 180')
+        return v
+
+
+class GregorianDateRequest(BaseModel):
+    vikram_samvat: int
+    masa: Union[int, str]  # 1 (Chaitra) - 12 (Phalguna) or name
+    tithi: Union[int, str]  # 1-30, 1-15 with paksha, or name
+    paksha: Optional[str] = None  # Shukla or Krishna
+    adhika: bool = False  # Date in the adhika month of that name
+    latitude: Optional[float] = None  # Required for local_time
+    longitude: Optional[float] = None
+    local_time: bool = False  # Local timezone for output times
+
+    @field_validator('latitude')
+    def validate_latitude(cls, v):
+        if v is not None and not -90 <= v <= 90:
+            raise ValueError('Latitude must be between -90 and 90')
+        return v
+
+    @field_validator('longitude')
+    def validate_longitude(cls, v):
+        if v is not None and not -180 <= v <= 180:
+            raise ValueError('Longitude must be between -180 and 180')
+        return v
+
+
+class SegmentsRequest(BaseModel):
+    start_date: date  # First local calendar date (YYYY-MM-DD)
+    end_date: Optional[date] = None  # Last local calendar date, inclusive (start_date when omitted)
+    latitude: float
+    longitude: float
+    local_time: bool = False  # Local timezone for day boundaries and output times
+
+    @field_validator('latitude')
+    def validate_latitude(cls, v):
+        if not -90 <= v <= 90:
+            raise ValueError('Latitude must be between -90 and 90')
+        return v
+
+    @field_validator('longitude')
+    def validate_longitude(cls, v):
+        if not -180 <= v <= 180:
+            raise ValueError('Longitude must be between -180 and 180')
+        return v
+
+
+class MoonTimesRequest(BaseModel):
+    start_date: date  # First local calendar date (YYYY-MM-DD)
+    end_date: Optional[date] = None  # Last local calendar date, inclusive (start_date when omitted)
+    latitude: float
+    longitude: float
+    local_time: bool = False  # Local timezone for day boundaries and output times
+
+    @field_validator('latitude')
+    def validate_latitude(cls, v):
+        if not -90 <= v <= 90:
+            raise ValueError('Latitude must be between -90 and 90')
+        return v
+
+    @field_validator('longitude')
+    def validate_longitude(cls, v):
+        if not -180 <= v <= 180:
+            raise ValueError('Longitude must be between -180 and 180')
+        return v
+
+
+class GrahasRequest(BaseModel):
+    datetimes: List[str]  # Instants (ISO 8601, UTC when no offset)
+    latitude: float
+    longitude: float
+    grahas: Optional[List[str]] = None  # Any of Sun, Moon, Mars, Mercury, Jupiter, Venus, Saturn, Rahu, Ketu (all when omitted)
+    ascendant: bool = True  # Include the ascendant (lagna) and house cusps
+    local_time: bool = False  # Local timezone for output times
+
+    @field_validator('datetimes')
+    def validate_datetimes(cls, v):
+        if not 1 <= len(v) <= MAX_CHART_INSTANTS:
+            raise ValueError(f'Between 1 and {MAX_CHART_INSTANTS} datetimes are required')
+        return v
+
+    @field_validator('grahas')
+    def validate_grahas(cls, v):
+        return resolve_grahas(v) if v is not None else v
+
+    @field_validator('latitude')
+    def validate_latitude(cls, v):
+        if not -90 <= v <= 90:
+            raise ValueError('Latitude must be between -90 and 90')
+        return v
+
+    @field_validator('longitude')
+    def validate_longitude(cls, v):
+        if not -180 <= v <= 180:
+            raise ValueError('Longitude must be between -180 and 180')
+        return v
@@ -23,15 +23,15 @@ class TithiInfo(BaseModel):
     number: int
     name: str
     favorable: str  # Favorable, Unfavorable, or Neutral
-    start: str
-    end: str
+    start: Optional[str]  # null when boundaries are not requested
+    end: Optional[str]
 
 class Nakshatra(BaseModel):
     number: int
     name: str
     favorable: str  # Favorable, Unfavorable, or Neutral
-    start: str
-    end: str
+    start: Optional[str]  # null when boundaries are not requested
+    end: Optional[str]
     constellation: str  # Current moon constellation
 
 class CelestialPosition(BaseModel):
@@ -46,22 +46,126 @@ class Yoga(BaseModel):
     number: int
     name: str
     favorable: str  # Favorable, Unfavorable, or Neutral
-    start: str
-    end: str
+    start: Optional[str]  # null when boundaries are not requested
+    end: Optional[str]
 
 class Karana(BaseModel):
     number: int
     name: str
     favorable: str  # Favorable or Unfavorable
+    start: Optional[str]  # null when boundaries are not requested
+    end: Optional[str]
+
+class MasaInfo(BaseModel):
+    masa: int  # 1 (Chaitra) - 12 (Phalguna), amanta
+    name: str
+    adhika: bool  # Intercalary month
+    paksha: str  # Shukla or Krishna
+    tithi: int
+    tithi_name: str
+    vikram_samvat: int
+    shaka_samvat: int
+    start: str  # Starting new moon of the month
+    end: str  # Next new moon
+
+class TimeSpan(BaseModel):
     start: str
     end: str
 
+class ChoghadiyaPeriod(BaseModel):
+    name: str
+    favorable: str  # Favorable, Unfavorable, or Neutral
+    start: str
+    end: str
+
+class HoraPeriod(BaseModel):
+    lord: str  # Planet ruling the hora
+    start: str
+    end: str
+
+class DaySegments(BaseModel):
+    rahu_kalam: TimeSpan
+    yamaganda: TimeSpan
+    gulika: TimeSpan
+    choghadiya: Dict[str, List[ChoghadiyaPeriod]]  # "day" and "night", 8 each
+    hora: List[HoraPeriod]  # 12 day horas then 12 night horas
+
 class PanchangaResponse(BaseModel):
-    sun: SunPosition
-    moon: MoonPosition
-    times: Dict[str, Optional[str]]
-    vara: VaraInfo
-    tithi: TithiInfo
-    nakshatra: Nakshatra
-    yoga: Yoga
-    karana: Karana
+    # Every part is optional: only the requested fields are returned
+    sun: Optional[SunPosition] = None
+    moon: Optional[MoonPosition] = None
+    times: Optional[Dict[str, Optional[str]]] = None
+    vara: Optional[VaraInfo] = None
+    tithi: Optional[TithiInfo] = None
+    nakshatra: Optional[Nakshatra] = None
+    yoga: Optional[Yoga] = None
+    karana: Optional[Karana] = None
+    masa: Optional[MasaInfo] = None  # Only when requested in fields
+    segments: Optional[DaySegments] = None  # Only when requested in fields
+    moon_times: Optional[Dict[str, Optional[str]]] = None  # moonrise/moonset, only when requested
+
+class EventOccurrence(BaseModel):
+    number: int
+    name: str
+    favorable: str  # Favorable, Unfavorable, or Neutral
+    start: str
+    end: str
+
+class EventSearchResponse(BaseModel):
+    limb: str
+    occurrences: List[EventOccurrence]
+
+class MuhurtaWindow(BaseModel):
+    start: str
+    end: str
+    duration_minutes: float
+
+class MuhurtaResponse(BaseModel):
+    windows: List[MuhurtaWindow]
+
+class IngressEvent(BaseModel):
+    time: str
+    sign: int  # Sign entered (1-12, Mesha = 1)
+    sign_name: str
+    previous_sign: int
+    retrograde: bool
+    sankranti: Optional[str] = None  # Sun only, e.g. "Makara Sankranti"
+
+class IngressResponse(BaseModel):
+    year: int
+    ingresses: Dict[str, List[IngressEvent]]  # Body name -> ingresses
+
+class GregorianDateResponse(BaseModel):
+    tithi: int
+    tithi_name: str
+    paksha: str
+    start: str  # Tithi start
+    end: str  # Tithi end
+    masa: MasaInfo  # Month details, as of the tithi start
+
+class ZodiacPosition(BaseModel):
+    longitude: float  # Sidereal longitude in degrees
+    sign: int  # 1-12, Mesha = 1
+    sign_name: str
+    degree: float  # Degrees within the sign
+    nakshatra: int  # 1-27
+    nakshatra_name: str
+    pada: int  # 1-4
+
+class GrahaPosition(ZodiacPosition):
+    latitude: float  # Ecliptic latitude in degrees
+    speed: float  # Degrees per day
+    retrograde: bool
+
+class Houses(BaseModel):
+    system: str  # House system of the cusps, e.g. whole_sign
+    cusps: List[ZodiacPosition]  # Cusps of houses 1-12
+
+class Chart(BaseModel):
+    datetime: str
+    grahas: Dict[str, GrahaPosition]  # Graha name -> position
+    ascendant: Optional[ZodiacPosition] = None
+    houses: Optional[Houses] = None
+
+class GrahasResponse(BaseModel):
+    charts: List[Chart]
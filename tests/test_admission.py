@@ -0,0 +1,141 @@
+import asyncio
+import time
+import pytest
+from starlette.requests import Request
+import main
+from utils.admission import AdmissionController, AdmissionRejected, RateLimiter
+
+"""
+Admission control: rejections with Retry-After, and slots given back on
+every way out of a request (completion, error, timeout, cancellation).
+"""
+
+
+def _request(client: str = "203.0.113.7") -> Request:
+    return Request({"type": "http", "method": "POST", "path": "/", "headers": [], "client": (client, 1234)})
+
+
+def _assert_idle(controller: AdmissionController):
+    assert controller.in_flight == 0
+    assert controller.queued == 0
+    assert controller._semaphore._value == controller.max_concurrency
+
+
+@pytest.fixture
+def admission(monkeypatch):
+    """Replace the app's controller with one slot, one queue place and a short timeout."""
+    controller = AdmissionController(1, 1, 0.05, RateLimiter(1.0, 1.0))
+    monkeypatch.setattr(main, "admission", controller)
+    return controller
+
+
+def test_full_queue_is_rejected_with_503():
+    async def scenario():
+        controller = AdmissionController(1, 0, 5.0)
+        started = await controller.acquire()
+        with pytest.raises(AdmissionRejected) as rejected:
+            await controller.acquire()
+        controller.release(started)
+        return controller, rejected.value
+
+    controller, rejected = asyncio.run(scenario())
+    assert (rejected.status_code, rejected.reason) == (503, "queue_full")
+    assert rejected.retry_after >= 1
+    _assert_idle(controller)
+
+
+def test_queue_timeout_is_rejected_and_frees_its_place():
+    async def scenario():
+        controller = AdmissionController(1, 1, 0.05)
+        started = await controller.acquire()
+        with pytest.raises(AdmissionRejected) as rejected:
+            await controller.acquire()
+        assert controller.queued == 0
+        controller.release(started)
+        controller.release(await controller.acquire())
+        return controller, rejected.value
+
+    controller, rejected = asyncio.run(scenario())
+    assert (rejected.status_code, rejected.reason) == (503, "queue_timeout")
+    assert controller.rejected["queue_timeout"] == 1
+    _assert_idle(controller)
+
+
+def test_rate_limit_is_rejected_with_429_per_client():
+    async def scenario():
+        controller = AdmissionController(4, 4, 5.0, RateLimiter(1.0, 1.0))
+        controller.release(await controller.acquire("a"))
+        with pytest.raises(AdmissionRejected) as rejected:
+            await controller.acquire("a")
+        controller.release(await controller.acquire("b"))
+        return controller, rejected.value
+
+    controller, rejected = asyncio.run(scenario())
+    assert (rejected.status_code, rejected.reason, rejected.retry_after) == (429, "rate_limit", 1)
+    _assert_idle(controller)
+
+
+def test_cancelled_waiter_takes_no_slot():
+    async def scenario():
+        controller = AdmissionController(1, 1, 5.0)
+        started = await controller.acquire()
+        waiter = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0.01)
+        assert controller.queued == 1
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        controller.release(started)
+        return controller
+
+    _assert_idle(asyncio.run(scenario()))
+
+
+def test_rejections_carry_retry_after():
+    for status_code, reason in ((503, "queue_full"), (429, "rate_limit")):
+        response = asyncio.run(main.admission_rejected(_request(), AdmissionRejected(status_code, reason, 7)))
+        assert response.status_code == status_code
+        assert response.headers["Retry-After"] == "7"
+
+
+def test_request_slot_is_released_after_the_request(admission):
+    async def scenario():
+        slot = main.admission_slot(_request())
+        await slot.__anext__()
+        assert admission.in_flight == 1
+        await slot.aclose()
+
+    asyncio.run(scenario())
+    _assert_idle(admission)
+
+
+def test_request_slot_applies_the_client_rate_limit(admission):
+    async def scenario():
+        slot = main.admission_slot(_request())
+        await slot.__anext__()
+        await slot.aclose()
+        with pytest.raises(AdmissionRejected) as rejected:
+            await main.admission_slot(_request()).__anext__()
+        return rejected.value
+
+    assert asyncio.run(scenario()).status_code == 429
+    _assert_idle(admission)
+
+
+def test_run_admitted_releases_on_error_and_cancel(admission):
+    def fail():
+        raise ValueError("boom")
+
+    async def scenario():
+        with pytest.raises(ValueError):
+            await main.run_admitted(fail)
+        _assert_idle(admission)
+        task = asyncio.create_task(main.run_admitted(time.sleep, 0.2))
+        await asyncio.sleep(0.05)
+        assert admission.in_flight == 1
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(scenario())
+    _assert_idle(admission)
@@ -0,0 +1,58 @@
+from datetime import datetime, timezone
+import numpy as np
+import pytest
+from core.arrays import ARRAY_LIMBS, panchanga_array
+from core.panchanga import compute_panchanga
+from utils.astronomy import jd_to_iso
+
+"""
+Cross-checks of the array API against compute_panchanga, row by row.
+"""
+
+# Vara names in datetime.weekday() order, as in the array's vara field
+VARAS = ("Soma", "Mangala", "Budha", "Guru", "Shukra", "Shani", "Ravi")
+
+# Boundary times of the two paths may differ by the solver tolerance
+BOUNDARY_TOLERANCE_SECONDS = 0.05
+
+# Instants including one whose tithi ends more than a day later
+INSTANTS = [datetime(2024, 1, 26, 20, 6, tzinfo=timezone.utc).timestamp(),
+            datetime(2024, 3, 9, 19, 30, tzinfo=timezone.utc).timestamp()]
+INSTANTS += np.random.default_rng(7).uniform(datetime(1990, 1, 1, tzinfo=timezone.utc).timestamp(),
+                                             datetime(2060, 1, 1, tzinfo=timezone.utc).timestamp(), 40).tolist()
+
+
+def _seconds(iso: str) -> float:
+    return datetime.fromisoformat(iso).timestamp()
+
+
+def _assert_rows_match(rows: np.ndarray, timestamps, lat: float, lon: float, local_time: bool = False):
+    for timestamp, row in zip(timestamps, rows):
+        expected = compute_panchanga(datetime.fromtimestamp(timestamp, timezone.utc), lat, lon,
+                                     fields=("vara",) + ARRAY_LIMBS, local_time=local_time)
+        assert VARAS[row["vara"]] == expected["vara"]["vara"]
+        for limb in ARRAY_LIMBS:
+            assert row[limb] == expected[limb]["number"], (timestamp, limb)
+            for edge in ("start", "end"):
+                difference = _seconds(jd_to_iso(row[f"{limb}_{edge}"])) - _seconds(expected[limb][edge])
+                assert abs(difference) < BOUNDARY_TOLERANCE_SECONDS, (timestamp, limb, edge, difference)
+
+
+def test_geocentric_rows_match_compute_panchanga():
+    _assert_rows_match(panchanga_array(INSTANTS), INSTANTS, 0.0, 0.0)
+
+
+def test_local_time_vara_matches_compute_panchanga():
+    rows = panchanga_array(INSTANTS, lat=28.6, lon=77.2, local_time=True)
+    _assert_rows_match(rows, INSTANTS, 28.6, 77.2, local_time=True)
+
+
+def test_without_boundaries_leaves_them_nan():
+    rows = panchanga_array(INSTANTS[:3], boundaries=False)
+    assert np.isnan(rows["tithi_start"]).all() and np.isnan(rows["yoga_end"]).all()
+    assert (rows["tithi"] == panchanga_array(INSTANTS[:3])["tithi"]).all()
+
+
+def test_rejects_non_finite_timestamps():
+    with pytest.raises(ValueError):
+        panchanga_array([0.0, float("nan")])
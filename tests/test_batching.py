@@ -0,0 +1,68 @@
+import threading
+import numpy as np
+import pytest
+import swisseph as swe
+import utils.astronomy as astronomy
+import utils.batching as batching
+from utils.batching import EphemerisBatcher
+
+"""
+Batched Sun/Moon positions against Swiss Ephemeris evaluated point by point.
+"""
+
+# Concurrent computations, each submitting its points one at a time
+THREADS = 48
+
+POINTS_PER_THREAD = 6
+
+# Observer of the topocentric computations, with a fixed elevation
+LAT, LON, ELEVATION = 28.6, 77.2, 216.0
+
+
+def _reference(jd_ut: float, topocentric: bool) -> tuple:
+    astronomy.ensure_ephemeris()
+    flags = astronomy.CALC_FLAGS | swe.FLG_SIDEREAL | swe.FLG_SPEED
+    if topocentric:
+        swe.set_topo(LON, LAT, ELEVATION)
+        flags |= swe.FLG_TOPOCTR
+    sun = swe.calc_ut(jd_ut, swe.SUN, flags)[0]
+    moon = swe.calc_ut(jd_ut, swe.MOON, flags)[0]
+    return sun[0], sun[3], moon[0], moon[3]
+
+
+@pytest.mark.parametrize("array_min_points", [1, 10 ** 6], ids=["arrays", "one-by-one"])
+def test_batched_positions_equal_calc_ut(monkeypatch, array_min_points):
+    monkeypatch.setattr(batching, "ARRAY_MIN_POINTS", array_min_points)
+    monkeypatch.setattr(astronomy, "get_longitude_series", lambda: None)
+    monkeypatch.setattr(astronomy, "lookup_elevation", lambda lat, lon: (ELEVATION, True))
+    batcher = EphemerisBatcher(window=0.05, max_batch=THREADS)
+
+    # Each round's instants lie within seconds of each other, so a batch holds
+    # more geocentric points than the hours they fall in (the case the grid
+    # interpolation of get_sun_moon_longitude_arrays would take), and the
+    # first and last geocentric threads submit identical points, as coalesced
+    # solvers do
+    bases = np.random.default_rng(11).uniform(2451545.0, 2469807.0, POINTS_PER_THREAD)
+    points = [[(float(base + (thread // 2 % (THREADS // 2 - 1)) * 1e-4), thread % 2 == 1) for base in bases]
+              for thread in range(THREADS)]
+    results = [[] for _ in range(THREADS)]
+    start = threading.Barrier(THREADS)
+
+    def compute(thread: int):
+        start.wait()
+        for jd_ut, topocentric in points[thread]:
+            if topocentric:
+                results[thread].append(batcher.sun_moon(jd_ut, LAT, LON, topocentric=True))
+            else:
+                results[thread].append(batcher.sun_moon(jd_ut))
+
+    threads = [threading.Thread(target=compute, args=(thread,)) for thread in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert batcher.batches > 0 and batcher.points > batcher.batches
+    for thread in range(THREADS):
+        for (jd_ut, topocentric), result in zip(points[thread], results[thread]):
+            assert tuple(result) == _reference(jd_ut, topocentric), (thread, jd_ut, topocentric)
@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta, timezone
+from core.panchanga import compute_panchanga
+from utils.astronomy import get_sun_day_times
+
+"""
+Day boundaries of the per-location-day sunrise/sunset and moon time results.
+"""
+
+LAT, LON = 28.6, 77.2
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+
+def test_day_follows_the_utc_date_whatever_the_offset():
+    # 2024-03-10T02:00+05:30 is 2024-03-09T20:30Z: the day is March 9 (UTC)
+    early = get_sun_day_times(datetime(2024, 3, 10, 2, 0, tzinfo=IST), LAT, LON)
+    same_instant = get_sun_day_times(datetime(2024, 3, 9, 20, 30, tzinfo=timezone.utc), LAT, LON)
+    next_day = get_sun_day_times(datetime(2024, 3, 10, 12, 0, tzinfo=timezone.utc), LAT, LON)
+    assert early == same_instant
+    assert early[0].date().isoformat() == "2024-03-09"
+    assert next_day[0].date().isoformat() == "2024-03-10"
+    assert next_day[0] - early[0] > timedelta(hours=23)
+
+
+def _utc_date(iso: str) -> str:
+    return datetime.fromisoformat(iso).astimezone(timezone.utc).date().isoformat()
+
+
+def _local_date(iso: str) -> str:
+    return datetime.fromisoformat(iso).date().isoformat()
+
+
+def test_panchanga_moon_times_share_the_sunrise_day():
+    result = compute_panchanga(datetime(2024, 3, 10, 2, 0, tzinfo=IST), LAT, LON, fields=("times", "moon_times"))
+    day = _utc_date(result["times"]["sunrise"])
+    assert day == _utc_date(result["times"]["sunset"]) == "2024-03-09"
+    for event in ("moonrise", "moonset"):
+        if result["moon_times"][event]:
+            assert _utc_date(result["moon_times"][event]) == day, event
+
+
+def test_panchanga_moon_times_share_the_local_day():
+    result = compute_panchanga(datetime(2024, 3, 10, 2, 0, tzinfo=IST), LAT, LON, fields=("times", "moon_times"),
+                               local_time=True)
+    day = _local_date(result["times"]["sunrise"])
+    assert day == "2024-03-10"
+    for event in ("moonrise", "moonset"):
+        if result["moon_times"][event]:
+            assert _local_date(result["moon_times"][event]) == day, event
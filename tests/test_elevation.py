@@ -0,0 +1,74 @@
+from datetime import datetime, timezone
+import pytest
+import requests
+import utils.astronomy as astronomy
+
+"""
+Elevation lookups and the caches of results derived from them.
+"""
+
+LAT, LON = -33.87, 151.21
+
+DAY = datetime(2024, 3, 1, tzinfo=timezone.utc)
+
+ELEVATION = 58.0
+
+
+class StubAPI:
+    """Stand-in for requests.get on the elevation API; counts calls and can fail."""
+
+    def __init__(self):
+        self.calls = 0
+        self.failing = False
+
+    def __call__(self, url, timeout):
+        self.calls += 1
+        if self.failing:
+            raise requests.ConnectionError("unreachable")
+        return self
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"status": "OK", "results": [{"elevation": ELEVATION}]}
+
+
+@pytest.fixture
+def api(monkeypatch):
+    stub = StubAPI()
+    monkeypatch.setattr(requests, "get", stub)
+    for cache in (astronomy._elevation_cache, astronomy._elevation_retry_at, astronomy._sun_day_cache,
+                  astronomy._sun_day_series_cache, astronomy._moon_day_cache):
+        cache.clear()
+    return stub
+
+
+def _day_key(tz=None):
+    return astronomy._location_day_key(LAT, LON, DAY.date(), tz)
+
+
+def test_fallback_results_are_not_cached(api):
+    api.failing = True
+    assert astronomy.lookup_elevation(LAT, LON) == (0.0, False)
+    astronomy.get_sun_day_times(DAY, LAT, LON)
+    astronomy.get_sun_day_series(DAY.date(), 2, LAT, LON)
+    astronomy.get_moon_day_series(DAY.date(), 2, LAT, LON)
+    assert astronomy._elevation_cache.get(f"{LAT},{LON}") is None
+    assert astronomy._sun_day_cache.get(_day_key(astronomy.pytz.UTC)) is None
+    assert astronomy._sun_day_series_cache.get(_day_key()) is None
+    assert astronomy._moon_day_cache.get(_day_key()) is None
+
+
+def test_failed_lookup_is_retried_after_the_back_off(api, monkeypatch):
+    api.failing = True
+    astronomy.get_elevation(LAT, LON)
+    astronomy.get_elevation(LAT, LON)
+    assert api.calls == 1
+    api.failing = False
+    later = astronomy.time.monotonic() + astronomy.ELEVATION_RETRY_SECONDS + 1
+    monkeypatch.setattr(astronomy.time, "monotonic", lambda: later)
+    assert astronomy.lookup_elevation(LAT, LON) == (ELEVATION, True)
+    astronomy.get_sun_day_times(DAY, LAT, LON)
+    assert astronomy._sun_day_cache.get(_day_key(astronomy.pytz.UTC)) is not None
+    assert api.calls == 2
@@ -0,0 +1,48 @@
+from datetime import datetime
+import pytest
+from core.ingress import ingress_table
+from utils.astronomy import jd_to_iso
+
+"""
+Sidereal sign ingresses against known dates.
+"""
+
+# Published times are given to the minute
+TOLERANCE_SECONDS = 120
+
+# (body, year, sign entered, sign left, retrograde, time in UTC)
+INGRESSES = [
+    # Makara Sankranti 2024 (02:44 IST on January 15)
+    ("Sun", 2024, 10, 9, False, "2024-01-14T21:14Z"),
+    # Mesha Sankranti 2024
+    ("Sun", 2024, 1, 12, False, "2024-04-13T15:34Z"),
+    ("Jupiter", 2024, 2, 1, False, "2024-05-01T07:30Z"),
+    ("Saturn", 2025, 12, 11, False, "2025-03-29T16:15Z"),
+    # The nodes always move backwards through the signs
+    ("Rahu", 2025, 11, 12, True, "2025-05-18T14:05Z"),
+    ("Ketu", 2025, 5, 6, True, "2025-05-18T14:05Z"),
+    # Mercury retrograde back into Meena
+    ("Mercury", 2024, 12, 1, True, "2024-04-09T16:11Z"),
+]
+
+
+@pytest.mark.parametrize("body, year, sign, previous, retrograde, expected", INGRESSES)
+def test_known_ingress(body, year, sign, previous, retrograde, expected):
+    matches = [ingress for ingress in ingress_table(body, year)
+               if (ingress.sign, ingress.previous, ingress.retrograde) == (sign, previous, retrograde)]
+    assert len(matches) == 1
+    actual = datetime.fromisoformat(jd_to_iso(matches[0].jd))
+    assert abs((actual - datetime.fromisoformat(expected.replace("Z", "+00:00"))).total_seconds()) < TOLERANCE_SECONDS
+
+
+def test_sun_enters_every_sign_once_a_year():
+    ingresses = ingress_table("Sun", 2024)
+    assert [ingress.sign for ingress in ingresses] == [10, 11, 12, 1, 2, 3, 4, 5, 6, 7, 8, 9]
+    assert all(ingress.previous == (ingress.sign - 2) % 12 + 1 for ingress in ingresses)
+    assert all(earlier.jd < later.jd for earlier, later in zip(ingresses, ingresses[1:]))
+
+
+@pytest.mark.parametrize("body, year", [("Pluto", 2024), ("Sun", 1799), ("Sun", 2400)])
+def test_unsupported_body_or_year_is_rejected(body, year):
+    with pytest.raises(ValueError):
+        ingress_table(body, year)
@@ -0,0 +1,80 @@
+from datetime import datetime
+import pytest
+import swisseph as swe
+from core.masa import find_lunar_month, gregorian_date, lunar_date
+from utils.astronomy import jd_to_iso
+
+"""
+Lunisolar calendar conversions against known dates.
+"""
+
+# Published times are given to the minute
+TOLERANCE_SECONDS = 120
+
+# (vikram samvat, masa, tithi, paksha, adhika) -> (tithi number, name, start, end) in UTC
+GREGORIAN_DATES = [
+    # Prabodhini Ekadashi 2025
+    ((2082, "Kartika", 11, "Shukla", False), (11, "Ekadashi", "2025-11-01T03:42Z", "2025-11-02T02:02Z")),
+    # Diwali 2024 (Ashwin Amavasya, amanta)
+    ((2081, "Ashwin", "Amavasya", None, False), (30, "Amavasya", "2024-10-31T10:23Z", "2024-11-01T12:47Z")),
+    # Numbered within the Krishna paksha
+    ((2081, 7, 15, "Krishna", False), (30, "Amavasya", "2024-10-31T10:23Z", "2024-11-01T12:47Z")),
+    # Purnima of the adhika Shravana of 2023
+    ((2080, "Shravana", "Purnima", None, True), (15, "Purnima", "2023-07-31T22:22Z", "2023-08-01T18:31Z")),
+]
+
+# Instant -> (masa, name, adhika, paksha, tithi, vikram samvat, shaka samvat)
+LUNAR_DATES = [
+    ("2023-07-25T12:00Z", (5, "Shravana", True, "Shukla", 8, 2080, 1945)),
+    ("2023-08-25T12:00Z", (5, "Shravana", False, "Shukla", 9, 2080, 1945)),
+    ("2024-10-31T12:00Z", (7, "Ashwin", False, "Krishna", 30, 2081, 1946)),
+]
+
+
+def _jd(iso: str) -> float:
+    dt = datetime.fromisoformat(iso.replace("Z", "+00:00"))
+    return swe.julday(dt.year, dt.month, dt.day, dt.hour + dt.minute / 60)
+
+
+def _assert_near(jd: float, iso: str):
+    actual = datetime.fromisoformat(jd_to_iso(jd))
+    expected = datetime.fromisoformat(iso.replace("Z", "+00:00"))
+    assert abs((actual - expected).total_seconds()) < TOLERANCE_SECONDS, (actual, expected)
+
+
+@pytest.mark.parametrize("date, expected", GREGORIAN_DATES)
+def test_gregorian_date(date, expected):
+    vikram_samvat, masa, tithi, paksha, adhika = date
+    result = gregorian_date(vikram_samvat, masa, tithi, paksha, adhika)
+    number, name, start, end = expected
+    assert (result["tithi"], result["tithi_name"]) == (number, name)
+    _assert_near(result["start"], start)
+    _assert_near(result["end"], end)
+
+
+@pytest.mark.parametrize("instant, expected", LUNAR_DATES)
+def test_lunar_date(instant, expected):
+    result = lunar_date(_jd(instant))
+    keys = ("masa", "name", "adhika", "paksha", "tithi", "vikram_samvat", "shaka_samvat")
+    assert tuple(result[key] for key in keys) == expected
+
+
+def test_adhika_shravana_2023():
+    adhika = find_lunar_month(2080, 5, adhika=True)
+    nija = find_lunar_month(2080, 5)
+    _assert_near(adhika.start, "2023-07-17T18:32Z")
+    assert adhika.end == nija.start
+    _assert_near(nija.start, "2023-08-16T09:38Z")
+
+
+@pytest.mark.parametrize("date", [
+    # No adhika Shravana in 2081
+    (2081, 5, 1, None, True),
+    # Purnima is a Shukla tithi
+    (2082, "Kartika", "Purnima", "Krishna", False),
+    # Ekadashi occurs in both pakshas
+    (2082, "Kartika", "Ekadashi", None, False),
+])
+def test_invalid_dates_are_rejected(date):
+    with pytest.raises(ValueError):
+        gregorian_date(*date)
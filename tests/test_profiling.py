@@ -0,0 +1,34 @@
+import sys
+import core.ingress
+import core.karana
+import core.nakshatra
+import core.timeline
+import core.tithi
+import core.yoga
+from utils import profiling
+
+"""
+Labels of registered solver frames in sampled stacks.
+"""
+
+
+def test_solver_counters_name_real_locals():
+    assert profiling._solvers
+    for code, (_, _, counters) in profiling._solvers.items():
+        for label, var in counters.items():
+            assert var != "_", (code.co_name, label)
+            assert var in code.co_varnames, (code.co_name, label, var)
+
+
+def test_frames_before_the_first_iteration_carry_no_counter():
+    @profiling.solver_frame("tithi", iteration="iteration")
+    def solver():
+        jd_et, _ = 2460000.5, 0.0
+        before = profiling._frame_name(sys._getframe(), "")
+        for iteration in range(2):
+            during = profiling._frame_name(sys._getframe(), "")
+        return before, during
+
+    before, during = solver()
+    assert before.endswith("[tithi]")
+    assert during.endswith("[tithi, iteration 1]")
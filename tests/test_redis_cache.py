@@ -0,0 +1,197 @@
+import asyncio
+import fnmatch
+import threading
+import time
+from typing import Dict, List, Optional
+import pytest
+from utils.cache import CacheUnavailableError, RedisCache, RedisError, SharedCache
+
+"""
+Tests of the built-in RESP client of RedisCache against a local stand-in
+server, so they need no Redis installation.
+"""
+
+
+class StubRedis:
+    """
+    Minimal asyncio Redis-protocol server (GET, SET, DEL, SCAN, AUTH, SELECT)
+    running in a background thread.
+
+    Attributes:
+        store (dict): Stored keys and values
+        commands (list): Commands received, as lists of strings
+        fail_with (str, optional): Error reply sent to the next command
+    """
+
+    def __init__(self, password: Optional[str] = None):
+        self.password = password
+        self.store: Dict[bytes, bytes] = {}
+        self.commands: List[List[str]] = []
+        self.fail_with: Optional[str] = None
+        self.port = 0
+        self._loop = asyncio.new_event_loop()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writers: List[asyncio.StreamWriter] = []
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+
+    def start(self, port: int = 0) -> "StubRedis":
+        if not self._thread.is_alive():
+            self._thread.start()
+        self._server = self._call(asyncio.start_server(self._serve, "127.0.0.1", port))
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    def stop(self) -> None:
+        """Stop listening and drop every client connection."""
+        async def stop():
+            self._server.close()
+            await self._server.wait_closed()
+        self.drop_connections()
+        self._call(stop())
+
+    def drop_connections(self) -> None:
+        async def drop():
+            for writer in self._writers:
+                writer.close()
+            self._writers.clear()
+        self._call(drop())
+
+    def close(self) -> None:
+        self.stop()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    def _call(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result(timeout=5)
+
+    async def _read_command(self, reader: asyncio.StreamReader) -> List[bytes]:
+        header = await reader.readline()
+        if not header:
+            raise ConnectionError
+        args = []
+        for _ in range(int(header[1:-2])):
+            length = int((await reader.readline())[1:-2])
+            args.append((await reader.readexactly(length + 2))[:-2])
+        return args
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._writers.append(writer)
+        try:
+            while True:
+                args = await self._read_command(reader)
+                self.commands.append([arg.decode() for arg in args])
+                writer.write(self._reply(args))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def _reply(self, args: List[bytes]) -> bytes:
+        if self.fail_with is not None:
+            message, self.fail_with = self.fail_with, None
+            return f"-{message}\r\n".encode()
+        command = args[0].upper()
+        if command == b"AUTH":
+            return b"+OK\r\n" if args[1].decode() == self.password else b"-WRONGPASS invalid password\r\n"
+        if command == b"SELECT":
+            return b"+OK\r\n"
+        if command == b"GET":
+            value = self.store.get(args[1])
+            return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+        if command == b"SET":
+            self.store[args[1]] = args[2]
+            return b"+OK\r\n"
+        if command == b"DEL":
+            removed = sum(self.store.pop(key, None) is not None for key in args[1:])
+            return b":%d\r\n" % removed
+        if command == b"SCAN":
+            # One pass over all keys; MATCH patterns use Redis' backslash escapes
+            pattern = args[args.index(b"MATCH") + 1].decode()
+            pattern = pattern.replace("\\[", "[[]").replace("\\*", "[*]").replace("\\?", "[?]")
+            keys = [key for key in self.store if fnmatch.fnmatchcase(key.decode(), pattern)]
+            return b"*2\r\n$1\r\n0\r\n*%d\r\n" % len(keys) + b"".join(b"$%d\r\n%s\r\n" % (len(key), key) for key in keys)
+        return b"-ERR unknown command\r\n"
+
+
+@pytest.fixture
+def server():
+    stub = StubRedis(password="secret").start()
+    yield stub
+    stub.close()
+
+
+def make_cache(server: StubRedis, namespace: str = "boundaries", version: str = "v1") -> RedisCache:
+    return RedisCache(f"redis://:secret@127.0.0.1:{server.port}/2", namespace, lambda: version)
+
+
+def test_shared_cache_is_abstract():
+    with pytest.raises(TypeError):
+        SharedCache("boundaries", lambda: "v1")
+
+
+def test_get_put_round_trip(server):
+    cache = make_cache(server)
+    assert cache.get(("tithi", 7)) is None
+    cache.put(("tithi", 7), {"start": 2460000.25, "end": 2460001.5, "number": 7})
+    assert cache.get(("tithi", 7)) == {"start": 2460000.25, "end": 2460001.5, "number": 7}
+    assert (cache.hits, cache.misses) == (1, 1)
+    # Authenticated and selected the database once, on connect
+    assert server.commands[:2] == [["AUTH", "secret"], ["SELECT", "2"]]
+
+
+def test_keys_are_namespaced_and_versioned(server):
+    make_cache(server, version="v1").put("key", 1)
+    assert make_cache(server, version="v2").get("key") is None
+    assert make_cache(server, namespace="sunrise").get("key") is None
+    assert make_cache(server, version="v1").get("key") == 1
+
+
+def test_clear_removes_only_own_prefix(server):
+    cache, other = make_cache(server, version="v[1]*"), make_cache(server, version="v2")
+    for key in range(3):
+        cache.put(key, key)
+        other.put(key, key)
+    cache.clear()
+    assert [cache.get(key) for key in range(3)] == [None, None, None]
+    assert [other.get(key) for key in range(3)] == [0, 1, 2]
+
+
+def test_error_reply_is_a_miss_and_keeps_connection(server):
+    cache = make_cache(server)
+    cache.put("key", "value")
+    server.fail_with = "ERR something went wrong"
+    assert cache.get("key") is None
+    with pytest.raises(RedisError):
+        server.fail_with = "ERR again"
+        cache._get(cache._key("key"))
+    assert cache.get("key") == "value"
+    assert sum(command[0] == "AUTH" for command in server.commands) == 1
+
+
+def test_reconnects_after_dropped_connection(server):
+    cache = make_cache(server)
+    cache.put("key", "value")
+    server.drop_connections()
+    # The command on the dead connection fails (a miss) and the next one reconnects
+    assert cache.get("key") is None
+    assert cache.get("key") == "value"
+    assert sum(command[0] == "AUTH" for command in server.commands) == 2
+
+
+def test_outage_skips_server_until_retry(server):
+    cache = make_cache(server)
+    cache.RETRY_SECONDS = 0.2
+    cache.put("key", "value")
+    port = server.port
+    server.stop()
+    # The open connection is found closed, then reconnecting is refused
+    assert cache.get("key") is None
+    assert cache.get("key") is None
+    # Within the retry interval the server is not contacted at all
+    with pytest.raises(CacheUnavailableError):
+        cache._get(cache._key("key"))
+    cache.put("other", 1)
+    server.start(port)
+    time.sleep(0.25)
+    assert cache.get("key") == "value"
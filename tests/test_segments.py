@@ -0,0 +1,73 @@
+from datetime import date, datetime, timedelta
+import pytest
+import swisseph as swe
+from core.segments import day_segments
+
+"""
+Day divisions against the traditional weekday tables, for a day with
+sunrise at 06:00 and sunset at 18:00 (UTC), so every eighth is 1h30.
+"""
+
+# A week starting on Sunday
+SUNDAY = date(2024, 3, 10)
+
+# Start (UTC) of Rahu Kalam, Yamaganda and Gulika by weekday, Sunday first
+KALAMS = [
+    ("16:30", "12:00", "15:00"),
+    ("07:30", "10:30", "13:30"),
+    ("15:00", "09:00", "12:00"),
+    ("12:00", "07:30", "10:30"),
+    ("13:30", "06:00", "09:00"),
+    ("10:30", "15:00", "07:30"),
+    ("09:00", "13:30", "06:00"),
+]
+
+# Day and night choghadiyas of Sunday and Monday, in order
+CHOGHADIYAS = {
+    0: (("Udveg", "Char", "Labh", "Amrit", "Kaal", "Shubh", "Rog", "Udveg"),
+        ("Shubh", "Amrit", "Char", "Rog", "Kaal", "Labh", "Udveg", "Shubh")),
+    1: (("Amrit", "Kaal", "Shubh", "Rog", "Udveg", "Char", "Labh", "Amrit"),
+        ("Char", "Rog", "Kaal", "Labh", "Udveg", "Shubh", "Amrit", "Char")),
+}
+
+# Lords of the first five horas of Sunday
+SUNDAY_HORAS = ("Sun", "Venus", "Mercury", "Moon", "Saturn")
+
+
+def _segments(day: date) -> dict:
+    sunrise = swe.julday(day.year, day.month, day.day, 6.0)
+    return day_segments(sunrise, sunrise + 0.5, sunrise + 1.0, day)
+
+
+def _time(iso: str) -> str:
+    # Round to the minute; Julian day round trips are off by microseconds
+    return (datetime.fromisoformat(iso) + timedelta(seconds=30)).strftime("%H:%M")
+
+
+@pytest.mark.parametrize("weekday", range(7))
+def test_kalams_follow_the_weekday_table(weekday):
+    segments = _segments(SUNDAY + timedelta(days=weekday))
+    starts = tuple(_time(segments[name]["start"]) for name in ("rahu_kalam", "yamaganda", "gulika"))
+    assert starts == KALAMS[weekday]
+    for name in ("rahu_kalam", "yamaganda", "gulika"):
+        length = datetime.fromisoformat(segments[name]["end"]) - datetime.fromisoformat(segments[name]["start"])
+        assert abs(length - timedelta(minutes=90)) < timedelta(seconds=1)
+
+
+@pytest.mark.parametrize("weekday", sorted(CHOGHADIYAS))
+def test_choghadiya_order(weekday):
+    segments = _segments(SUNDAY + timedelta(days=weekday))
+    day, night = CHOGHADIYAS[weekday]
+    assert tuple(part["name"] for part in segments["choghadiya"]["day"]) == day
+    assert tuple(part["name"] for part in segments["choghadiya"]["night"]) == night
+    assert _time(segments["choghadiya"]["day"][0]["start"]) == "06:00"
+    assert _time(segments["choghadiya"]["night"][0]["start"]) == "18:00"
+
+
+def test_horas_follow_the_chaldean_order():
+    horas = _segments(SUNDAY)["hora"]
+    assert len(horas) == 24
+    assert tuple(hora["lord"] for hora in horas[:5]) == SUNDAY_HORAS
+    # The 25th hora would be the next day's lord: Moon on Monday
+    assert horas[-1]["lord"] == "Mercury"
+    assert _time(horas[12]["start"]) == "18:00"
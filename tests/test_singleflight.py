@@ -0,0 +1,85 @@
+import asyncio
+import pytest
+from utils.singleflight import SingleFlight
+
+"""
+Single-flight coalescing: followers share the leader's outcome, and keys are
+released once the computation finishes.
+"""
+
+FOLLOWERS = 5
+
+
+def _gated(outcome, calls: list, gate: asyncio.Event):
+    async def compute():
+        calls.append(1)
+        await gate.wait()
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+    return compute
+
+
+def test_followers_get_the_leaders_result():
+    async def scenario():
+        flight, calls, gate = SingleFlight("test"), [], asyncio.Event()
+        result = {"value": 1}
+        tasks = [asyncio.create_task(flight.do("key", _gated(result, calls, gate))) for _ in range(1 + FOLLOWERS)]
+        await asyncio.sleep(0.01)
+        assert flight.in_flight == 1
+        gate.set()
+        results = await asyncio.gather(*tasks)
+        return flight, calls, result, results
+
+    flight, calls, result, results = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert all(shared is result for shared in results)
+    assert (flight.computations, flight.coalesced, flight.in_flight) == (1, FOLLOWERS, 0)
+
+
+def test_followers_get_the_leaders_exception():
+    async def scenario():
+        flight, calls, gate = SingleFlight("test"), [], asyncio.Event()
+        error = ValueError("no such tithi")
+        tasks = [asyncio.create_task(flight.do("key", _gated(error, calls, gate))) for _ in range(1 + FOLLOWERS)]
+        await asyncio.sleep(0.01)
+        gate.set()
+        outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+        return flight, calls, error, outcomes
+
+    flight, calls, error, outcomes = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert all(outcome is error for outcome in outcomes)
+    assert flight.in_flight == 0
+
+
+def test_key_is_released_and_recomputed_afterwards():
+    async def scenario():
+        flight, calls, gate = SingleFlight("test"), [], asyncio.Event()
+        gate.set()
+        first = await flight.do("key", _gated(1, calls, gate))
+        assert flight.in_flight == 0
+        second = await flight.do("key", _gated(2, calls, gate))
+        return flight, calls, first, second
+
+    flight, calls, first, second = asyncio.run(scenario())
+    assert (first, second, len(calls), flight.coalesced) == (1, 2, 2, 0)
+
+
+def test_cancelled_leader_does_not_cancel_the_computation():
+    async def scenario():
+        flight, calls, gate = SingleFlight("test"), [], asyncio.Event()
+        leader = asyncio.create_task(flight.do("key", _gated("done", calls, gate)))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(flight.do("key", _gated("other", calls, gate)))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        gate.set()
+        result = await follower
+        await asyncio.sleep(0)
+        return flight, calls, result
+
+    flight, calls, result = asyncio.run(scenario())
+    assert (result, len(calls), flight.in_flight) == ("done", 1, 0)
@@ -0,0 +1,108 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+"""
+In-Process ASGI Client
+
+Drives an ASGI application directly, without a network socket or HTTP client
+library, for benchmarks and load tests.
+"""
+
+async def asgi_request(app, method: str, path: str, body: Optional[Any] = None,
+                       headers: Iterable[Tuple[str, str]] = ()) -> Dict[str, Any]:
+    """
+    Send one HTTP request to an ASGI app and collect the response.
+
+    Args:
+        app: ASGI application (e.g. main.app)
+        method: HTTP method
+        path: Request path, optionally with a query string
+        body: JSON-serialisable request body
+        headers: Extra request headers as (name, value) pairs
+
+    Returns:
+        dict: status (int), headers (dict of lower-case names) and body (bytes)
+    """
+    raw = json.dumps(body).encode() if body is not None else b""
+    route, _, query = path.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": route,
+        "raw_path": route.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(raw)).encode())]
+                   + [(name.lower().encode(), value.encode()) for name, value in headers],
+        "client": ("127.0.0.1", 50000),
+        "server": ("localhost", 80),
+    }
+    request_sent = False
+    response: Dict[str, Any] = {"status": None, "headers": {}, "body": b""}
+    done = asyncio.Event()
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": raw, "more_body": False}
+        # Nothing more to send: block until the response is complete
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = {name.decode().lower(): value.decode() for name, value in message.get("headers", [])}
+        elif message["type"] == "http.response.body":
+            response["body"] += message.get("body", b"")
+            if not message.get("more_body", False):
+                done.set()
+
+    await app(scope, receive, send)
+    done.set()
+    return response
+
+@asynccontextmanager
+async def asgi_lifespan(app):
+    """
+    Run an ASGI app's lifespan startup on entry and shutdown on exit,
+    as a server would around the requests it serves.
+
+    Args:
+        app: ASGI application
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    started = asyncio.Event()
+    stopped = asyncio.Event()
+    failure: Dict[str, Any] = {}
+
+    async def receive():
+        return await queue.get()
+
+    async def send(message):
+        if message["type"].startswith("lifespan.startup."):
+            if message["type"] == "lifespan.startup.failed":
+                failure.update(message)
+            started.set()
+        elif message["type"].startswith("lifespan.shutdown."):
+            stopped.set()
+
+    task = asyncio.create_task(app({"type": "lifespan", "asgi": {"version": "3.0"}, "state": {}}, receive, send))
+    await queue.put({"type": "lifespan.startup"})
+    await started.wait()
+    if failure:
+        # The app has given up; a server would exit here
+        await asyncio.gather(task, return_exceptions=True)
+        raise RuntimeError(f"Application startup failed: {failure.get('message', '')}")
+    try:
+        yield
+    finally:
+        await queue.put({"type": "lifespan.shutdown"})
+        await stopped.wait()
+        await task
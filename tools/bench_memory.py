@@ -0,0 +1,121 @@
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import Dict, List
+
+"""
+Worker Memory Benchmark
+
+Starts uvicorn with several workers, warms every worker with requests that
+load the shared structures (ephemeris, time scale tables, timezone index)
+and reports each worker's memory from /proc/<pid>/smaps_rollup: RSS, PSS
+(shared pages divided among the processes mapping them) and private pages.
+PSS summed over the workers is what the deployment costs; run it once per
+configuration to compare, e.g. with the timezone index loaded into every
+process:
+
+Usage (from the repository root, Linux only):
+    python -m tools.bench_memory [--workers 4] [--env VASTR_TIMEZONE_IN_MEMORY=1] [--env VASTR_TABLES_DIR=]
+"""
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Local-time panchanga (timezone lookup, time scales) without the network
+# elevation lookup behind sunrise/sunset
+WARM_REQUEST = {
+    "datetime": "2025-03-28T14:00:00Z",
+    "latitude": 12.97,
+    "longitude": 77.59,
+    "fields": ["vara", "tithi", "nakshatra", "yoga", "karana"],
+    "local_time": True,
+}
+
+# smaps_rollup fields reported, in kB
+FIELDS = ("Rss", "Pss", "Shared_Clean", "Private_Clean", "Private_Dirty")
+
+def smaps_rollup(pid: int) -> Dict[str, int]:
+    """Memory of a process by smaps_rollup field, in kB."""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            name, _, rest = line.partition(":")
+            if name in FIELDS:
+                values[name] = int(rest.split()[0])
+    return values
+
+def worker_pids(parent: int) -> List[int]:
+    """Worker processes of a uvicorn parent (its children other than the multiprocessing helpers)."""
+    with open(f"/proc/{parent}/task/{parent}/children") as f:
+        children = [int(pid) for pid in f.read().split()]
+    workers = []
+    for pid in children:
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            if b"resource_tracker" not in f.read():
+                workers.append(pid)
+    return workers
+
+def _wait_for_port(process: subprocess.Popen, port: int) -> None:
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with status {process.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("uvicorn did not start within 60 s")
+
+def _warm(port: int, requests: int) -> None:
+    # New connections are spread over the workers by the kernel, so enough
+    # of them reach every worker
+    for i in range(requests):
+        # Spread over the globe, so the lookups touch many parts of the timezone index
+        body = json.dumps({**WARM_REQUEST, "latitude": -60.0 + i * 37 % 120, "longitude": -180.0 + i * 71 % 360}).encode()
+        request = urllib.request.Request(f"http://127.0.0.1:{port}/panchanga", data=body,
+                                         headers={"Content-Type": "application/json", "Connection": "close"})
+        with urllib.request.urlopen(request, timeout=30) as response:
+            response.read()
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure per-worker memory of a multi-worker server")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--requests", type=int, default=200, help="warm-up requests spread over the workers")
+    parser.add_argument("--env", action="append", default=[], metavar="NAME=VALUE", help="environment of the server (repeatable)")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    for assignment in args.env:
+        name, separator, value = assignment.partition("=")
+        if not separator:
+            parser.error(f"--env expects NAME=VALUE, got {assignment}")
+        env[name] = value
+    process = subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(args.port),
+                                "--workers", str(args.workers), "--log-level", "warning"], cwd=ROOT, env=env)
+    try:
+        _wait_for_port(process, args.port)
+        _warm(args.port, args.requests)
+        workers = {pid: smaps_rollup(pid) for pid in worker_pids(process.pid)}
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+    totals = {field: sum(values.get(field, 0) for values in workers.values()) for field in FIELDS}
+    if args.json:
+        print(json.dumps({"env": args.env, "workers": workers, "total": totals}, indent=2))
+    else:
+        print(f"{'worker':>8} " + " ".join(f"{field:>14}" for field in FIELDS) + "   (MB)")
+        for pid, values in workers.items():
+            print(f"{pid:>8} " + " ".join(f"{values.get(field, 0) / 1024:>14.1f}" for field in FIELDS))
+        print(f"{'total':>8} " + " ".join(f"{totals[field] / 1024:>14.1f}" for field in FIELDS))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
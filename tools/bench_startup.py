@@ -0,0 +1,82 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+"""
+Startup Benchmark
+
+Measures the cold-start cost a new worker or container pays before serving:
+the time to `import main` and the latency of the first response, each in a
+fresh interpreter. Exits with status 1 when the median exceeds its budget.
+
+Usage (from the repository root):
+    python -m tools.bench_startup [--runs 5] [--import-budget 1.0] [--first-response-budget 0.5]
+"""
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Numbers-only request: exercises ephemeris initialisation without the
+# network elevation lookup behind sunrise/sunset
+DEFAULT_REQUEST = {
+    "datetime": "2025-03-28T14:00:00Z",
+    "latitude": 12.97,
+    "longitude": 77.59,
+    "fields": ["tithi", "nakshatra", "yoga", "karana"],
+}
+
+_IMPORT_PROBE = """
+import time
+start = time.perf_counter()
+import main
+print(time.perf_counter() - start)
+"""
+
+_FIRST_RESPONSE_PROBE = """
+import asyncio, json, sys, time
+import main
+from tools.asgi import asgi_request
+body = json.loads(sys.argv[1])
+start = time.perf_counter()
+response = asyncio.run(asgi_request(main.app, "POST", "/panchanga", body))
+elapsed = time.perf_counter() - start
+assert response["status"] == 200, response
+print(elapsed)
+"""
+
+def _run_probe(code: str, *args: str) -> float:
+    output = subprocess.run([sys.executable, "-c", code, *args], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per measurement")
+    parser.add_argument("--import-budget", type=float, default=1.0, help="seconds allowed for `import main`")
+    parser.add_argument("--first-response-budget", type=float, default=0.5, help="seconds allowed for the first response")
+    parser.add_argument("--request", type=json.loads, default=DEFAULT_REQUEST, help="JSON body of the first /panchanga request")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    import_times = [_run_probe(_IMPORT_PROBE) for _ in range(args.runs)]
+    first_response_times = [_run_probe(_FIRST_RESPONSE_PROBE, json.dumps(args.request)) for _ in range(args.runs)]
+
+    results = {
+        "import_main": {"median": statistics.median(import_times), "max": max(import_times), "budget": args.import_budget},
+        "first_response": {"median": statistics.median(first_response_times), "max": max(first_response_times), "budget": args.first_response_budget},
+    }
+    failed = [name for name, result in results.items() if result["median"] > result["budget"]]
+
+    if args.json:
+        print(json.dumps({"results": results, "failed": failed}, indent=2))
+    else:
+        for name, result in results.items():
+            status = "FAIL" if name in failed else "ok"
+            print(f"{name:<16} median {result['median'] * 1000:8.1f} ms   max {result['max'] * 1000:8.1f} ms   "
+                  f"budget {result['budget'] * 1000:8.1f} ms   {status}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+import argparse
+import json
+import os
+import shutil
+import swisseph as swe
+from config import EPHE_PATH, EPHE_START_YEAR, EPHE_END_YEAR, EPHE_BODIES
+from utils.ephemeris import BODY_FILES, ephemeris_files
+
+"""
+Ephemeris Bundle Builder
+
+Copies only the Swiss Ephemeris files the service reads for a range of years
+and set of bodies into a new directory, writes a `bundle.json` manifest and
+verifies that every body computes from the files (not the Moshier fallback)
+across the range. For the default 1800-2399 range with Sun, Moon and
+grahas the bundle is two files (~1.8 MB) instead of the full 135 MB
+directory. When the range starts on a file boundary (e.g. 1800), the first
+hour of its first day needs the previous file for light-time corrections and
+falls back to the Moshier ephemeris (within ~0.1").
+
+Usage (from the repository root):
+    python -m tools.build_ephe_bundle --output ephe-bundle [--start-year 1800] [--end-year 2399] [--bodies sun,moon,grahas]
+"""
+
+# Bodies computed to verify each body group
+VERIFY_BODIES = {
+    "sun": (swe.SUN,),
+    "moon": (swe.MOON,),
+    "grahas": (swe.MERCURY, swe.VENUS, swe.MARS, swe.JUPITER, swe.SATURN),
+}
+
+def verify(path: str, start_year: int, end_year: int, bodies) -> list:
+    """Body/instant pairs in the range that do not compute from the files in path."""
+    swe.set_ephe_path(path)
+    failures = []
+    # Light-time corrections read a few minutes before the instant, so the
+    # first hour of a file's range still needs the previous file; start the
+    # check a day in
+    instants = [swe.julday(start_year, 1, 2, 0.0), swe.julday((start_year + end_year) // 2, 7, 1, 0.0),
+                swe.julday(end_year, 12, 31, 23.99)]
+    for group in bodies:
+        for body in VERIFY_BODIES[group]:
+            for jd in instants:
+                _, flags = swe.calc_ut(jd, body, swe.FLG_SWIEPH)
+                if not flags & swe.FLG_SWIEPH:
+                    failures.append(f"{swe.get_planet_name(body)} at JD {jd}")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a minimal Swiss Ephemeris bundle")
+    parser.add_argument("--source", default=EPHE_PATH, help="Full ephemeris directory")
+    parser.add_argument("--output", required=True, help="Bundle directory to create")
+    parser.add_argument("--start-year", type=int, default=EPHE_START_YEAR)
+    parser.add_argument("--end-year", type=int, default=EPHE_END_YEAR)
+    parser.add_argument("--bodies", default=",".join(EPHE_BODIES),
+                        help=f"Comma-separated body groups from: {', '.join(BODY_FILES)}")
+    args = parser.parse_args()
+    bodies = [body.strip().lower() for body in args.bodies.split(",") if body.strip()]
+
+    try:
+        names = ephemeris_files(args.start_year, args.end_year, bodies)
+    except ValueError as e:
+        parser.error(str(e))
+    missing = [name for name in names if not os.path.isfile(os.path.join(args.source, name))]
+    if missing:
+        parser.error(f"Missing from {args.source}: {', '.join(missing)}")
+    if os.path.abspath(args.output) == os.path.abspath(args.source):
+        parser.error("--output must differ from --source")
+
+    os.makedirs(args.output, exist_ok=True)
+    size = 0
+    for name in names:
+        shutil.copy2(os.path.join(args.source, name), os.path.join(args.output, name))
+        size += os.path.getsize(os.path.join(args.output, name))
+    manifest = {"start_year": args.start_year, "end_year": args.end_year, "bodies": bodies, "files": names}
+    with open(os.path.join(args.output, "bundle.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    failures = verify(args.output, args.start_year, args.end_year, bodies)
+    if failures:
+        raise SystemExit(f"Bundle does not cover: {'; '.join(failures)}")
+    print(f"Wrote {len(names)} files ({size / 1e6:.1f} MB) to {args.output}: {', '.join(names)}")
+
+if __name__ == "__main__":
+    main()
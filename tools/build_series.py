@@ -0,0 +1,98 @@
+import argparse
+import json
+import os
+import time
+import numpy as np
+import swisseph as swe
+from config import SERIES_PATH
+import utils.astronomy as astronomy
+from utils.series import LongitudeSeries
+
+"""
+Longitude Series Builder
+
+Samples the sidereal (Lahiri) longitude and speed of the Sun and Moon at a
+fixed step over a range of years and writes them as a .npy table, with its
+metadata (start, step, calculation settings, measured interpolation error)
+in a .json file next to it. Point VASTR_SERIES_PATH at the table to let the
+limb solvers read positions from it instead of Swiss Ephemeris.
+
+The interpolation error is measured against Swiss Ephemeris at the midpoint
+of every interval.
+
+Usage (from the repository root):
+    python -m tools.build_series [--start-year 2000] [--end-year 2100] [--step-hours 1] [--output series/sun_moon.npy]
+"""
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _longitude(jd: float, body: int, flags: int) -> float:
+    return swe.calc_ut(jd, body, flags)[0][0]
+
+def sample(jds: np.ndarray) -> np.ndarray:
+    """Sidereal Sun/Moon longitude and speed at each Julian day (UT), shape (n, 4)."""
+    # Full-precision speeds rather than the 3-point estimate of FLG_SPEED3:
+    # the Hermite error depends on their accuracy
+    flags = (astronomy.CALC_FLAGS & ~swe.FLG_SPEED3) | swe.FLG_SIDEREAL | swe.FLG_SPEED
+    table = np.empty((len(jds), 4))
+    for row, jd in enumerate(jds.tolist()):
+        sun = swe.calc_ut(jd, swe.SUN, flags)[0]
+        moon = swe.calc_ut(jd, swe.MOON, flags)[0]
+        table[row] = (sun[0], sun[3], moon[0], moon[3])
+    return table
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the memory-mapped Sun/Moon longitude series")
+    parser.add_argument("--start-year", type=int, default=2000)
+    parser.add_argument("--end-year", type=int, default=2100, help="Last year covered (inclusive)")
+    parser.add_argument("--step-hours", type=float, default=1.0)
+    parser.add_argument("--output", default=SERIES_PATH or os.path.join(ROOT, "series", "sun_moon.npy"))
+    args = parser.parse_args()
+    if args.end_year < args.start_year:
+        parser.error("--end-year must not be before --start-year")
+
+    astronomy.ensure_ephemeris()
+    step = args.step_hours / 24.0
+    jd_start = swe.julday(args.start_year, 1, 1, 0.0)
+    jd_end = swe.julday(args.end_year + 1, 1, 1, 0.0)
+    count = int(np.ceil((jd_end - jd_start) / step)) + 1
+    jds = jd_start + np.arange(count) * step
+
+    began = time.perf_counter()
+    table = sample(jds)
+    print(f"Sampled {count} instants in {time.perf_counter() - began:.1f} s")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    partial = f"{args.output}.partial.npy"
+    np.save(partial, table)
+    meta = {
+        "jd_start": jd_start,
+        "step_days": step,
+        "count": count,
+        "version": astronomy.cache_version(),
+        "max_error_deg": float("inf")
+    }
+    with open(f"{partial}.json", "w") as f:
+        json.dump(meta, f)
+
+    # Measure the interpolation error where it is largest, halfway between samples
+    midpoints = jds[:-1] + step / 2
+    flags = astronomy.CALC_FLAGS | swe.FLG_SIDEREAL
+    series = LongitudeSeries(partial)
+    sun, _, moon, _ = series.sun_moon_array(midpoints)
+    errors = []
+    for interpolated, body in ((sun, swe.SUN), (moon, swe.MOON)):
+        exact = np.array([_longitude(jd, body, flags) for jd in midpoints.tolist()])
+        errors.append(float(np.abs((interpolated - exact + 180.0) % 360.0 - 180.0).max()))
+    meta["max_error_deg"] = float(max(errors))
+    print(f"Max interpolation error: Sun {errors[0]:.2e}°, Moon {errors[1]:.2e}°")
+
+    del series
+    with open(f"{args.output}.json", "w") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(partial, args.output)
+    os.remove(f"{partial}.json")
+    print(f"Wrote {args.output} ({table.nbytes / 1e6:.1f} MB, JD {jd_start}-{jds[-1]})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import argparse
+import os
+import sys
+import time
+import config
+import utils.astronomy as astronomy
+from utils.tables import table_path
+
+"""
+Shared Table Builder
+
+Preload step for multi-worker deployments: builds the read-only tables the
+workers share (see utils/tables.py) into the tables directory before they
+start, so no worker pays for building them and all of them map the same
+files. Run it again after changing the served years or calculation
+settings; tables built with other settings are left in place and ignored.
+
+Usage (from the repository root):
+    python -m tools.build_tables [--directory tables]
+"""
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build the read-only tables shared by worker processes")
+    parser.add_argument("--directory", default=config.TABLES_DIR, help="tables directory (default: VASTR_TABLES_DIR)")
+    args = parser.parse_args()
+    if not args.directory:
+        parser.error("no tables directory: pass --directory or set VASTR_TABLES_DIR")
+
+    os.makedirs(args.directory, exist_ok=True)
+    began = time.perf_counter()
+    scales = astronomy.TimeScales(config.EPHE_START_YEAR, config.EPHE_END_YEAR, args.directory)
+    version = f"{astronomy.cache_version()}-{config.EPHE_START_YEAR}-{config.EPHE_END_YEAR}"
+    size = sum(array.nbytes for array in (scales.delta_t, scales.exact, scales.leap_utc, scales.leap_tt))
+    print(f"Time scales: {table_path(args.directory, 'time_scales', version)} ({size / 1e6:.1f} MB) "
+          f"in {time.perf_counter() - began:.1f} s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
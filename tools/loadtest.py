@@ -0,0 +1,339 @@
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+"""
+Load Test
+
+Replays a request corpus against the app at a sweep of concurrency levels
+and reports throughput (requests/s), latency percentiles (p50/p95/p99),
+errors and Swiss Ephemeris calls per request, as a table and optionally as
+JSON for comparing commits or configurations.
+
+Two transports:
+- asgi (default): drives `main.app` in this process through tools.asgi,
+  with no network or server in between. Ephemeris calls are counted by
+  wrapping the swisseph position and rise/set functions.
+- uvicorn: starts `uvicorn main:app` on a local port (optionally with
+  several workers) and sends HTTP/1.1 keep-alive requests to it.
+  Ephemeris calls are not visible from outside the server.
+
+Each level sends a warm-up pass of the corpus first (unmeasured), so caches
+and lazily loaded data are warm. Configuration is passed as environment
+variables (--env), e.g. to compare VASTR_SERIES_PATH or
+VASTR_MAX_CONCURRENCY settings.
+
+The corpus is a JSON Lines file with one request per line:
+    {"method": "POST", "path": "/panchanga", "body": {...}, "headers": {...}}
+
+Usage (from the repository root):
+    python -m tools.loadtest [--transport asgi|uvicorn] [--concurrency 1,4,16] [--requests 200]
+        [--corpus requests.jsonl] [--env VASTR_SERIES_PATH=series/sun_moon.npy]
+        [--json results.json] [--baseline previous.json]
+"""
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# swisseph functions counted as ephemeris calls
+EPHEMERIS_FUNCTIONS = ("calc_ut", "calc", "rise_trans", "houses_ex")
+
+# Numbers-only requests (no sunrise, so no network elevation lookups)
+LOCATIONS = [(28.6139, 77.2090), (12.9716, 77.5946), (51.5074, -0.1278)]
+INSTANTS = ["2024-01-15T06:00:00Z", "2024-04-09T18:30:00Z", "2024-08-19T03:15:00Z", "2025-03-28T14:00:00Z"]
+
+
+def default_corpus() -> List[Dict[str, Any]]:
+    """A mix of the computation endpoints over a few instants and locations."""
+    corpus = []
+    for (lat, lon), instant in itertools.product(LOCATIONS, INSTANTS):
+        corpus.append({"method": "POST", "path": "/panchanga",
+                       "body": {"datetime": instant, "latitude": lat, "longitude": lon,
+                                "fields": ["sun", "moon", "tithi", "nakshatra", "yoga", "karana"]}})
+    for lat, lon in LOCATIONS:
+        corpus.append({"method": "POST", "path": "/grahas", "body": {"datetimes": INSTANTS, "latitude": lat, "longitude": lon}})
+    for instant in INSTANTS:
+        corpus.append({"method": "POST", "path": "/lunar-date", "body": {"datetime": instant}})
+        corpus.append({"method": "POST", "path": "/events",
+                       "body": {"limb": "tithi", "targets": ["Ekadashi"], "start": instant, "count": 4}})
+    corpus.append({"method": "POST", "path": "/ingress", "body": {"year": 2025, "bodies": ["Sun", "Jupiter"]}})
+    return corpus
+
+
+def load_corpus(path: str) -> List[Dict[str, Any]]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0-100) of sorted values."""
+    if not values:
+        return float("nan")
+    return values[max(0, math.ceil(q / 100 * len(values)) - 1)]
+
+
+class EphemerisCounter:
+    """Counts calls to the swisseph functions in EPHEMERIS_FUNCTIONS by wrapping them."""
+
+    def __init__(self):
+        # itertools.count advances atomically under the GIL, so worker
+        # threads need no lock
+        self.counter = itertools.count()
+        self.mark = -1
+
+    def install(self):
+        import swisseph as swe
+
+        def counted(func):
+            def wrapper(*args, **kwargs):
+                next(self.counter)
+                return func(*args, **kwargs)
+            return wrapper
+        for name in EPHEMERIS_FUNCTIONS:
+            setattr(swe, name, counted(getattr(swe, name)))
+
+    def read(self) -> int:
+        """Calls since the previous read (each read advances the count once itself)."""
+        now = next(self.counter)
+        calls, self.mark = now - self.mark - 1, now
+        return calls
+
+
+class AsgiTransport:
+    """Requests to main.app in this process."""
+
+    name = "asgi"
+
+    def __init__(self):
+        self.counter = EphemerisCounter()
+        self.counter.install()
+        import main
+        from tools.asgi import asgi_lifespan, asgi_request
+        self.app = main.app
+        self._lifespan = asgi_lifespan(self.app)
+        self._request = asgi_request
+
+    async def start(self):
+        await self._lifespan.__aenter__()
+
+    async def stop(self):
+        await self._lifespan.__aexit__(None, None, None)
+
+    async def send(self, connection: Any, request: Dict[str, Any]) -> int:
+        response = await self._request(self.app, request.get("method", "POST"), request["path"], request.get("body"),
+                                       list(request.get("headers", {}).items()))
+        return response["status"]
+
+    async def connect(self) -> Any:
+        return None
+
+    async def close(self, connection: Any):
+        pass
+
+    def ephemeris_calls(self) -> Optional[int]:
+        return self.counter.read()
+
+
+class UvicornTransport:
+    """HTTP/1.1 keep-alive requests to a local uvicorn server."""
+
+    name = "uvicorn"
+
+    def __init__(self, workers: int, port: int):
+        self.workers = workers
+        self.port = port
+        self.process: Optional[subprocess.Popen] = None
+
+    async def start(self):
+        self.process = subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+                                         "--port", str(self.port), "--workers", str(self.workers), "--log-level", "warning"],
+                                        cwd=ROOT)
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with status {self.process.returncode}")
+            try:
+                with socket.create_connection(("127.0.0.1", self.port), timeout=0.5):
+                    return
+            except OSError:
+                await asyncio.sleep(0.2)
+        raise RuntimeError("uvicorn did not start within 60 s")
+
+    async def stop(self):
+        if self.process is not None:
+            self.process.terminate()
+            self.process.wait(timeout=30)
+
+    async def connect(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        return await asyncio.open_connection("127.0.0.1", self.port)
+
+    async def close(self, connection: Tuple[asyncio.StreamReader, asyncio.StreamWriter]):
+        connection[1].close()
+
+    async def send(self, connection: Tuple[asyncio.StreamReader, asyncio.StreamWriter], request: Dict[str, Any]) -> int:
+        reader, writer = connection
+        body = json.dumps(request["body"]).encode() if request.get("body") is not None else b""
+        headers = {"Host": f"127.0.0.1:{self.port}", "Content-Type": "application/json",
+                   "Content-Length": str(len(body)), **request.get("headers", {})}
+        head = f"{request.get('method', 'POST')} {request['path']} HTTP/1.1\r\n"
+        head += "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+        writer.write(head.encode() + b"\r\n" + body)
+        await writer.drain()
+
+        status = int((await reader.readline()).split()[1])
+        response_headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+        if response_headers.get("transfer-encoding") == "chunked":
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                await reader.readexactly(size + 2)
+                if size == 0:
+                    break
+        else:
+            await reader.readexactly(int(response_headers.get("content-length", 0)))
+        return status
+
+    def ephemeris_calls(self) -> Optional[int]:
+        return None
+
+
+async def run_level(transport, corpus: List[Dict[str, Any]], concurrency: int, total: int) -> Dict[str, Any]:
+    """Send `total` requests from the corpus with `concurrency` clients and summarise them."""
+    indices = itertools.count()
+    latencies: List[float] = []
+    errors = 0
+
+    async def client():
+        nonlocal errors
+        connection = await transport.connect()
+        try:
+            while True:
+                index = next(indices)
+                if index >= total:
+                    return
+                started = time.perf_counter()
+                try:
+                    status = await transport.send(connection, corpus[index % len(corpus)])
+                except (OSError, asyncio.IncompleteReadError, ValueError, IndexError):
+                    status = None
+                    await transport.close(connection)
+                    connection = await transport.connect()
+                latencies.append(time.perf_counter() - started)
+                if status is None or status >= 400:
+                    errors += 1
+        finally:
+            await transport.close(connection)
+
+    transport.ephemeris_calls()
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    calls = transport.ephemeris_calls()
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "seconds": elapsed,
+        "requests_per_second": total / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "ephemeris_calls_per_request": calls / total if calls is not None else None,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(levels: List[Dict[str, Any]], baseline: Optional[Dict[int, Dict[str, Any]]] = None):
+    print(f"{'conc':>5} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7} {'ephe/req':>9}"
+          + (f" {'req/s vs base':>14} {'p99 vs base':>12}" if baseline else ""))
+    for level in levels:
+        calls = level["ephemeris_calls_per_request"]
+        line = (f"{level['concurrency']:>5} {level['requests_per_second']:>9.1f} {level['p50_ms']:>9.1f} "
+                f"{level['p95_ms']:>9.1f} {level['p99_ms']:>9.1f} {level['errors']:>7} "
+                f"{'-' if calls is None else format(calls, '.1f'):>9}")
+        base = (baseline or {}).get(level["concurrency"])
+        if base:
+            line += (f" {(level['requests_per_second'] / base['requests_per_second'] - 1) * 100:>+13.1f}%"
+                     f" {(level['p99_ms'] / base['p99_ms'] - 1) * 100:>+11.1f}%")
+        print(line)
+
+
+async def run(args, corpus: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    transport = UvicornTransport(args.workers, args.port) if args.transport == "uvicorn" else AsgiTransport()
+    await transport.start()
+    try:
+        levels = []
+        for concurrency in args.concurrency:
+            await run_level(transport, corpus, concurrency, len(corpus))
+            levels.append(await run_level(transport, corpus, concurrency, args.requests))
+        return levels
+    finally:
+        await transport.stop()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Load test the app at a sweep of concurrency levels")
+    parser.add_argument("--transport", choices=("asgi", "uvicorn"), default="asgi")
+    parser.add_argument("--concurrency", type=lambda v: [int(c) for c in v.split(",")], default=[1, 4, 16],
+                        help="comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per level")
+    parser.add_argument("--corpus", help="JSON Lines request corpus (a built-in mix when omitted)")
+    parser.add_argument("--env", action="append", default=[], metavar="NAME=VALUE", help="environment for the app")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--port", type=int, default=8765, help="uvicorn port")
+    parser.add_argument("--json", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare with")
+    args = parser.parse_args()
+
+    for assignment in args.env:
+        name, _, value = assignment.partition("=")
+        os.environ[name] = value
+    corpus = load_corpus(args.corpus) if args.corpus else default_corpus()
+    levels = asyncio.run(run(args, corpus))
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = {level["concurrency"]: level for level in json.load(f)["levels"]}
+    print_table(levels, baseline)
+
+    if args.json:
+        results = {
+            "commit": _git_commit(),
+            "transport": args.transport,
+            "workers": args.workers if args.transport == "uvicorn" else None,
+            "env": dict(assignment.partition("=")[::2] for assignment in args.env),
+            "corpus": args.corpus or "default",
+            "corpus_size": len(corpus),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "levels": levels,
+        }
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 1 if any(level["errors"] for level in levels) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+import asyncio
+from collections import OrderedDict, deque
+import logging
+import math
+import threading
+import time
+from typing import Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+"""
+Admission Control
+
+Bounds how much ephemeris work runs at once. Computation endpoints take a
+slot from a fixed pool before they start; requests beyond the pool wait in a
+bounded queue, and once the queue is full (or a request has waited too long)
+new requests are rejected immediately with a Retry-After hint instead of
+piling up and slowing every request down. An optional per-client token
+bucket rejects clients that exceed their request rate.
+
+Queue depth, in-flight work, wait and service times and rejections are
+exported through `metrics_text` in the Prometheus text format.
+"""
+
+# Recent wait/service times kept for the quantiles in the metrics
+SAMPLE_WINDOW = 1024
+
+# Clients tracked by the rate limiter; the least recently seen are forgotten
+MAX_CLIENTS = 10000
+
+
+class AdmissionRejected(Exception):
+    """Request rejected by admission control; maps to an HTTP error with Retry-After."""
+
+    def __init__(self, status_code: int, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Token bucket refilled at `rate` tokens per second up to `burst` tokens."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """
+        Take one token.
+
+        Returns:
+            float: 0 if a token was taken, otherwise seconds until one is available
+        """
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """Per-client token buckets, bounded to MAX_CLIENTS clients."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check(self, client: str) -> float:
+        """Seconds the client has to wait, 0 if the request may proceed."""
+        with self._lock:
+            bucket = self._buckets.get(client)
+            if bucket is None:
+                bucket = self._buckets[client] = TokenBucket(self.rate, self.burst)
+                while len(self._buckets) > MAX_CLIENTS:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(client)
+            return bucket.take()
+
+
+def _quantile(samples: List[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class AdmissionController:
+    """
+    Fixed pool of computation slots with a bounded wait queue.
+
+    Use `acquire`/`release` around the computation (see admission_slot in
+    main.py). The queue is FIFO: asyncio.Semaphore wakes waiters in order.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int, queue_timeout: float,
+                 rate_limiter: Optional[RateLimiter] = None):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self.rate_limiter = rate_limiter
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected: Dict[str, int] = {"queue_full": 0, "queue_timeout": 0, "rate_limit": 0}
+        self.wait_seconds_total = 0.0
+        self.service_seconds_total = 0.0
+        self.completed = 0
+        self._waits: Deque[float] = deque(maxlen=SAMPLE_WINDOW)
+        self._services: Deque[float] = deque(maxlen=SAMPLE_WINDOW)
+
+    def _retry_after(self) -> int:
+        """Seconds until a slot is likely free: the queue ahead drained at the recent service rate."""
+        service = sum(self._services) / len(self._services) if self._services else 1.0
+        return max(1, math.ceil(service * (self.queued + 1) / self.max_concurrency))
+
+    def _reject(self, status_code: int, reason: str, retry_after: int) -> None:
+        self.rejected[reason] += 1
+        logger.warning(f"Admission rejected ({reason}): {self.in_flight} in flight, {self.queued} queued")
+        raise AdmissionRejected(status_code, reason, retry_after)
+
+    def check_rate(self, client: Optional[str]) -> None:
+        """
+        Apply the client's rate limit, if one is configured.
+
+        Raises:
+            AdmissionRejected: 429 if the client exceeded its rate
+        """
+        if self.rate_limiter is not None and client is not None:
+            wait = self.rate_limiter.check(client)
+            if wait > 0:
+                self._reject(429, "rate_limit", max(1, math.ceil(wait)))
+
+    async def acquire(self, client: Optional[str] = None) -> float:
+        """
+        Take a computation slot, waiting in the queue if all slots are busy.
+
+        Args:
+            client (str, optional): Client identity for the rate limiter; the
+                rate limit is skipped when omitted (see check_rate)
+
+        Returns:
+            float: Monotonic time the slot was granted (pass to release)
+
+        Raises:
+            AdmissionRejected: 429 if the client exceeded its rate, 503 if the
+                queue is full or the wait exceeded the queue timeout
+        """
+        self.check_rate(client)
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        # Count admitted-but-not-yet-running requests too: waiters only take
+        # the semaphore once the event loop gets round to them
+        if self.in_flight + self.queued >= self.max_concurrency + self.max_queue:
+            self._reject(503, "queue_full", self._retry_after())
+
+        queued_at = time.monotonic()
+        self.queued += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._reject(503, "queue_timeout", self._retry_after())
+        finally:
+            self.queued -= 1
+
+        started = time.monotonic()
+        wait = started - queued_at
+        self.in_flight += 1
+        self.admitted += 1
+        self.wait_seconds_total += wait
+        self._waits.append(wait)
+        return started
+
+    def release(self, started: float) -> None:
+        """Return a slot taken by acquire."""
+        service = time.monotonic() - started
+        self.in_flight -= 1
+        self.completed += 1
+        self.service_seconds_total += service
+        self._services.append(service)
+        self._semaphore.release()
+
+    def metrics_text(self) -> str:
+        """Admission metrics in the Prometheus text exposition format."""
+        waits, services = list(self._waits), list(self._services)
+        lines = [
+            "# HELP vastr_admission_in_flight Computations currently running",
+            "# TYPE vastr_admission_in_flight gauge",
+            f"vastr_admission_in_flight {self.in_flight}",
+            "# HELP vastr_admission_queue_depth Requests waiting for a computation slot",
+            "# TYPE vastr_admission_queue_depth gauge",
+            f"vastr_admission_queue_depth {self.queued}",
+            "# HELP vastr_admission_slots Computation slots",
+            "# TYPE vastr_admission_slots gauge",
+            f"vastr_admission_slots {self.max_concurrency}",
+            "# HELP vastr_admission_admitted_total Requests given a computation slot",
+            "# TYPE vastr_admission_admitted_total counter",
+            f"vastr_admission_admitted_total {self.admitted}",
+            "# HELP vastr_admission_rejected_total Requests rejected by admission control",
+            "# TYPE vastr_admission_rejected_total counter",
+        ]
+        lines += [f'vastr_admission_rejected_total{{reason="{reason}"}} {count}' for reason, count in self.rejected.items()]
+        for name, description, samples, total, count in (
+            ("wait", "Time spent queued for a computation slot", waits, self.wait_seconds_total, self.admitted),
+            ("service", "Time a computation slot was held", services, self.service_seconds_total, self.completed),
+        ):
+            metric = f"vastr_admission_{name}_seconds"
+            lines += [f"# HELP {metric} {description} (quantiles over the last {SAMPLE_WINDOW} requests)",
+                      f"# TYPE {metric} summary"]
+            lines += [f'{metric}{{quantile="{q}"}} {_quantile(samples, q):.6f}' for q in (0.5, 0.95, 0.99)]
+            lines += [f"{metric}_sum {total:.6f}", f"{metric}_count {count}"]
+        return "\n".join(lines) + "\n"
@@ -1,11 +1,17 @@
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta, tzinfo
+import os
+import threading
+import time
 import swisseph as swe
 import pytz
 import logging
-import requests
 import json
-from functools import lru_cache
-from typing import Dict, Any
+import numpy as np
+from config import EPHE_PATH, SERIES_PATH, EPHE_START_YEAR, EPHE_END_YEAR, TABLES_DIR
+from utils.cache import LRUCache, make_cache, register_cache
+from utils.series import LongitudeSeries, load_series, hermite_array
+from utils.tables import shared_tables
+from typing import Dict, Any, Optional
 
 """
 Vedic Astronomy Utilities
@@ -14,14 +20,13 @@ This module provides astronomical calculations using the Vedic (sidereal) system
 All calculations use:
 - Lahiri ayanamsa (Indian standard)
 - Sidereal zodiac (fixed star-based)
-- Topocentric positions (observer's location)
+- Geocentric positions, or topocentric positions (observer's location) on request
 - Swiss Ephemeris for precise calculations
 
-The ephemeris path must be set before using these functions (typically in main.py).
+The ephemeris is initialised lazily on first use (see ensure_ephemeris), so
+importing this module does no ephemeris I/O.
 """
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 
@@ -52,11 +57,91 @@ def setup_astronomy():
     
     return flags
 
-# Initialize astronomy settings
-CALC_FLAGS = setup_astronomy()
+# Calculation flags, finalised by setup_astronomy on first use
+CALC_FLAGS = swe.FLG_SWIEPH | swe.FLG_SPEED3
 
-# Cache for elevation data
-_elevation_cache: Dict[str, float] = {}
+# pyswisseph keeps its settings (ephemeris path, sidereal mode, topocentric
+# position) per thread, so every thread that computes must apply them
+_thread_settings = threading.local()
+
+_ephemeris_ready = False
+_ephemeris_lock = threading.Lock()
+
+def ensure_ephemeris() -> None:
+    """
+    Initialise the Swiss Ephemeris on first use in each thread.
+    
+    Sets the ephemeris path and Lahiri ayanamsa, and the first time verifies
+    the ephemeris files. Every function here that calls into Swiss Ephemeris
+    goes through this, so importing the module stays free of ephemeris I/O;
+    call it explicitly to pay the cost up front (see warm_up in
+    core.panchanga). Swiss Ephemeris settings are thread-local, so worker
+    threads (e.g. FastAPI's threadpool) apply them again on first use.
+    """
+    global CALC_FLAGS, _ephemeris_ready
+    if getattr(_thread_settings, "ready", False):
+        return
+    with _ephemeris_lock:
+        swe.set_ephe_path(EPHE_PATH)
+        if _ephemeris_ready:
+            swe.set_sid_mode(swe.SIDM_LAHIRI)
+        else:
+            logger.debug(f"Setting ephemeris path to: {EPHE_PATH}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Ephemeris directory exists: {os.path.exists(EPHE_PATH)}")
+                if os.path.isdir(EPHE_PATH):
+                    logger.debug(f"Ephemeris directory contents: {os.listdir(EPHE_PATH)}")
+            CALC_FLAGS = setup_astronomy()
+            _ephemeris_ready = True
+    _thread_settings.ready = True
+
+def cache_version() -> str:
+    """
+    Fingerprint of the calculation settings that cached results depend on.
+    
+    Shared caches include it in every key, so replicas running with a
+    different ayanamsa, ephemeris (Swiss Ephemeris files or the Moshier
+    fallback) or library version never read each other's results.
+    """
+    ensure_ephemeris()
+    return f"sid{swe.SIDM_LAHIRI}-flags{CALC_FLAGS}-swe{swe.version}"
+
+# Elevations looked up so far, by "lat,lon". Failed lookups are not kept, and
+# neither are results computed with their 0m fallback (sunrise/sunset, moon
+# times, topocentric boundaries), so a snapshot never preserves the fallback
+_elevation_cache = register_cache("elevation", LRUCache(maxsize=100000))
+
+# Seconds before a failed elevation lookup is retried; until then the
+# location gets the fallback without waiting on the API again
+ELEVATION_RETRY_SECONDS = 60
+
+# When each recently failed location may be retried (monotonic clock), by
+# "lat,lon"; not registered, so snapshots leave it out
+_elevation_retry_at = LRUCache(maxsize=10000)
+
+# Size (degrees) of the location cells that location-dependent results are
+# quantised to. A 0.1° cell keeps the observer within ~8 km of the cell
+# centre, which moves the Moon's topocentric longitude by at most ~5"
+# (about 10 seconds of limb boundary time).
+LOCATION_CELL_DEG = 0.1
+
+def location_cell(lat: float, lon: float, size: float = LOCATION_CELL_DEG) -> tuple[float, float]:
+    """
+    Snap coordinates to the centre of their location cell.
+    
+    Args:
+        lat: latitude in degrees
+        lon: longitude in degrees
+        size: cell size in degrees
+    
+    Returns:
+        tuple: (lat, lon) of the cell centre, rounded so equal cells compare equal
+    """
+    cell_lat = min(max((int((lat + 90) // size) + 0.5) * size - 90, -90.0), 90.0)
+    cell_lon = (int((lon + 180) // size) + 0.5) * size - 180
+    if cell_lon > 180:
+        cell_lon -= 360
+    return round(cell_lat, 6), round(cell_lon, 6)
 
 def debug_swe_calc(func_name: str, jd: float, result: tuple) -> None:
     """
@@ -73,28 +158,36 @@ def debug_swe_calc(func_name: str, jd: float, result: tuple) -> None:
     if len(result) > 2:
         logger.debug(f"Additional data: {result[2:]}")
 
-@lru_cache(maxsize=1000)
-def get_elevation(lat: float, lon: float) -> float:
+def lookup_elevation(lat: float, lon: float) -> tuple[float, bool]:
     """
     Get elevation in meters for given coordinates using Open Topo Data API.
     Uses the GEBCO2020 dataset which provides global coverage with ~450m resolution.
-    Implements caching to avoid repeated API calls for the same coordinates.
+    Successful lookups are cached to avoid repeated API calls for the same
+    coordinates; failed ones fall back to 0m and are retried after
+    ELEVATION_RETRY_SECONDS.
     
     Args:
         lat: latitude in degrees
         lon: longitude in degrees
     
     Returns:
-        float: elevation in meters above sea level
+        tuple: (elevation in meters above sea level, whether it was looked up
+            rather than the 0m fallback)
     """
+    # Imported on first lookup, it is only needed for the elevation API
+    import requests
+    
     try:
         # Create cache key
         cache_key = f"{lat},{lon}"
         
         # Check cache first
-        if cache_key in _elevation_cache:
-            logger.debug(f"Using cached elevation for lat={lat}, lon={lon}: {_elevation_cache[cache_key]}m")
-            return _elevation_cache[cache_key]
+        cached = _elevation_cache.get(cache_key)
+        if cached is not None:
+            logger.debug(f"Using cached elevation for lat={lat}, lon={lon}: {cached}m")
+            return cached, True
+        if time.monotonic() < (_elevation_retry_at.get(cache_key) or 0.0):
+            return 0.0, False
         
         url = f"https://api.opentopodata.org/v1/gebco2020?locations={lat},{lon}"
         logger.debug(f"Requesting elevation data from: {url}")
@@ -110,32 +203,44 @@ def get_elevation(lat: float, lon: float) -> float:
             elevation = data["results"][0]["elevation"]
             logger.debug(f"Elevation lookup result for lat={lat}, lon={lon}: {elevation}m")
             # Cache the result
-            _elevation_cache[cache_key] = float(elevation)
-            return float(elevation)
+            _elevation_cache.put(cache_key, float(elevation))
+            return float(elevation), True
         else:
             logger.warning(f"No elevation data found for lat={lat}, lon={lon}. Using 0m as fallback.")
-            _elevation_cache[cache_key] = 0.0
-            return 0.0
             
     except requests.Timeout:
         logger.warning(f"Elevation lookup timed out for lat={lat}, lon={lon}. Using 0m as fallback.")
-        _elevation_cache[f"{lat},{lon}"] = 0.0
-        return 0.0
     except Exception as e:
         logger.warning(f"Elevation lookup failed: {str(e)}. Using 0m as fallback.")
-        _elevation_cache[f"{lat},{lon}"] = 0.0
-        return 0.0
+    _elevation_retry_at.put(cache_key, time.monotonic() + ELEVATION_RETRY_SECONDS)
+    return 0.0, False
+
+def get_elevation(lat: float, lon: float) -> float:
+    """
+    Get elevation in meters for given coordinates (see lookup_elevation).
+    
+    Args:
+        lat: latitude in degrees
+        lon: longitude in degrees
+    
+    Returns:
+        float: elevation in meters above sea level, 0 when the lookup failed
+    """
+    return lookup_elevation(lat, lon)[0]
 
-def get_sun_moon_positions(dt: datetime, lat: float, lon: float) -> tuple[dict, dict]:
+def get_sun_moon_positions(dt: datetime, lat: float, lon: float, topocentric: bool = False) -> tuple[dict, dict]:
     """
     Calculate sun and moon positions for given datetime and location.
     Returns a tuple of dictionaries containing longitude and latitude for sun and moon.
     
-    Note: For tithi calculations, we use geocentric positions as they are sufficient
-    for determining the angular distance between Sun and Moon.
+    Note: By default positions are geocentric, which is sufficient for determining
+    the angular distance between Sun and Moon. With topocentric=True they are
+    corrected for the observer's location and elevation (the Moon's parallax
+    can shift its longitude by up to ~1°).
     """
     try:
         logger.debug(f"Calculating positions for dt={dt}, lat={lat}, lon={lon}")
+        ensure_ephemeris()
         
         # Convert datetime to Julian day
         jd_et, jd_ut = datetime_to_jd(dt)
@@ -147,14 +252,14 @@ def get_sun_moon_positions(dt: datetime, lat: float, lon: float) -> tuple[dict,
         
         # Use global calculation flags with sidereal mode only
         flags = CALC_FLAGS | swe.FLG_SIDEREAL
-        logger.debug(f"Calculation flags: {flags}")
-        
-        # Calculate sun position
+        if topocentric:
+            # set_topo requires [lon, lat, elev]
+            swe.set_topo(lon, lat, get_elevation(lat, lon))
+            flags |= swe.FLG_TOPOCTR
         sun_result = swe.calc_ut(jd_ut, swe.SUN, flags)
-        logger.debug(f"Sun calculation result: pos={sun_result}")
-        
-        # Calculate moon position
         moon_result = swe.calc_ut(jd_ut, swe.MOON, flags)
+        logger.debug(f"Calculation flags: {flags}")
+        logger.debug(f"Sun calculation result: pos={sun_result}")
         logger.debug(f"Moon calculation result: pos={moon_result}")
         
         # Extract positions and create dictionaries
@@ -169,12 +274,212 @@ def get_sun_moon_positions(dt: datetime, lat: float, lon: float) -> tuple[dict,
         logger.error(f"Error calculating sun and moon positions: {str(e)}")
         raise ValueError(f"Failed to calculate sun and moon positions: {str(e)}")
 
+_series: Optional[LongitudeSeries] = None
+_series_loaded = False
+_series_lock = threading.Lock()
+
+def get_longitude_series() -> Optional[LongitudeSeries]:
+    """
+    The precomputed Sun/Moon longitude series (SERIES_PATH), opened on first use.
+    
+    Returns:
+        LongitudeSeries, or None when none is configured or it does not match
+        the current calculation settings
+    """
+    global _series, _series_loaded
+    if not _series_loaded:
+        with _series_lock:
+            if not _series_loaded:
+                _series = load_series(SERIES_PATH, cache_version())
+                _series_loaded = True
+    return _series
+
+# Batcher evaluating get_sun_moon_longitudes points (utils.batching), if enabled
+_ephemeris_batcher = None
+
+# Computations on the event loop thread never wait for a batch
+_main_thread_id = threading.main_thread().ident
+
+def set_ephemeris_batcher(batcher) -> None:
+    """
+    Install (or with None remove) the batcher that get_sun_moon_longitudes
+    hands its Swiss Ephemeris evaluations to.
+
+    Args:
+        batcher: utils.batching.EphemerisBatcher, or None
+    """
+    global _ephemeris_batcher
+    _ephemeris_batcher = batcher
+
+def get_sun_moon_longitudes(jd_ut: float, lat: float = 0.0, lon: float = 0.0, topocentric: bool = False) -> tuple[float, float, float, float]:
+    """
+    Sidereal longitudes and daily speeds of the Sun and Moon at a Julian day (UT).
+    
+    This is the lean variant of get_sun_moon_positions used by the bulk solvers:
+    it takes a Julian day directly and skips the per-call debug logging.
+    Geocentric positions inside the range of the longitude series (see
+    get_longitude_series) are interpolated from it without calling Swiss
+    Ephemeris. With an ephemeris batcher installed (see
+    set_ephemeris_batcher), the other positions computed in worker threads
+    are evaluated in batches with those of concurrent computations.
+    
+    Args:
+        jd_ut: Julian day number in UT1
+        lat: latitude in degrees (topocentric mode only)
+        lon: longitude in degrees (topocentric mode only)
+        topocentric: use topocentric positions for the observer location
+    
+    Returns:
+        tuple: (sun_lon, sun_speed, moon_lon, moon_speed) in degrees and degrees/day
+    """
+    if not topocentric:
+        series = get_longitude_series()
+        if series is not None and series.covers(jd_ut):
+            return series.sun_moon(jd_ut)
+    batcher = _ephemeris_batcher
+    if batcher is not None and threading.get_ident() != _main_thread_id:
+        return batcher.sun_moon(jd_ut, lat, lon, topocentric)
+    return calc_sun_moon_longitudes(jd_ut, lat, lon, topocentric)
+
+def calc_sun_moon_longitudes(jd_ut: float, lat: float = 0.0, lon: float = 0.0, topocentric: bool = False) -> tuple[float, float, float, float]:
+    """get_sun_moon_longitudes computed directly with Swiss Ephemeris (no series, no batching)."""
+    ensure_ephemeris()
+    flags = CALC_FLAGS | swe.FLG_SIDEREAL | swe.FLG_SPEED
+    if topocentric:
+        swe.set_topo(lon, lat, get_elevation(lat, lon))
+        flags |= swe.FLG_TOPOCTR
+    sun = swe.calc_ut(jd_ut, swe.SUN, flags)[0]
+    moon = swe.calc_ut(jd_ut, swe.MOON, flags)[0]
+    return sun[0], sun[3], moon[0], moon[3]
+
+# Grid (days) geocentric batches are sampled on when that takes fewer
+# evaluations than the instants themselves; the longitude series' default step
+BATCH_GRID_STEP = 1 / 24
+
+def _calc_sun_moon(jd_ut: np.ndarray, flags: int) -> np.ndarray:
+    """Rows (sun_lon, sun_speed, moon_lon, moon_speed) from Swiss Ephemeris, in time order for its file cache."""
+    positions = np.empty((len(jd_ut), 4))
+    order = np.argsort(jd_ut, kind="stable")
+    for row, jd in zip(order.tolist(), jd_ut[order].tolist()):
+        sun = swe.calc_ut(jd, swe.SUN, flags)[0]
+        moon = swe.calc_ut(jd, swe.MOON, flags)[0]
+        positions[row] = sun[0], sun[3], moon[0], moon[3]
+    return positions
+
+def get_sun_moon_longitude_arrays(jd_ut: np.ndarray, lat: float = 0.0, lon: float = 0.0, topocentric: bool = False,
+                                  exact: bool = False) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Vectorised get_sun_moon_longitudes for an array of Julian days (UT).
+
+    Geocentric instants inside the longitude series are interpolated in one
+    array operation; the others are computed with Swiss Ephemeris in a single
+    loop, with the ephemeris set up (and the observer location set) once for
+    the whole batch. When geocentric instants outnumber the hours they fall
+    in, Swiss Ephemeris is evaluated only on the hourly grid points around
+    them and the instants are interpolated like the longitude series (within
+    ~2e-7 degrees, see utils.series), unless exact is set.
+
+    Args:
+        jd_ut: Julian days in UT1
+        lat: latitude in degrees (topocentric mode only)
+        lon: longitude in degrees (topocentric mode only)
+        topocentric: use topocentric positions for the observer location
+        exact: evaluate every instant outside the series with Swiss Ephemeris,
+            as get_sun_moon_longitudes does
+
+    Returns:
+        tuple: Arrays (sun_lon, sun_speed, moon_lon, moon_speed) in degrees and degrees/day
+    """
+    jd_ut = np.asarray(jd_ut, dtype=float)
+    out = np.empty((4, jd_ut.size))
+    todo = np.ones(jd_ut.size, dtype=bool)
+    if not topocentric:
+        series = get_longitude_series()
+        if series is not None:
+            todo = (jd_ut < series.jd_start) | (jd_ut >= series.jd_end)
+            if not todo.all():
+                out[:, ~todo] = series.sun_moon_array(jd_ut[~todo])
+    if todo.any():
+        ensure_ephemeris()
+        flags = CALC_FLAGS | swe.FLG_SIDEREAL | swe.FLG_SPEED
+        if topocentric:
+            swe.set_topo(lon, lat, get_elevation(lat, lon))
+            positions = _calc_sun_moon(jd_ut[todo], flags | swe.FLG_TOPOCTR)
+        else:
+            offset = jd_ut[todo] / BATCH_GRID_STEP
+            index = np.floor(offset)
+            grid, inverse = np.unique(np.concatenate((index, index + 1)), return_inverse=True)
+            if not exact and len(grid) < len(index):
+                rows = _calc_sun_moon(grid * BATCH_GRID_STEP, flags)
+                positions = np.column_stack(hermite_array(offset - index, BATCH_GRID_STEP,
+                                                          rows[inverse[:len(index)]], rows[inverse[len(index):]]))
+            else:
+                positions = _calc_sun_moon(jd_ut[todo], flags)
+        out[:, todo] = positions.T
+    return out[0], out[1], out[2], out[3]
+
+def get_body_longitude(jd_ut: float, body: int) -> tuple[float, float]:
+    """
+    Sidereal longitude and daily speed of any Swiss Ephemeris body at a Julian day (UT).
+    
+    Lean variant for sweeps over many instants, like get_sun_moon_longitudes.
+    
+    Args:
+        jd_ut: Julian day number in UT1
+        body: Swiss Ephemeris body number (e.g. swe.MARS, swe.MEAN_NODE)
+    
+    Returns:
+        tuple: (longitude, speed) in degrees and degrees/day; negative speed is retrograde
+    """
+    ensure_ephemeris()
+    position = swe.calc_ut(jd_ut, body, CALC_FLAGS | swe.FLG_SIDEREAL | swe.FLG_SPEED)[0]
+    return position[0], position[3]
+
+# Swiss Ephemeris house system of the chart houses: whole sign, which is
+# defined at every latitude (Placidus and Koch fail in polar regions)
+CHART_HOUSE_SYSTEM = b'W'
+
+def get_chart_positions(jd_ut: float, bodies: list, lat: Optional[float] = None, lon: Optional[float] = None) -> tuple[list, Optional[float], Optional[list]]:
+    """
+    Sidereal positions of several bodies, and optionally the ascendant and
+    house cusps, at one Julian day (UT).
+    
+    One call path for a whole chart: the ephemeris check and flags are done
+    once and every body is evaluated at the same Julian day, instead of a
+    datetime conversion and sidereal mode setup per body.
+    
+    Args:
+        jd_ut: Julian day number in UT1
+        bodies: Swiss Ephemeris body numbers
+        lat: latitude in degrees, for the ascendant and houses
+        lon: longitude in degrees, for the ascendant and houses
+    
+    Returns:
+        tuple: ([(longitude, latitude, speed) per body], sidereal ascendant
+            longitude, sidereal longitudes of the 12 house cusps in the
+            CHART_HOUSE_SYSTEM); the last two are None when no location is given
+    """
+    ensure_ephemeris()
+    flags = CALC_FLAGS | swe.FLG_SIDEREAL | swe.FLG_SPEED
+    positions = []
+    for body in bodies:
+        xx = swe.calc_ut(jd_ut, body, flags)[0]
+        positions.append((xx[0], xx[1], xx[3]))
+    ascendant = cusps = None
+    if lat is not None and lon is not None:
+        cusps, ascmc = swe.houses_ex(jd_ut, max(min(lat, 89.9999), -89.9999), lon, CHART_HOUSE_SYSTEM, swe.FLG_SIDEREAL)
+        ascendant, cusps = ascmc[0], list(cusps[:12])
+    return positions, ascendant, cusps
+
 def datetime_to_jd(dt: datetime) -> tuple[float, float]:
     """
     Convert datetime to Julian day numbers (both ET/TT and UT1).
     
+    Fast scalar path: the UTC components are taken from the datetime's own
+    UTC offset (no pytz conversion) and passed straight to swe.utc_to_jd.
+    
     Args:
-        dt: datetime object (timezone-aware recommended)
+        dt: datetime object (timezone-aware recommended; naive means UTC)
     
     Returns:
         tuple: (jd_et, jd_ut) where:
@@ -185,48 +490,11 @@ def datetime_to_jd(dt: datetime) -> tuple[float, float]:
         ValueError: If conversion fails
     """
     try:
-        # Convert to UTC if not already
-        if dt.tzinfo is None:
-            dt = pytz.UTC.localize(dt)
-        else:
-            dt = dt.astimezone(pytz.UTC)
-        
-        logger.debug(f"Converting datetime {dt} to Julian day")
-        logger.debug(f"Input datetime timezone: {dt.tzinfo}")
-        logger.debug(f"UTC datetime: {dt}")
-        
-        # Extract components
-        year = dt.year
-        month = dt.month
-        day = dt.day
-        hour = dt.hour
-        minute = dt.minute
-        second = dt.second + dt.microsecond / 1000000.0
-        
-        logger.debug(f"Extracted components - Year: {year}, Month: {month}, Day: {day}")
-        logger.debug(f"Extracted components - Hour: {hour}, Minute: {minute}, Second: {second}")
-        
-        # Convert to Julian day
-        logger.debug("Calling swe.utc_to_jd with parameters:")
-        logger.debug(f"  year={year}, month={month}, day={day}")
-        logger.debug(f"  hour={hour}, minute={minute}, second={second}")
-        logger.debug(f"  calendar=1")
-        
-        result = swe.utc_to_jd(year, month, day, hour, minute, second, 1)
-        
-        logger.debug(f"Raw result from swe.utc_to_jd: {result}")
-        logger.debug(f"Result type: {type(result)}")
-        logger.debug(f"Result length: {len(result)}")
-        logger.debug(f"Result elements: {[type(x) for x in result]}")
-        logger.debug(f"Result values: {result}")
-        
-        # Extract Julian day values
-        jd_et, jd_ut = result
-        
-        logger.debug(f"Extracted JD values - ET: {jd_et}, UT: {jd_ut}")
-        logger.debug(f"Final converted values - ET: {jd_et}, UT: {jd_ut}")
-        
-        return jd_et, jd_ut
+        offset = dt.utcoffset()
+        if offset:
+            dt = dt - offset
+        ensure_ephemeris()
+        return swe.utc_to_jd(dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second + dt.microsecond / 1000000.0, swe.GREG_CAL)
     except Exception as e:
         logger.error(f"Error converting datetime to Julian day: {str(e)}")
         raise ValueError(f"Failed to convert datetime to Julian day: {str(e)}")
@@ -241,27 +509,196 @@ def jd_to_datetime(jd: float) -> datetime:
     Returns:
         datetime: UTC datetime object
     """
-    logger.debug(f"Converting JD {jd} to datetime")
+    ensure_ephemeris()
+    year, month, day, hour, minute, second = swe.jdut1_to_utc(jd, swe.GREG_CAL)
+    
+    # Split second into second and microsecond; during a leap second
+    # (23:59:60) 23:59:59 repeats, as in Unix time
+    second_int = min(int(second), 59)
+    microsecond = min(int((second - int(second)) * 1000000), 999999)
+    return datetime(year, month, day, hour, minute, second_int, microsecond, tzinfo=pytz.UTC)
+
+# Julian day of the Unix epoch (1970-01-01T00:00:00Z)
+UNIX_EPOCH_JD = 2440587.5
+
+# 1972-01-01, from when UTC follows TAI with whole leap seconds
+J1972 = 2441317.5
+
+# TT - TAI in seconds, and TAI - UTC when leap seconds began
+TT_TAI = 32.184
+LEAP_SECONDS_1972 = 10
+
+# Largest Delta-T interpolation error (seconds) in a table cell before the
+# cell is computed exactly instead
+DELTA_T_TOLERANCE = 5e-7
+
+
+class TimeScales:
+    """
+    Cached Delta-T and leap-second tables for array time conversions.
+    
+    Delta-T (TT - UT1) is sampled daily over the served years (EPHE_START_YEAR
+    to EPHE_END_YEAR) and interpolated linearly, which is within 0.1 µs of
+    swe.deltat for most days. Swiss Ephemeris Delta-T has small steps (1 ms)
+    at some year boundaries; cells whose interpolation error at the midpoint
+    exceeds DELTA_T_TOLERANCE, and dates outside the table, use swe.deltat
+    directly. Leap seconds are read off swe.utc_to_jd month by month, so they
+    follow the table Swiss Ephemeris itself uses (including a seleapsec.txt in
+    the ephemeris directory), as does its rule of treating UTC as UT1 past
+    the end of that table.
+    
+    With a tables directory the arrays are memory-mapped from it (see
+    utils.tables), so all worker processes share one copy and only the
+    first one builds them.
+    
+    Attributes:
+        jd_start (float): Julian day of the first Delta-T sample
+        delta_t (np.ndarray): Daily Delta-T in days
+        exact (np.ndarray): Per cell, whether to call swe.deltat instead
+        leap_utc (np.ndarray): Unix timestamps from which each leap second counts
+        leap_tt (np.ndarray): Seconds of TT since the Unix epoch at which each
+            leap second begins
+    """
+
+    def __init__(self, start_year: int, end_year: int, directory: Optional[str] = None):
+        ensure_ephemeris()
+        self.jd_start = swe.julday(start_year - 1, 1, 1, 0.0)
+        if directory:
+            tables = shared_tables(directory, "time_scales", f"{cache_version()}-{start_year}-{end_year}",
+                                   lambda: self._build(start_year, end_year))
+        else:
+            tables = self._build(start_year, end_year)
+        self.delta_t, self.exact, self.leap_utc, self.leap_tt = (tables[name] for name in ("delta_t", "exact", "leap_utc", "leap_tt"))
+
+    def _build(self, start_year: int, end_year: int) -> Dict[str, np.ndarray]:
+        jd_end = swe.julday(end_year + 2, 1, 1, 0.0)
+        grid = np.arange(self.jd_start, jd_end + 1.0)
+        delta_t = np.array([swe.deltat(jd) for jd in grid])
+        midpoints = np.array([swe.deltat(jd) for jd in grid[:-1] + 0.5])
+        error = np.abs((delta_t[:-1] + delta_t[1:]) / 2 - midpoints) * 86400
+        exact = error > DELTA_T_TOLERANCE
+
+        leaps = []
+        previous = LEAP_SECONDS_1972
+        for year in range(1972, end_year + 1):
+            for month in range(1, 13):
+                jd = swe.julday(year, month, 1, 0.0)
+                offset = (swe.utc_to_jd(year, month, 1, 0, 0, 0.0, swe.GREG_CAL)[0] - jd) * 86400 - TT_TAI
+                if abs(offset - round(offset)) > 1e-3:
+                    # Past the leap second table UTC is taken as UT1
+                    break
+                leaps += [jd] * (round(offset) - previous)
+                previous = round(offset)
+            else:
+                continue
+            break
+        leap_utc = (np.array(leaps, dtype=float) - UNIX_EPOCH_JD) * 86400
+        leap_tt = leap_utc + TT_TAI + LEAP_SECONDS_1972 + np.arange(len(leaps))
+        logger.info(f"Built time scale tables for {start_year}-{end_year}: {grid.size} Delta-T samples "
+                    f"({int(exact.sum())} exact cells), {len(leaps)} leap seconds")
+        return {"delta_t": delta_t, "exact": exact, "leap_utc": leap_utc, "leap_tt": leap_tt}
+
+    def deltat(self, jd_ut: np.ndarray) -> np.ndarray:
+        """Delta-T in days at an array of Julian days (UT), as swe.deltat."""
+        offset = jd_ut - self.jd_start
+        index = np.floor(offset).astype(np.int64)
+        inside = (index >= 0) & (index < len(self.exact))
+        cell = np.where(inside, index, 0)
+        t = offset - cell
+        values = self.delta_t[cell] * (1 - t) + self.delta_t[cell + 1] * t
+        exact = ~inside | self.exact[cell]
+        if exact.any():
+            values[exact] = [swe.deltat(jd) for jd in jd_ut[exact]]
+        return values
+
+    def leap_seconds(self, utc: np.ndarray) -> np.ndarray:
+        """TAI - UTC in seconds at Unix timestamps from 1972 on."""
+        return LEAP_SECONDS_1972 + np.searchsorted(self.leap_utc, utc, side="right")
+
+
+_time_scales: Optional[TimeScales] = None
+_time_scales_lock = threading.Lock()
+
+def get_time_scales() -> TimeScales:
+    """The Delta-T and leap-second tables (see TimeScales), built on first use."""
+    global _time_scales
+    if _time_scales is None:
+        with _time_scales_lock:
+            if _time_scales is None:
+                _time_scales = TimeScales(EPHE_START_YEAR, EPHE_END_YEAR, TABLES_DIR)
+    return _time_scales
+
+def timestamps_to_jd(timestamps: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorised datetime_to_jd for Unix timestamps (seconds of UTC).
+    
+    Follows swe.utc_to_jd: before 1972, and past the end of the leap second
+    table, the time is taken as UT1; otherwise TT is UTC plus the leap
+    seconds and 32.184 s, and UT1 is TT minus Delta-T. Results agree with
+    swe.utc_to_jd to the resolution of a Julian day in double precision
+    (~40 µs).
+    
+    Args:
+        timestamps: Unix timestamps (float seconds, no leap seconds)
+    
+    Returns:
+        tuple: Arrays (jd_et, jd_ut) of Julian days in TT and UT1
+    """
+    scales = get_time_scales()
+    utc = np.asarray(timestamps, dtype=float)
+    jd_utc = UNIX_EPOCH_JD + utc / 86400
+    leap = scales.leap_seconds(utc)
+    midnight = UNIX_EPOCH_JD + np.floor(utc / 86400)
+    as_ut1 = (jd_utc < J1972) | (scales.deltat(midnight) * 86400 - leap - TT_TAI >= 1.0)
+
+    jd_et = np.where(as_ut1, 0.0, jd_utc + (leap + TT_TAI) / 86400)
+    jd_ut = np.where(as_ut1, jd_utc, 0.0)
+    if as_ut1.any():
+        jd_et[as_ut1] = jd_utc[as_ut1] + scales.deltat(jd_utc[as_ut1])
+    if not as_ut1.all():
+        tt = jd_et[~as_ut1]
+        jd_ut[~as_ut1] = tt - scales.deltat(tt - scales.deltat(tt))
+    return jd_et, jd_ut
+
+def jd_to_timestamps(jd_ut: np.ndarray) -> np.ndarray:
+    """
+    Vectorised jd_to_datetime: Unix timestamps (seconds of UTC) of Julian days (UT1).
     
-    # Convert Julian day to UTC components using swe_jdut1_to_utc
-    result = swe.jdut1_to_utc(jd, swe.GREG_CAL)
+    Follows swe.jdut1_to_utc and agrees with it to the resolution of the
+    input Julian days (~40 µs). Inside a leap second the timestamp repeats
+    23:59:59, as Unix time does.
+    
+    Args:
+        jd_ut: Julian days in UT1
     
-    # Extract components
-    year = result[0]
-    month = result[1]
-    day = result[2]
-    hour = result[3]
-    minute = result[4]
-    second = result[5]
+    Returns:
+        np.ndarray: Unix timestamps (float seconds)
+    """
+    scales = get_time_scales()
+    jd_ut = np.asarray(jd_ut, dtype=float)
+    delta_t = scales.deltat(jd_ut)
+    jd_et = jd_ut + delta_t
+    # Seconds of TT since the Unix epoch, kept in seconds to avoid rounding
+    # twice at Julian day resolution
+    tt = (jd_ut - UNIX_EPOCH_JD) * 86400 + delta_t * 86400
+    delta_t_back = scales.deltat(jd_et - scales.deltat(jd_et))
+    leap = LEAP_SECONDS_1972 + np.searchsorted(scales.leap_tt, tt, side="right")
+    as_ut1 = (jd_et < J1972 + (TT_TAI + LEAP_SECONDS_1972) / 86400) | (delta_t_back * 86400 - leap - TT_TAI >= 1.0)
+    return np.where(as_ut1, tt - delta_t_back * 86400, tt - TT_TAI - leap)
+
+def jd_to_iso(jd: float, tz: Optional[tzinfo] = None) -> str:
+    """
+    Format a Julian day (UT1) as an ISO 8601 timestamp.
     
-    # Split second into second and microsecond
-    second_int = int(second)
-    microsecond = int((second - second_int) * 1000000)
+    Args:
+        jd: Julian day number in UT1
+        tz: timezone to express the time in (UTC when omitted)
     
-    # Create datetime object
-    dt = datetime(year, month, day, hour, minute, second_int, microsecond, tzinfo=pytz.UTC)
-    logger.debug(f"Converted datetime: {dt}")
-    return dt
+    Returns:
+        str: ISO 8601 timestamp with UTC offset
+    """
+    moment = jd_to_datetime(jd)
+    return (moment.astimezone(tz) if tz else moment).isoformat()
 
 def calculate_next_sunrise(dt: datetime, lat: float, lon: float, elevation: float = 0) -> datetime:
     """
@@ -290,6 +727,7 @@ def calculate_next_sunrise(dt: datetime, lat: float, lon: float, elevation: floa
     logger.debug(f"Julian day - ET: {jd_et}, UT: {jd_ut}")
     
     # Set sidereal mode to Lahiri
+    ensure_ephemeris()
     swe.set_sid_mode(swe.SIDM_LAHIRI, 0, 0)
     
     # Normalize coordinates slightly to avoid edge cases at the exact poles
@@ -376,6 +814,7 @@ def calculate_next_sunset(dt: datetime, lat: float, lon: float, elevation: float
     logger.debug(f"Julian day - ET: {jd_et}, UT: {jd_ut}")
     
     # Set sidereal mode to Lahiri
+    ensure_ephemeris()
     swe.set_sid_mode(swe.SIDM_LAHIRI, 0, 0)
     
     # Normalize coordinates slightly to avoid edge cases at the exact poles
@@ -449,6 +888,7 @@ def get_sun_longitude(jd: float) -> float:
     """
     logger.debug(f"Calculating sun longitude for JD (ET) {jd}")
     
+    ensure_ephemeris()
     swe.set_sid_mode(swe.SIDM_LAHIRI, 0, 0)
     flags = swe.FLG_SWIEPH | swe.FLG_SIDEREAL
     
@@ -478,6 +918,7 @@ def get_moon_longitude(jd: float) -> float:
     """
     logger.debug(f"Calculating moon longitude for JD (ET) {jd}")
     
+    ensure_ephemeris()
     swe.set_sid_mode(swe.SIDM_LAHIRI, 0, 0)
     flags = swe.FLG_SWIEPH | swe.FLG_SIDEREAL
     
@@ -491,29 +932,84 @@ def get_moon_longitude(jd: float) -> float:
     logger.debug(f"Moon longitude: {longitude}")
     return longitude
 
-def get_sunrise_sunset_times(dt: datetime, lat: float, lon: float) -> tuple[datetime, datetime]:
+def localize(naive: datetime, tz: tzinfo) -> datetime:
     """
-    Calculate sunrise and sunset times for the given date and location.
+    Attach a timezone to a naive local datetime.
+    
+    pytz zones need localize() to pick the right UTC offset (DST, historic
+    offsets); other tzinfo implementations are attached directly.
+    """
+    if hasattr(tz, "localize"):
+        return tz.localize(naive)
+    return naive.replace(tzinfo=tz)
+
+def local_day(dt: datetime, tz: Optional[tzinfo] = None) -> tuple[date, tzinfo]:
+    """
+    Calendar date of an instant and the timezone its day boundaries follow.
+    
+    Args:
+        dt: datetime; naive values are taken as UTC
+        tz: local timezone of the location, UTC when omitted
+    
+    Returns:
+        tuple: (date of dt in the timezone, the timezone)
+    """
+    day_tz = tz if tz is not None else pytz.UTC
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=pytz.UTC)
+    return dt.astimezone(day_tz).date(), day_tz
+
+def _location_day_key(lat: float, lon: float, day: date, tz: Optional[tzinfo]) -> tuple:
+    """
+    Cache key for per-location, per-local-day results (sunrise and moon times).
+    
+    The key names the timezone whose midnights bound the day; without one the
+    day runs between local mean midnights (see local_midnight_jd).
+    """
+    return (round(lat, 6), round(lon, 6), day, getattr(tz, "zone", str(tz)) if tz is not None else "LMT")
+
+# Sunrise, sunset and next sunrise per location-day, shared by the day
+# times and everything derived from them (day-division segments)
+_sun_day_cache = make_cache("sun_day", 20000, cache_version)
+
+def get_sun_day_times(dt: datetime, lat: float, lon: float, tz: Optional[tzinfo] = None) -> tuple[datetime, datetime, Optional[datetime]]:
+    """
+    Calculate sunrise, sunset and the following sunrise for the given date and location.
     Uses an improved algorithm that handles equatorial locations better.
     
+    The triple is cached per location and day, so the sunrise/sunset times and
+    everything derived from them (Rahu Kalam, Choghadiya, Hora...) cost one
+    set of rise/set searches per location-day.
+    
     Args:
-        dt: datetime object (timezone-aware recommended)
+        dt: datetime object; naive values are taken as UTC
         lat: latitude in degrees
         lon: longitude in degrees
+        tz: local timezone of the location; when given, the day is the local
+            calendar date of dt instead of its UTC date (see local_day)
     
     Returns:
-        tuple: (sunrise_dt, sunset_dt) where both are UTC datetime objects
+        tuple: (sunrise_dt, sunset_dt, next_sunrise_dt) UTC datetimes; the next
+            sunrise is None when the Sun does not rise again within a day
     
     Raises:
         ValueError: If calculation fails
+        PolarDayNightError: If there is no sunrise or sunset
     """
-    logger.debug(f"Calculating sunrise and sunset times for dt={dt}, lat={lat}, lon={lon}")
+    day, day_tz = local_day(dt, tz)
+    key = _location_day_key(lat, lon, day, day_tz)
+    cached = _sun_day_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    logger.debug(f"Calculating sunrise and sunset times for dt={dt}, lat={lat}, lon={lon}, tz={tz}")
     
     # Get elevation
-    elev = get_elevation(lat, lon)
+    elev, exact = lookup_elevation(lat, lon)
     
     # Start from the beginning of the current day
-    start_dt = dt.replace(hour=0, minute=0, second=0, microsecond=0)
+    start_dt = localize(datetime(day.year, day.month, day.day), day_tz).astimezone(pytz.UTC)
+    on_day = lambda event: event.astimezone(day_tz).date() == day
     prev_dt = start_dt - timedelta(days=1)
     
     # Calculate sunrise and sunset for previous and current day
@@ -523,23 +1019,300 @@ def get_sunrise_sunset_times(dt: datetime, lat: float, lon: float) -> tuple[date
     curr_sunset = calculate_next_sunset(curr_sunrise, lat, lon, elev)
     
     # Normalize times to ensure they're in the correct order
-    if curr_sunrise.date() == dt.date() and curr_sunset.date() == dt.date():
+    if on_day(curr_sunrise) and on_day(curr_sunset):
         # Both times are on the requested date
         if curr_sunrise < curr_sunset:
             sunrise, sunset = curr_sunrise, curr_sunset
         else:
             sunrise, sunset = prev_sunrise, curr_sunset
-    elif curr_sunrise.date() == dt.date():
+    elif on_day(curr_sunrise):
         # Only sunrise is on the requested date
         sunrise, sunset = curr_sunrise, prev_sunset
-    elif curr_sunset.date() == dt.date():
+    elif on_day(curr_sunset):
         # Only sunset is on the requested date
         sunrise, sunset = prev_sunrise, curr_sunset
     else:
         # Neither time is on the requested date, use the next available pair
         sunrise, sunset = curr_sunrise, curr_sunset
     
+    # Next sunrise closes the night; missing in polar conditions
+    try:
+        next_sunrise = calculate_next_sunrise(max(sunrise, sunset), lat, lon, elev)
+    except PolarDayNightError:
+        next_sunrise = None
+    
     logger.debug(f"Final sunrise time: {sunrise}")
     logger.debug(f"Final sunset time: {sunset}")
+    logger.debug(f"Next sunrise time: {next_sunrise}")
+    
+    times = (sunrise, sunset, next_sunrise)
+    # Times computed with the fallback elevation are recomputed next time
+    if exact:
+        _sun_day_cache.put(key, times)
+    return times
+
+def get_sunrise_sunset_times(dt: datetime, lat: float, lon: float, tz: Optional[tzinfo] = None) -> tuple[datetime, datetime]:
+    """
+    Calculate sunrise and sunset times for the given date and location.
+    
+    Args:
+        dt: datetime object; naive values are taken as UTC
+        lat: latitude in degrees
+        lon: longitude in degrees
+        tz: local timezone of the location; when given, the day is the local
+            calendar date of dt instead of its UTC date
+    
+    Returns:
+        tuple: (sunrise_dt, sunset_dt) where both are UTC datetime objects
+    
+    Raises:
+        ValueError: If calculation fails
+    """
+    sunrise, sunset, _ = get_sun_day_times(dt, lat, lon, tz)
+    return sunrise, sunset
+
+def local_midnight_jd(day: date, lon: float, tz: Optional[tzinfo] = None) -> float:
+    """
+    Julian day (UT) of the local midnight starting the given date.
+    
+    Args:
+        day: calendar date at the location
+        lon: longitude in degrees (east positive)
+        tz: local timezone; when omitted, local mean time (longitude / 15°) is used
+    
+    Returns:
+        float: Julian day (UT) of 00:00 local time
+    """
+    if tz is not None:
+        midnight = localize(datetime(day.year, day.month, day.day), tz).astimezone(pytz.UTC)
+        return swe.julday(midnight.year, midnight.month, midnight.day,
+                          midnight.hour + midnight.minute / 60.0 + midnight.second / 3600.0)
+    return swe.julday(day.year, day.month, day.day, 0.0) - lon / 360.0
+
+def get_sunrise_series(start: date, days: int, lat: float, lon: float, tz: Optional[tzinfo] = None) -> list:
+    """
+    Calculate the sunrise for each of a run of consecutive local days in one sweep.
+    
+    Each day costs a single rise_trans call searching forward from the
+    midnight that starts the day (see local_midnight_jd), and the elevation
+    is looked up once for the location.
+    
+    Args:
+        start: first local calendar date
+        days: number of consecutive days
+        lat: latitude in degrees
+        lon: longitude in degrees
+        tz: local timezone; when given, each day runs from the civil midnight
+            of tz to the next (DST-aware), otherwise between local mean
+            midnights (longitude / 15°)
+    
+    Returns:
+        list: Julian day (UT) of sunrise per day, or None when the Sun does not
+            rise that day (polar day/night) or the rise falls after the day ends
+    """
+    ensure_ephemeris()
+    elev = get_elevation(lat, lon)
+    geopos = [max(min(lon, 180.0), -180.0), max(min(lat, 89.9999), -89.9999), elev]
+    
+    sunrises = []
+    for offset in range(days):
+        jd_midnight = local_midnight_jd(start + timedelta(days=offset), lon, tz)
+        jd_next_midnight = local_midnight_jd(start + timedelta(days=offset + 1), lon, tz) if tz is not None else jd_midnight + 1
+        retcode, tret = swe.rise_trans(jd_midnight, swe.SUN, swe.CALC_RISE, geopos, 0, 0, swe.FLG_SWIEPH)
+        if retcode < 0 or tret[0] >= jd_next_midnight:
+            sunrises.append(None)
+        else:
+            sunrises.append(tret[0])
+    
+    logger.debug(f"Calculated {days} sunrises from {start} for lat={lat}, lon={lon}")
+    return sunrises
+# Per location-day (sunrise, sunset, next sunrise) Julian days from the bulk sweep
+_sun_day_series_cache = make_cache("sun_day_series", 50000, cache_version)
+
+def get_sun_day_series(start: date, days: int, lat: float, lon: float, tz: Optional[tzinfo] = None) -> list:
+    """
+    Calculate sunrise, sunset and next sunrise for consecutive local days in one sweep.
+    
+    Builds on get_sunrise_series (one rise_trans per day) and adds one sunset
+    search per day, so each day costs two rise_trans calls; each day's next
+    sunrise is the following day's sunrise. Triples are cached per
+    location-day, and a range whose days are all cached costs no searches.
+    
+    Args:
+        start: first local calendar date
+        days: number of consecutive days
+        lat: latitude in degrees
+        lon: longitude in degrees
+        tz: local timezone for the day boundaries (local mean time when omitted)
+    
+    Returns:
+        list: (sunrise_jd, sunset_jd, next_sunrise_jd) per day, or None for days
+            without a sunrise, sunset or following sunrise (polar day/night)
+    """
+    keys = [_location_day_key(lat, lon, start + timedelta(days=offset), tz) for offset in range(days)]
+    cached = [_sun_day_series_cache.get(key) for key in keys]
+    if all(triple is not None for triple in cached):
+        return [triple or None for triple in cached]
+    
+    elev, exact = lookup_elevation(lat, lon)
+    sunrises = get_sunrise_series(start, days + 1, lat, lon, tz)
+    geopos = [max(min(lon, 180.0), -180.0), max(min(lat, 89.9999), -89.9999), elev]
+    
+    triples = []
+    for key, sunrise, next_sunrise in zip(keys, sunrises, sunrises[1:]):
+        triple = None
+        if sunrise is not None and next_sunrise is not None:
+            retcode, tret = swe.rise_trans(sunrise, swe.SUN, swe.CALC_SET, geopos, 0, 0, swe.FLG_SWIEPH)
+            if retcode >= 0 and tret[0] < next_sunrise:
+                triple = (sunrise, tret[0], next_sunrise)
+        # Days without a triple are cached as an empty tuple
+        if exact:
+            _sun_day_series_cache.put(key, triple or ())
+        triples.append(triple)
+    return triples
+
+def next_sunrise_jd(jd_ut: float, lat: float, lon: float) -> Optional[float]:
+    """
+    Julian day (UT) of the first sunrise after an instant.
+    
+    Args:
+        jd_ut: Julian day number in UT1
+        lat: latitude in degrees
+        lon: longitude in degrees
+    
+    Returns:
+        float: Julian day (UT) of the sunrise, or None when the Sun does not
+            rise (polar day/night)
+    """
+    ensure_ephemeris()
+    geopos = [max(min(lon, 180.0), -180.0), max(min(lat, 89.9999), -89.9999), get_elevation(lat, lon)]
+    retcode, tret = swe.rise_trans(jd_ut, swe.SUN, swe.CALC_RISE, geopos, 0, 0, swe.FLG_SWIEPH)
+    return tret[0] if retcode >= 0 else None
+
+# Moonrise and moonset per location-day, keyed like the sunrise caches
+_moon_day_cache = make_cache("moon_day", 50000, cache_version)
+
+# Two moonrises (or moonsets) are always more than this many days apart
+# (the Moon returns to the horizon about every 24h50m)
+MOON_EVENT_GAP = 0.5
+
+def _moon_events(event: int, midnights: list, geopos: list) -> list:
+    """
+    Find one kind of Moon event (rise or set) in each of consecutive days.
+    
+    Each search starts from the previous event (plus MOON_EVENT_GAP) or the
+    day start, whichever is later, and an event found beyond the current day
+    is kept for the following day rather than searched again, so every event
+    is found exactly once.
+    """
+    events = []
+    pending = None
+    seed = midnights[0]
+    for day_start, day_end in zip(midnights, midnights[1:]):
+        if pending is None:
+            retcode, tret = swe.rise_trans(max(seed, day_start), swe.MOON, event, geopos, 0, 0, swe.FLG_SWIEPH)
+            if retcode < 0:
+                # Moon circumpolar or below the horizon throughout: no event
+                events.append(None)
+                continue
+            pending = tret[0]
+        if pending < day_end:
+            events.append(pending)
+            seed = pending + MOON_EVENT_GAP
+            pending = None
+        else:
+            # No event of this kind today (the Moon's daily delay skipped it)
+            events.append(None)
+    return events
+
+def get_moon_day_series(start: date, days: int, lat: float, lon: float, tz: Optional[tzinfo] = None) -> list:
+    """
+    Calculate moonrise and moonset for consecutive local days in one sweep.
+    
+    Searches are seeded from the previous day's event, so each moonrise and
+    moonset costs one rise_trans call. Results are cached per location-day
+    with the same keys as the sunrise caches.
+    
+    Args:
+        start: first local calendar date
+        days: number of consecutive days
+        lat: latitude in degrees
+        lon: longitude in degrees
+        tz: local timezone for the day boundaries (local mean time when omitted)
+    
+    Returns:
+        list: (moonrise_jd, moonset_jd) per day; either is None when the Moon
+            does not rise or set that day
+    """
+    keys = [_location_day_key(lat, lon, start + timedelta(days=offset), tz) for offset in range(days)]
+    cached = [_moon_day_cache.get(key) for key in keys]
+    if all(times is not None for times in cached):
+        return cached
+    
+    ensure_ephemeris()
+    elev, exact = lookup_elevation(lat, lon)
+    geopos = [max(min(lon, 180.0), -180.0), max(min(lat, 89.9999), -89.9999), elev]
+    midnights = [local_midnight_jd(start + timedelta(days=offset), lon, tz) for offset in range(days + 1)]
+    rises = _moon_events(swe.CALC_RISE, midnights, geopos)
+    sets = _moon_events(swe.CALC_SET, midnights, geopos)
+    
+    series = list(zip(rises, sets))
+    # Times computed with the fallback elevation are recomputed next time
+    if exact:
+        for key, times in zip(keys, series):
+            _moon_day_cache.put(key, times)
+    logger.debug(f"Calculated {days} moonrise/moonset pairs from {start} for lat={lat}, lon={lon}")
+    return series
+
+# Sun's true altitude at rise/set as used by rise_trans: upper limb on the
+# horizon with standard refraction
+SUNRISE_ALTITUDE = -0.8333
+
+def get_daylight_intervals(jd_start: float, jd_end: float, lat: float, lon: float) -> list:
+    """
+    Calculate the daylight intervals (sunrise to sunset) within a time range.
+    
+    Walks the alternating sunrise/sunset events forward, so the cost is one
+    rise_trans call per event. Polar day and polar night are handled: while
+    the Sun neither rises nor sets, the search advances a day at a time and
+    the interval stays open (day) or closed (night).
+    
+    Args:
+        jd_start: range start, Julian day (UT)
+        jd_end: range end, Julian day (UT)
+        lat: latitude in degrees
+        lon: longitude in degrees
+    
+    Returns:
+        list: Sorted (sunrise_jd, sunset_jd) pairs clipped to the range
+    """
+    ensure_ephemeris()
+    elev = get_elevation(lat, lon)
+    geopos = [max(min(lon, 180.0), -180.0), max(min(lat, 89.9999), -89.9999), elev]
+    
+    # Whether the Sun is up at the start of the range
+    sun = swe.calc_ut(jd_start, swe.SUN, swe.FLG_SWIEPH)[0]
+    altitude = swe.azalt(jd_start, swe.ECL2HOR, geopos, 0, 0, sun)[1]
+    up = altitude > SUNRISE_ALTITUDE
+    
+    intervals = []
+    day_start = jd_start
+    jd = jd_start
+    while jd < jd_end:
+        event = swe.CALC_SET if up else swe.CALC_RISE
+        retcode, tret = swe.rise_trans(jd, swe.SUN, event, geopos, 0, 0, swe.FLG_SWIEPH)
+        if retcode < 0:
+            # Polar day/night: no event within the next day, keep the state
+            jd += 1
+            continue
+        jd = tret[0]
+        if up:
+            intervals.append((day_start, min(jd, jd_end)))
+        else:
+            day_start = jd
+        up = not up
+    if up and day_start < jd_end:
+        intervals.append((day_start, jd_end))
     
-    return sunrise, sunset 
+    logger.debug(f"Calculated {len(intervals)} daylight intervals between JD {jd_start} and {jd_end}")
+    return [(rise, set_) for rise, set_ in intervals if rise < set_]
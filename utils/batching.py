@@ -0,0 +1,182 @@
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from utils.astronomy import calc_sun_moon_longitudes, get_sun_moon_longitude_arrays
+
+logger = logging.getLogger(__name__)
+
+"""
+Micro-Batched Ephemeris Evaluation
+
+The limb solvers of concurrent requests each ask for one Sun/Moon position
+at a time. With batching enabled, get_sun_moon_longitudes submits those
+points to a shared batcher instead of calling Swiss Ephemeris itself. That
+covers the limb timelines behind /panchanga, /calendar, /events, /muhurta
+and masa. The points submitted by all computations over a short window are
+evaluated together (see get_sun_moon_longitude_arrays: one ephemeris setup
+and observer location per group, time-ordered evaluation, identical points
+once) and each caller's future is resolved. Every point is evaluated
+exactly, so results never depend on the load.
+
+The batch is evaluated by the first of its callers (the leader) rather than
+by a dedicated thread: Swiss Ephemeris holds the GIL, so another thread
+could not evaluate any faster, and handing every point to one would add two
+thread switches per point. Every other caller blocks until its point is
+resolved, so each computation thread has at most one point pending. The
+window closes early once every thread that submitted recently is waiting,
+so a lone computation (nothing else to batch with) evaluates its points
+right away instead of paying the window on each of them.
+"""
+
+# Threads that submitted within this many seconds count as active; a batch
+# is dispatched without waiting out the window once they all have a point
+# pending
+ACTIVE_CALLER_SECONDS = 0.05
+
+# Distinct points of a group from which they are evaluated as arrays; fewer
+# are cheaper one by one than through NumPy
+ARRAY_MIN_POINTS = 32
+
+# Group key of a point: (topocentric, lat, lon), with the location only in
+# topocentric mode
+GroupKey = Tuple[bool, float, float]
+
+
+class _Batch:
+    """Points collected for one evaluation, and their results once it is done."""
+
+    def __init__(self, first: float):
+        self.first = first
+        self.points: List[Tuple[GroupKey, float]] = []
+        self.results: List = []
+        self.done = threading.Event()
+
+
+class EphemerisBatcher:
+    """
+    Batches of Sun/Moon positions submitted by concurrent computations.
+
+    Args:
+        window (float): Longest time (seconds) the first point of a batch
+            waits for others
+        max_batch (int): Points that dispatch a batch immediately
+    """
+
+    def __init__(self, window: float, max_batch: int):
+        self.window = window
+        self.max_batch = max_batch
+        self.batches = 0
+        self.points = 0
+        self.evaluated = 0
+        self.direct = 0
+        self._batch: Optional[_Batch] = None
+        self._callers: Dict[int, float] = {}
+        self._cond = threading.Condition()
+
+    def sun_moon(self, jd_ut: float, lat: float = 0.0, lon: float = 0.0, topocentric: bool = False) -> Tuple[float, float, float, float]:
+        """
+        Sun/Moon longitudes and speeds at a Julian day, evaluated in the next batch.
+
+        Args:
+            jd_ut (float): Julian day (UT)
+            lat (float): Latitude (topocentric mode only)
+            lon (float): Longitude (topocentric mode only)
+            topocentric (bool): Use topocentric positions for the observer location
+
+        Returns:
+            tuple: (sun_lon, sun_speed, moon_lon, moon_speed) as in get_sun_moon_longitudes
+        """
+        key = (True, lat, lon) if topocentric else (False, 0.0, 0.0)
+        thread_id = threading.get_ident()
+        now = time.monotonic()
+        with self._cond:
+            self._callers[thread_id] = now
+            batch = self._batch
+            if batch is None:
+                self._expire(now)
+                if len(self._callers) == 1:
+                    # No other computation to batch with
+                    self.direct += 1
+                    batch = None
+                else:
+                    batch = self._batch = _Batch(now)
+                    leader = True
+            else:
+                leader = False
+            if batch is not None:
+                index = len(batch.points)
+                batch.points.append((key, jd_ut))
+                if leader:
+                    while not self._ready(batch, time.monotonic()):
+                        self._cond.wait(max(batch.first + self.window - time.monotonic(), 0.0))
+                    # Points submitted from here on form the next batch, with its own leader
+                    self._batch = None
+                else:
+                    # The leader is waiting for the batch to fill
+                    self._cond.notify()
+        if batch is None:
+            return calc_sun_moon_longitudes(jd_ut, lat, lon, topocentric)
+        if leader:
+            self._evaluate(batch)
+        else:
+            batch.done.wait()
+        result = batch.results[index]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def _expire(self, now: float) -> None:
+        """Forget threads that have not submitted recently; call with the lock held."""
+        for thread_id, seen in list(self._callers.items()):
+            if now - seen > ACTIVE_CALLER_SECONDS:
+                del self._callers[thread_id]
+
+    def _ready(self, batch: _Batch, now: float) -> bool:
+        """Whether the batch is dispatched now; call with the lock held."""
+        if len(batch.points) >= self.max_batch or now - batch.first >= self.window:
+            return True
+        self._expire(now)
+        return len(batch.points) >= len(self._callers)
+
+    def _evaluate(self, batch: _Batch):
+        groups: Dict[GroupKey, List[float]] = {}
+        for key, jd_ut in batch.points:
+            groups.setdefault(key, []).append(jd_ut)
+        by_point: Dict[Tuple[GroupKey, float], object] = {}
+        for key, points in groups.items():
+            topocentric, lat, lon = key
+            jds = sorted(set(points))
+            try:
+                if len(jds) < ARRAY_MIN_POINTS:
+                    rows = [calc_sun_moon_longitudes(jd_ut, lat, lon, topocentric) for jd_ut in jds]
+                else:
+                    # Exact, so results do not depend on what else is in the batch
+                    rows = [tuple(row) for row in np.column_stack(get_sun_moon_longitude_arrays(jds, lat, lon, topocentric, exact=True)).tolist()]
+            except Exception as e:
+                rows = [e] * len(jds)
+            by_point.update(((key, jd_ut), row) for jd_ut, row in zip(jds, rows))
+        batch.results = [by_point[point] for point in batch.points]
+        batch.done.set()
+        with self._cond:
+            self.batches += 1
+            self.points += len(batch.points)
+            self.evaluated += len(by_point)
+
+    def metrics_text(self) -> str:
+        """Batching metrics in the Prometheus text exposition format."""
+        return "\n".join([
+            "# HELP vastr_ephemeris_batches_total Batches of Sun/Moon positions evaluated",
+            "# TYPE vastr_ephemeris_batches_total counter",
+            f"vastr_ephemeris_batches_total {self.batches}",
+            "# HELP vastr_ephemeris_batch_points_total Sun/Moon positions submitted for batched evaluation",
+            "# TYPE vastr_ephemeris_batch_points_total counter",
+            f"vastr_ephemeris_batch_points_total {self.points}",
+            "# HELP vastr_ephemeris_direct_total Sun/Moon positions evaluated directly, with no concurrent computation to batch with",
+            "# TYPE vastr_ephemeris_direct_total counter",
+            f"vastr_ephemeris_direct_total {self.direct}",
+            "# HELP vastr_ephemeris_batch_evaluated_total Distinct positions evaluated in batches",
+            "# TYPE vastr_ephemeris_batch_evaluated_total counter",
+            f"vastr_ephemeris_batch_evaluated_total {self.evaluated}",
+        ]) + "\n"
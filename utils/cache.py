@@ -0,0 +1,425 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import date, datetime
+import json
+import logging
+import socket
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple, Union
+from urllib.parse import urlparse
+from config import CACHE_BACKEND, CACHE_PATH, CACHE_URL
+
+"""
+Caching Utilities
+
+Small, thread-safe caches for results that are expensive to solve but never
+change once known, such as limb boundaries and sunrise times. Each cache is
+an in-process LRU, optionally backed by a shared store (a local SQLite file
+or a Redis-protocol server) so that worker processes and replicas reuse each
+other's results and a new replica starts warm.
+"""
+
+logger = logging.getLogger(__name__)
+
+
+class LRUCache:
+    """
+    Bounded least-recently-used mapping.
+
+    Unlike functools.lru_cache the caller decides what the key is, which lets
+    results computed from different inputs (e.g. any instant inside the same
+    tithi) share one entry.
+    """
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key, or None if it is not cached."""
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store value under key, evicting the least recently used entry if full."""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        """The entries, least recently used first."""
+        with self._lock:
+            return list(self._data.items())
+
+    def load(self, items: Iterable[Tuple[Hashable, Any]]) -> None:
+        """Add entries (least recently used first) without counting them as hits or misses."""
+        for key, value in items:
+            self.put(key, value)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def encode_value(value: Any) -> Any:
+    """Convert a cached value to JSON-compatible data, tagging tuples and datetimes."""
+    if isinstance(value, tuple):
+        return {"$t": [encode_value(item) for item in value]}
+    if isinstance(value, list):
+        return [encode_value(item) for item in value]
+    if isinstance(value, dict):
+        return {key: encode_value(item) for key, item in value.items()}
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"$d": value.isoformat()}
+    return value
+
+def decode_value(data: Any) -> Any:
+    """Inverse of encode_value."""
+    if isinstance(data, list):
+        return [decode_value(item) for item in data]
+    if isinstance(data, dict):
+        if "$t" in data:
+            return tuple(decode_value(item) for item in data["$t"])
+        if "$dt" in data:
+            return datetime.fromisoformat(data["$dt"])
+        if "$d" in data:
+            return date.fromisoformat(data["$d"])
+        return {key: decode_value(item) for key, item in data.items()}
+    return data
+
+def serialize(value: Any) -> str:
+    """Serialise a cached value for a shared backend (JSON, never pickle)."""
+    return json.dumps(encode_value(value), separators=(",", ":"))
+
+def deserialize(raw: Union[str, bytes]) -> Any:
+    return decode_value(json.loads(raw))
+
+
+class CacheUnavailableError(ConnectionError):
+    """Shared backend skipped because it recently failed (not logged again)."""
+
+
+class SharedCache(ABC):
+    """
+    Base for caches shared between processes or replicas.
+
+    Keys are namespaced and versioned: the version (e.g. ayanamsa and ephemeris
+    flags) is resolved on first use, so entries written under different
+    calculation settings never mix. Backend failures are logged and treated
+    as cache misses, so an unavailable backend only costs recomputation.
+    """
+
+    def __init__(self, namespace: str, version: Callable[[], str]):
+        self.namespace = namespace
+        self._version = version
+        self._prefix: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def prefix(self) -> str:
+        if self._prefix is None:
+            self._prefix = f"vastr:{self._version()}:{self.namespace}:"
+        return self._prefix
+
+    def _key(self, key: Hashable) -> str:
+        return self.prefix + repr(key)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key, or None if it is not cached."""
+        try:
+            raw = self._get(self._key(key))
+        except CacheUnavailableError:
+            raw = None
+        except Exception as e:
+            logger.warning(f"Shared cache {self.namespace} read failed: {str(e)}")
+            raw = None
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return deserialize(raw)
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store value under key."""
+        try:
+            self._put(self._key(key), serialize(value))
+        except CacheUnavailableError:
+            pass
+        except Exception as e:
+            logger.warning(f"Shared cache {self.namespace} write failed: {str(e)}")
+
+    def clear(self) -> None:
+        """Remove every entry of this namespace and version."""
+        try:
+            self._clear(self.prefix)
+        except Exception as e:
+            logger.warning(f"Shared cache {self.namespace} clear failed: {str(e)}")
+
+    @abstractmethod
+    def _get(self, key: str) -> Optional[Union[str, bytes]]:
+        """Raw stored value of a full key, or None."""
+
+    @abstractmethod
+    def _put(self, key: str, raw: str) -> None:
+        """Store a raw value under a full key."""
+
+    @abstractmethod
+    def _clear(self, prefix: str) -> None:
+        """Remove every key starting with prefix."""
+
+
+class SQLiteCache(SharedCache):
+    """
+    Shared cache in a local SQLite file.
+
+    Serves every worker process on one host (WAL mode allows concurrent
+    readers with one writer) and survives restarts, so a restarted worker
+    starts warm.
+    """
+
+    def __init__(self, path: str, namespace: str, version: Callable[[], str]):
+        super().__init__(namespace, version)
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            self._connection = connection
+        return self._connection
+
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._connect().execute("SELECT value FROM cache WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _put(self, key: str, raw: str) -> None:
+        with self._lock:
+            self._connect().execute("INSERT OR REPLACE INTO cache (key, value) VALUES (?, ?)", (key, raw))
+
+    def _clear(self, prefix: str) -> None:
+        with self._lock:
+            self._connect().execute("DELETE FROM cache WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM cache WHERE substr(key, 1, ?) = ?",
+                                            (len(self.prefix), self.prefix)).fetchone()[0]
+
+
+class RedisError(Exception):
+    """Error reply from a Redis-protocol server."""
+
+
+class RedisCache(SharedCache):
+    """
+    Shared cache on a Redis-protocol (RESP) server, shared by all replicas.
+
+    Uses a minimal built-in client (GET, SET, SCAN, DEL) over one socket per
+    cache, so no Redis client library is needed. After a connection failure
+    the server is not contacted again for RETRY_SECONDS, so an outage does not
+    add a connect timeout to every request.
+    """
+
+    RETRY_SECONDS = 5.0
+
+    def __init__(self, url: str, namespace: str, version: Callable[[], str], timeout: float = 0.5):
+        super().__init__(namespace, version)
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._socket: Optional[socket.socket] = None
+        self._reader = None
+        self._retry_at = 0.0
+
+    def _connect(self) -> None:
+        if self._socket is not None:
+            return
+        if time.monotonic() < self._retry_at:
+            raise CacheUnavailableError(f"Redis at {self.host}:{self.port} unavailable, retrying later")
+        try:
+            self._socket = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            self._reader = self._socket.makefile("rb")
+            if self.password:
+                self._send("AUTH", self.password)
+            if self.db:
+                self._send("SELECT", str(self.db))
+        except Exception:
+            self._disconnect()
+            self._retry_at = time.monotonic() + self.RETRY_SECONDS
+            raise
+
+    def _disconnect(self) -> None:
+        if self._socket is not None:
+            try:
+                self._socket.close()
+            except OSError:
+                pass
+        self._socket = None
+        self._reader = None
+
+    def _send(self, *args: str) -> Any:
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg.encode()
+            parts.append(f"${len(data)}\r\n".encode() + data + b"\r\n")
+        self._socket.sendall(b"".join(parts))
+        return self._read_reply()
+
+    def _read_reply(self) -> Any:
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by Redis server")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode()
+        if kind == b"-":
+            raise RedisError(payload.decode())
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            return self._reader.read(length + 2)[:-2]
+        if kind == b"*":
+            length = int(payload)
+            return None if length < 0 else [self._read_reply() for _ in range(length)]
+        raise RedisError(f"Unexpected reply: {line!r}")
+
+    def _command(self, *args: str) -> Any:
+        with self._lock:
+            self._connect()
+            try:
+                return self._send(*args)
+            except (OSError, ConnectionError):
+                self._disconnect()
+                raise
+
+    def _get(self, key: str) -> Optional[bytes]:
+        return self._command("GET", key)
+
+    def _put(self, key: str, raw: str) -> None:
+        self._command("SET", key, raw)
+
+    def _clear(self, prefix: str) -> None:
+        pattern = prefix.replace("[", "\\[").replace("*", "\\*").replace("?", "\\?") + "*"
+        cursor = "0"
+        while True:
+            cursor, keys = self._command("SCAN", cursor, "MATCH", pattern, "COUNT", "1000")
+            cursor = cursor.decode()
+            if keys:
+                self._command("DEL", *[key.decode() for key in keys])
+            if cursor == "0":
+                break
+
+
+class TieredCache:
+    """
+    In-process LRU in front of a shared cache.
+
+    Reads try the local LRU first and fill it from the shared cache; writes
+    go to both, so hot keys cost a dictionary lookup and cold keys solved by
+    any replica are reused by all.
+    """
+
+    def __init__(self, local: LRUCache, shared: SharedCache):
+        self.local = local
+        self.shared = shared
+
+    @property
+    def hits(self) -> int:
+        return self.local.hits
+
+    @property
+    def misses(self) -> int:
+        return self.local.misses
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key, or None if it is not cached."""
+        value = self.local.get(key)
+        if value is None:
+            value = self.shared.get(key)
+            if value is not None:
+                self.local.put(key, value)
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store value under key in both tiers."""
+        self.local.put(key, value)
+        self.shared.put(key, value)
+
+    def clear(self) -> None:
+        """Clear the local tier only; shared entries stay valid for other replicas."""
+        self.local.clear()
+
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        """The entries of the local tier, least recently used first."""
+        return self.local.items()
+
+    def load(self, items: Iterable[Tuple[Hashable, Any]]) -> None:
+        """Add entries to the local tier; the shared tier keeps its own."""
+        self.local.load(items)
+
+    def __len__(self) -> int:
+        return len(self.local)
+
+
+# Caches by namespace, for snapshots of their in-process entries (see utils/snapshot.py)
+caches: Dict[str, Union[LRUCache, TieredCache]] = {}
+
+def register_cache(namespace: str, cache: Union[LRUCache, TieredCache]) -> Union[LRUCache, TieredCache]:
+    """Add a cache to the registry under its namespace and return it."""
+    caches[namespace] = cache
+    return cache
+
+def make_cache(namespace: str, maxsize: int, version: Callable[[], str]) -> Union[LRUCache, TieredCache]:
+    """
+    Create a cache for one kind of result using the configured backend.
+
+    Args:
+        namespace: Name of the cached results (part of every shared key)
+        maxsize: Size of the in-process LRU tier
+        version: Returns the calculation settings the results depend on;
+            called on first use of a shared backend
+
+    Returns:
+        LRUCache for the memory backend, otherwise a TieredCache in front of the
+        SQLite (CACHE_PATH) or Redis (CACHE_URL) backend; registered in caches
+    """
+    local = LRUCache(maxsize=maxsize)
+    if CACHE_BACKEND == "memory":
+        return register_cache(namespace, local)
+    if CACHE_BACKEND == "sqlite":
+        return register_cache(namespace, TieredCache(local, SQLiteCache(CACHE_PATH, namespace, version)))
+    if CACHE_BACKEND == "redis":
+        return register_cache(namespace, TieredCache(local, RedisCache(CACHE_URL, namespace, version)))
+    raise ValueError(f"Unknown cache backend: {CACHE_BACKEND}. Allowed: memory, sqlite, redis")
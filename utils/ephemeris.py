@@ -0,0 +1,108 @@
+import logging
+import math
+import os
+from typing import Iterable, List
+
+logger = logging.getLogger(__name__)
+
+"""
+Ephemeris File Coverage
+
+Which Swiss Ephemeris files the service needs for a range of years and set
+of bodies, and whether an ephemeris directory has them. Each file covers 600
+years: `semo_18.se1` holds the Moon for 1800-2399, `sepl_18.se1` the Sun
+and planets for the same years, and files for years BCE carry an `m`
+(`semom06.se1` covers -600 to -1). Asteroid files (`seas_*`, `sat/`) and
+the fixed star catalogue are never read.
+"""
+
+# File prefixes needed per body group. The Sun is computed from the Earth's
+# position in the planetary file; the mean lunar node (Rahu/Ketu) is
+# analytical and needs no file.
+BODY_FILES = {
+    "sun": ("sepl",),
+    "moon": ("semo",),
+    "grahas": ("sepl",),
+}
+
+# Years covered by one ephemeris file
+FILE_YEARS = 600
+
+
+def ephemeris_files(start_year: int, end_year: int, bodies: Iterable[str]) -> List[str]:
+    """
+    Names of the ephemeris files covering a range of years for a set of bodies.
+
+    Args:
+        start_year (int): First year (astronomical numbering, 0 = 1 BCE)
+        end_year (int): Last year (inclusive)
+        bodies (Iterable[str]): Body groups from BODY_FILES
+
+    Returns:
+        list: File names, sorted
+
+    Raises:
+        ValueError: If a body group is unknown or the range is empty
+    """
+    if end_year < start_year:
+        raise ValueError("End year must not be before start year")
+    prefixes = set()
+    for body in bodies:
+        if body not in BODY_FILES:
+            raise ValueError(f"Unknown ephemeris body group: {body}. Allowed: {', '.join(BODY_FILES)}")
+        prefixes.update(BODY_FILES[body])
+    names = set()
+    for block in range(math.floor(start_year / FILE_YEARS), math.floor(end_year / FILE_YEARS) + 1):
+        centuries = block * FILE_YEARS // 100
+        suffix = f"_{centuries:02d}" if centuries >= 0 else f"m{-centuries:02d}"
+        names.update(f"{prefix}{suffix}.se1" for prefix in prefixes)
+    return sorted(names)
+
+
+def missing_ephemeris_files(path: str, start_year: int, end_year: int, bodies: Iterable[str]) -> List[str]:
+    """
+    Ephemeris files for the range and bodies that are not in a directory.
+
+    Args:
+        path (str): Ephemeris directory
+        start_year (int): First year
+        end_year (int): Last year (inclusive)
+        bodies (Iterable[str]): Body groups from BODY_FILES
+
+    Returns:
+        list: Missing file names; empty when the directory covers the range
+    """
+    return [name for name in ephemeris_files(start_year, end_year, bodies)
+            if not os.path.isfile(os.path.join(path, name))]
+
+
+def check_ephemeris_coverage(path: str, start_year: int, end_year: int, bodies: Iterable[str], strict: bool = False) -> bool:
+    """
+    Check at startup that the ephemeris directory covers the served years.
+
+    Only looks for the files, so it does no ephemeris I/O. Without the files
+    Swiss Ephemeris silently falls back to the less precise Moshier theory.
+
+    Args:
+        path (str): Ephemeris directory
+        start_year (int): First served year
+        end_year (int): Last served year (inclusive)
+        bodies (Iterable[str]): Body groups from BODY_FILES
+        strict (bool): Raise instead of logging a warning
+
+    Returns:
+        bool: Whether all files are present
+
+    Raises:
+        RuntimeError: If files are missing and strict is set
+    """
+    missing = missing_ephemeris_files(path, start_year, end_year, bodies)
+    if not missing:
+        logger.info(f"Ephemeris in {path} covers {start_year}-{end_year}")
+        return True
+    message = (f"Ephemeris in {path} does not cover {start_year}-{end_year}: missing {', '.join(missing)}; "
+               f"affected dates fall back to the Moshier ephemeris")
+    if strict:
+        raise RuntimeError(message)
+    logger.warning(message)
+    return False
@@ -0,0 +1,83 @@
+from typing import Iterable, List, Tuple
+
+"""
+Interval Utilities
+
+Set operations on time intervals given as (start, end) pairs of Julian days.
+All results are sorted, non-overlapping lists, and every operation is a
+single linear pass over its (sorted) inputs.
+"""
+
+Interval = Tuple[float, float]
+
+
+def merge(intervals: Iterable[Interval]) -> List[Interval]:
+    """
+    Sort intervals and join those that overlap or touch.
+
+    Args:
+        intervals (Iterable): (start, end) pairs in any order
+
+    Returns:
+        list: Sorted, non-overlapping intervals
+    """
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def intersect(first: List[Interval], second: List[Interval]) -> List[Interval]:
+    """
+    Intersect two sorted, non-overlapping interval lists.
+
+    Args:
+        first (list): Sorted, non-overlapping intervals
+        second (list): Sorted, non-overlapping intervals
+
+    Returns:
+        list: Sorted intervals covered by both inputs
+    """
+    result: List[Interval] = []
+    i = j = 0
+    while i < len(first) and j < len(second):
+        start = max(first[i][0], second[j][0])
+        end = min(first[i][1], second[j][1])
+        if start < end:
+            result.append((start, end))
+        # Advance whichever interval finishes first
+        if first[i][1] < second[j][1]:
+            i += 1
+        else:
+            j += 1
+    return result
+
+
+def complement(intervals: List[Interval], start: float, end: float) -> List[Interval]:
+    """
+    Gaps between sorted, non-overlapping intervals within [start, end).
+
+    Args:
+        intervals (list): Sorted, non-overlapping intervals
+        start (float): Range start
+        end (float): Range end
+
+    Returns:
+        list: Sorted intervals of the range not covered by the input
+    """
+    result: List[Interval] = []
+    cursor = start
+    for interval_start, interval_end in intervals:
+        if interval_start > cursor:
+            result.append((cursor, min(interval_start, end)))
+        cursor = max(cursor, interval_end)
+        if cursor >= end:
+            break
+    if cursor < end:
+        result.append((cursor, end))
+    return [(a, b) for a, b in result if a < b]
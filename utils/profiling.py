@@ -0,0 +1,327 @@
+import contextvars
+import hmac
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+from starlette.concurrency import run_in_threadpool as _run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+"""
+On-demand Request Profiling
+
+Statistical (sampling) profiles of individual requests. A profile is taken
+for a request that carries the profiling header with the configured token,
+and for a random fraction of all requests. While the request runs, a
+sampler thread records the Python stacks of the worker threads doing its
+computation every few milliseconds; the request's own code is not
+instrumented, so it runs at full speed. The sampler needs the GIL, so
+while the computation holds it the effective interval can stretch to the
+interpreter's switch interval (5 ms by default, sys.setswitchinterval).
+Stacks of registered solver functions (see solver_frame) are labelled with
+their limb and current iteration and recursion depth, read from the
+solver's local variables.
+
+Profiles are written to a directory as collapsed stacks (flamegraph.pl,
+speedscope) and speedscope JSON files named after the profile id, which a
+header-triggered request gets back in the X-Vastr-Profile-Id response
+header.
+"""
+
+# Request header carrying the profiling token
+PROFILE_HEADER = "x-vastr-profile"
+
+# Response header carrying the id of the stored profile
+PROFILE_ID_HEADER = "x-vastr-profile-id"
+
+# Profiles sampled at the same time; further requests run unprofiled
+MAX_ACTIVE_PROFILES = 4
+
+# Solver code objects -> (limb, local variable holding the limb, label -> local variable)
+_solvers: Dict[object, Tuple[Optional[str], Optional[str], Dict[str, str]]] = {}
+
+# Frames of this wrapper end the recorded stacks (the thread pool frames below are noise)
+_ROOT_NAME = "_profiled_call"
+
+# Code object -> frame name, for frames without labels
+_names: Dict[object, str] = {}
+
+
+def solver_frame(limb: Optional[str] = None, limb_arg: Optional[str] = None, **counters: str) -> Callable:
+    """
+    Register a solver so that its frames in sampled stacks carry labels.
+
+    Returns the function unchanged, so registered solvers cost nothing when
+    no profile is being taken.
+
+    Args:
+        limb (str, optional): Limb the solver works on
+        limb_arg (str, optional): Local variable holding the limb instead
+        **counters: Label -> local variable, e.g. iteration="i"
+
+    Returns:
+        Callable: Decorator
+    """
+    def register(func: Callable) -> Callable:
+        _solvers[func.__code__] = (limb, limb_arg, counters)
+        return func
+    return register
+
+
+def _frame_name(frame, root: str) -> str:
+    code = frame.f_code
+    solver = _solvers.get(code)
+    name = _names.get(code)
+    if name is not None and solver is None:
+        return name
+    filename = code.co_filename
+    if filename.startswith(root):
+        filename = filename[len(root):].lstrip(os.sep)
+    else:
+        filename = os.path.join(*filename.split(os.sep)[-2:])
+    name = _names[code] = f"{code.co_name} ({filename}:{code.co_firstlineno})"
+    if solver is not None:
+        limb, limb_arg, counters = solver
+        local_vars = frame.f_locals
+        labels = [str(local_vars.get(limb_arg, "?")) if limb_arg else limb]
+        labels += [f"{label} {local_vars[var]}" for label, var in counters.items() if var in local_vars]
+        name += f" [{', '.join(label for label in labels if label)}]"
+    return name
+
+
+class RequestProfile:
+    """
+    Sampled stacks of one request's computation.
+
+    Attributes:
+        profile_id (str): Id the profile is stored under
+        name (str): Request method and path
+        interval (float): Sampling interval in seconds
+        samples (Counter): Stack (tuple of frame names, root first) -> sample count
+    """
+
+    def __init__(self, name: str, interval: float):
+        self.profile_id = uuid.uuid4().hex
+        self.name = name
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.threads: Dict[int, int] = {}
+        self.started = time.perf_counter()
+        self.duration = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self._sampler = threading.Thread(target=self._sample, name=f"profile-{self.profile_id[:8]}", daemon=True)
+        self._sampler.start()
+
+    def enter(self, thread_id: int):
+        with self._lock:
+            self.threads[thread_id] = self.threads.get(thread_id, 0) + 1
+
+    def leave(self, thread_id: int):
+        with self._lock:
+            self.threads[thread_id] -= 1
+            if not self.threads[thread_id]:
+                del self.threads[thread_id]
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                threads = list(self.threads)
+            if not threads:
+                continue
+            frames = sys._current_frames()
+            for thread_id in threads:
+                frame = frames.get(thread_id)
+                stack = []
+                while frame is not None and frame.f_code.co_name != _ROOT_NAME:
+                    stack.append(_frame_name(frame, self._root))
+                    frame = frame.f_back
+                if stack:
+                    self.samples[tuple(reversed(stack))] += 1
+            del frames
+
+    def stop(self):
+        self.duration = time.perf_counter() - self.started
+        self._stop.set()
+        self._sampler.join()
+
+    def collapsed(self) -> str:
+        """Collapsed stacks: one `frame;frame;frame count` line per distinct stack."""
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in sorted(self.samples.items()))
+
+    def speedscope(self) -> dict:
+        """The profile in the speedscope file format (sampled, weights in seconds)."""
+        frames: Dict[str, int] = {}
+        samples: List[List[int]] = []
+        weights: List[float] = []
+        for stack, count in self.samples.items():
+            samples.append([frames.setdefault(name, len(frames)) for name in stack])
+            weights.append(count * self.interval)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": self.name,
+            "exporter": "vastr",
+            "shared": {"frames": [{"name": name} for name in frames]},
+            "profiles": [{
+                "type": "sampled",
+                "name": self.name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }],
+        }
+
+
+# Profile of the request being handled, inherited by its tasks
+_active_profile: contextvars.ContextVar[Optional[RequestProfile]] = contextvars.ContextVar("active_profile", default=None)
+
+
+async def run_in_threadpool(func: Callable, *args, **kwargs):
+    """
+    starlette.concurrency.run_in_threadpool that includes the worker thread
+    in the profile of the current request, if it is being profiled.
+    """
+    profile = _active_profile.get()
+    if profile is None:
+        return await _run_in_threadpool(func, *args, **kwargs)
+
+    def _profiled_call():
+        thread_id = threading.get_ident()
+        profile.enter(thread_id)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile.leave(thread_id)
+    return await _run_in_threadpool(_profiled_call)
+
+
+class Profiler:
+    """
+    Decides which requests are profiled and stores their profiles.
+
+    Args:
+        token (str, optional): Value of the profiling header that triggers a
+            profile; the header is ignored when unset
+        sample_rate (float): Fraction of all requests profiled (0 = none)
+        interval (float): Sampling interval in seconds
+        directory (str): Directory the profiles are written to
+        keep (int): Number of newest profiles kept in the directory
+    """
+
+    def __init__(self, token: Optional[str], sample_rate: float, interval: float, directory: str, keep: int):
+        self.token = token
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.directory = directory
+        self.keep = keep
+        self.active = 0
+        self._lock = threading.Lock()
+
+    def authorized(self, header: Optional[str]) -> bool:
+        return bool(self.token) and header is not None and hmac.compare_digest(header.encode(), self.token.encode())
+
+    def begin(self, name: str, header: Optional[str]) -> Tuple[Optional[RequestProfile], bool]:
+        """
+        Start a profile for a request if it is to be profiled.
+
+        Args:
+            name (str): Request method and path
+            header (str, optional): Value of the profiling header
+
+        Returns:
+            tuple: (profile or None, whether it was requested by header)
+        """
+        requested = self.authorized(header)
+        if not requested and not (self.sample_rate > 0 and random.random() < self.sample_rate):
+            return None, False
+        with self._lock:
+            if self.active >= MAX_ACTIVE_PROFILES:
+                logger.warning(f"Not profiling {name}: {self.active} profiles already active")
+                return None, False
+            self.active += 1
+        return RequestProfile(name, self.interval), requested
+
+    def end(self, profile: RequestProfile, requested: bool = False) -> bool:
+        """
+        Stop a profile and write it out if it has samples or was requested.
+
+        Returns:
+            bool: Whether the profile was stored
+        """
+        profile.stop()
+        with self._lock:
+            self.active -= 1
+        if not profile.samples and not requested:
+            return False
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            base = os.path.join(self.directory, profile.profile_id)
+            with open(f"{base}.collapsed", "w") as f:
+                f.write(profile.collapsed())
+            with open(f"{base}.speedscope.json", "w") as f:
+                json.dump(profile.speedscope(), f)
+            self._prune()
+        except OSError as e:
+            logger.warning(f"Could not store profile {profile.profile_id}: {str(e)}")
+            return False
+        logger.info(f"Profiled {profile.name} in {profile.duration * 1000:.1f} ms: "
+                    f"{sum(profile.samples.values())} samples, stored as {profile.profile_id}")
+        return True
+
+    def _prune(self):
+        names = [name for name in os.listdir(self.directory) if name.endswith(".collapsed")]
+        if len(names) <= self.keep:
+            return
+        names.sort(key=lambda name: os.path.getmtime(os.path.join(self.directory, name)))
+        for name in names[:len(names) - self.keep]:
+            base = os.path.join(self.directory, name[:-len(".collapsed")])
+            for path in (f"{base}.collapsed", f"{base}.speedscope.json"):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def path(self, profile_id: str, fmt: str) -> Optional[str]:
+        """File of a stored profile in a format (collapsed or speedscope), or None."""
+        if not all(c in "0123456789abcdef" for c in profile_id) or len(profile_id) != 32:
+            return None
+        path = os.path.join(self.directory, f"{profile_id}.{'speedscope.json' if fmt == 'speedscope' else 'collapsed'}")
+        return path if os.path.isfile(path) else None
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles requests selected by a Profiler."""
+
+    def __init__(self, app, profiler: Profiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith("/profiles/"):
+            return await self.app(scope, receive, send)
+        header = next((value.decode("latin-1") for name, value in scope["headers"] if name == PROFILE_HEADER.encode()), None)
+        profile, requested = self.profiler.begin(f"{scope['method']} {scope['path']}", header)
+        if profile is None:
+            return await self.app(scope, receive, send)
+
+        async def send_with_id(message):
+            if requested and message["type"] == "http.response.start":
+                message = dict(message, headers=list(message.get("headers", [])) + [(PROFILE_ID_HEADER.encode(), profile.profile_id.encode())])
+            await send(message)
+
+        token = _active_profile.set(profile)
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            _active_profile.reset(token)
+            await _run_in_threadpool(self.profiler.end, profile, requested)
@@ -0,0 +1,161 @@
+import json
+import logging
+import math
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+"""
+Precomputed Sun/Moon Longitude Series
+
+Reader for the sidereal Sun and Moon longitude tables written by
+tools/build_series.py. The table holds longitude and daily speed of both
+bodies at a fixed step; it is memory-mapped, so opening it is instant, only
+the pages actually touched are read, and all worker processes share the
+page cache.
+
+Between two samples the longitude is a cubic Hermite polynomial through the
+sampled longitudes and speeds. For a smooth motion its error is bounded by
+h^4 / 384 * max|d^4 lon / dt^4| for step h, which is below 1e-9 degrees for
+the Moon at a 1-hour step. In practice the bound is set by Swiss Ephemeris
+itself: its lunar positions are smooth only to ~5e-8 degrees over a few
+hours, and its sidereal speeds are slightly inconsistent with its
+positions. The builder measures the actual maximum error against Swiss
+Ephemeris at every midpoint between samples (where it is largest) and stores
+it with the table. With the default 1-hour step it is ~2e-7 degrees (about
+1 ms of the Moon's motion), below the solvers' 1e-6 degree tolerance, and
+tables whose error exceeds that tolerance are not used.
+"""
+
+# Largest measured interpolation error (degrees) a table may have to be used
+MAX_ERROR = 1e-6
+
+# Columns of the table
+SUN_LON, SUN_SPEED, MOON_LON, MOON_SPEED = range(4)
+
+
+def _hermite(t: float, h: float, p0: float, m0: float, p1: float, m1: float) -> Tuple[float, float]:
+    """Cubic Hermite value and derivative at t in [0, 1] for an interval of length h."""
+    # Unwrap across 360° -> 0°; neither body moves 180° in one step
+    p1 = p0 + (p1 - p0 + 180.0) % 360.0 - 180.0
+    t2 = t * t
+    t3 = t2 * t
+    value = (2 * t3 - 3 * t2 + 1) * p0 + (t3 - 2 * t2 + t) * h * m0 + (3 * t2 - 2 * t3) * p1 + (t3 - t2) * h * m1
+    speed = ((6 * t2 - 6 * t) * p0 + (3 * t2 - 4 * t + 1) * h * m0 + (6 * t - 6 * t2) * p1 + (3 * t2 - 2 * t) * h * m1) / h
+    return value % 360.0, speed
+
+
+class LongitudeSeries:
+    """
+    Memory-mapped Sun/Moon sidereal longitude table.
+
+    Attributes:
+        jd_start (float): Julian day (UT) of the first sample
+        step (float): Sample spacing in days
+        jd_end (float): Julian day (UT) of the last sample
+        version (str): Calculation settings the table was built with
+            (see utils.astronomy.cache_version)
+        max_error (float): Measured maximum interpolation error in degrees
+    """
+
+    def __init__(self, path: str):
+        with open(f"{path}.json") as f:
+            meta: Dict[str, Any] = json.load(f)
+        self.path = path
+        self.jd_start = float(meta["jd_start"])
+        self.step = float(meta["step_days"])
+        self.version = meta["version"]
+        self.max_error = float(meta["max_error_deg"])
+        self.data = np.load(path, mmap_mode="r")
+        if self.data.ndim != 2 or self.data.shape[1] != 4:
+            raise ValueError(f"Unexpected series shape {self.data.shape} in {path}")
+        self.jd_end = self.jd_start + (len(self.data) - 1) * self.step
+
+    def covers(self, jd_ut: float) -> bool:
+        return self.jd_start <= jd_ut < self.jd_end
+
+    def sun_moon(self, jd_ut: float) -> Tuple[float, float, float, float]:
+        """
+        Interpolated sidereal longitudes and speeds at a Julian day (UT).
+
+        Args:
+            jd_ut (float): Julian day (UT) inside the table (see covers)
+
+        Returns:
+            tuple: (sun_lon, sun_speed, moon_lon, moon_speed) in degrees and degrees/day
+        """
+        offset = (jd_ut - self.jd_start) / self.step
+        index = int(offset)
+        (s0, sv0, m0, mv0), (s1, sv1, m1, mv1) = self.data[index:index + 2].tolist()
+        t = offset - index
+        sun, sun_speed = _hermite(t, self.step, s0, sv0, s1, sv1)
+        moon, moon_speed = _hermite(t, self.step, m0, mv0, m1, mv1)
+        return sun, sun_speed, moon, moon_speed
+
+    def sun_moon_array(self, jd_ut: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Vectorised sun_moon for an array of Julian days, all inside the table.
+
+        Returns:
+            tuple: Arrays (sun_lon, sun_speed, moon_lon, moon_speed)
+        """
+        offset = (np.asarray(jd_ut, dtype=float) - self.jd_start) / self.step
+        index = offset.astype(np.int64)
+        if index.size and (index.min() < 0 or index.max() >= len(self.data) - 1):
+            raise ValueError("Julian day outside the series range")
+        return hermite_array(offset - index, self.step, self.data[index], self.data[index + 1])
+
+
+def hermite_array(t: np.ndarray, h: float, rows0: np.ndarray, rows1: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Vectorised _hermite for both bodies between pairs of table rows.
+
+    Args:
+        t (np.ndarray): Position between the rows (0-1)
+        h (float): Row spacing in days
+        rows0 (np.ndarray): Rows (sun_lon, sun_speed, moon_lon, moon_speed) before each instant
+        rows1 (np.ndarray): Rows after each instant
+
+    Returns:
+        tuple: Arrays (sun_lon, sun_speed, moon_lon, moon_speed)
+    """
+    t2, t3 = t * t, t * t * t
+    out = []
+    for lon_col, speed_col in ((SUN_LON, SUN_SPEED), (MOON_LON, MOON_SPEED)):
+        p0, m0 = rows0[:, lon_col], rows0[:, speed_col]
+        p1 = p0 + (rows1[:, lon_col] - p0 + 180.0) % 360.0 - 180.0
+        m1 = rows1[:, speed_col]
+        value = (2 * t3 - 3 * t2 + 1) * p0 + (t3 - 2 * t2 + t) * h * m0 + (3 * t2 - 2 * t3) * p1 + (t3 - t2) * h * m1
+        speed = ((6 * t2 - 6 * t) * p0 + (3 * t2 - 4 * t + 1) * h * m0 + (6 * t - 6 * t2) * p1 + (3 * t2 - 2 * t) * h * m1) / h
+        out += [value % 360.0, speed]
+    return tuple(out)
+
+
+def load_series(path: Optional[str], version: str) -> Optional[LongitudeSeries]:
+    """
+    Open a series file if it exists and was built with the current settings.
+
+    Args:
+        path (str, optional): Path of the .npy table (metadata in path + ".json")
+        version (str): Current calculation settings (utils.astronomy.cache_version)
+
+    Returns:
+        LongitudeSeries, or None when no usable table is configured
+    """
+    if not path:
+        return None
+    try:
+        series = LongitudeSeries(path)
+    except Exception as e:
+        logger.warning(f"Longitude series {path} not loaded: {str(e)}")
+        return None
+    if series.version != version:
+        logger.warning(f"Longitude series {path} was built for {series.version}, not {version}; ignoring it")
+        return None
+    if not math.isfinite(series.max_error) or series.max_error > MAX_ERROR:
+        logger.warning(f"Longitude series {path} interpolation error {series.max_error}° exceeds {MAX_ERROR}°; ignoring it")
+        return None
+    logger.info(f"Loaded longitude series {path}: JD {series.jd_start}-{series.jd_end}, step {series.step * 24:g} h, "
+                f"max error {series.max_error:.1e}°")
+    return series
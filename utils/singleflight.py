@@ -0,0 +1,79 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+"""
+Single-Flight Request Coalescing
+
+When identical computations are requested concurrently (e.g. thousands of
+requests for a trending festival date within the same second), only the
+first one runs; the others await its result instead of starting their own.
+Coalescing only spans computations in flight at the same time: once one
+completes its key is released, and later requests rely on the result caches.
+"""
+
+
+class SingleFlight:
+    """
+    Map of in-flight computations by key.
+
+    The computation runs as its own task, so a caller that disconnects (and
+    is cancelled) does not cancel it for the others waiting on the same key.
+    Every caller receives the same result object or exception.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self.computations = 0
+        self.coalesced = 0
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the result of compute(), sharing it with concurrent calls for the same key.
+
+        Args:
+            key: Normalised inputs of the computation
+            compute: Coroutine function producing the result; only called when
+                no computation for key is in flight
+
+        Returns:
+            The (shared) result; do not mutate it
+        """
+        task = self._calls.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.computations += 1
+            task = asyncio.ensure_future(compute())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception retrieved even if every caller went away
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f"Coalesced {self.name} computation failed: {task.exception()}")
+
+    def metrics_text(self) -> str:
+        """Coalescing metrics in the Prometheus text exposition format."""
+        metric = f"vastr_singleflight_{self.name}"
+        return "\n".join([
+            f"# HELP {metric}_in_flight Distinct {self.name} computations in flight",
+            f"# TYPE {metric}_in_flight gauge",
+            f"{metric}_in_flight {self.in_flight}",
+            f"# HELP {metric}_computations_total {self.name} computations started",
+            f"# TYPE {metric}_computations_total counter",
+            f"{metric}_computations_total {self.computations}",
+            f"# HELP {metric}_coalesced_total {self.name} requests served by a computation already in flight",
+            f"# TYPE {metric}_coalesced_total counter",
+            f"{metric}_coalesced_total {self.coalesced}",
+        ]) + "\n"
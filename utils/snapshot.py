@@ -0,0 +1,119 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Dict
+from utils.cache import caches, encode_value, decode_value
+from utils.astronomy import cache_version
+
+logger = logging.getLogger(__name__)
+
+"""
+Cache Snapshots
+
+Writes the in-process entries of every registered cache (solved limb
+boundaries, sunrise and moon times, elevation lookups) to a local file and
+loads them back into a new process, so a restarted worker starts warm
+without a shared cache backend. The file is written to a temporary name
+and renamed, so a crash while writing never leaves a truncated snapshot.
+
+Every snapshot records the calculation settings (see cache_version: ayanamsa,
+ephemeris flags, Swiss Ephemeris version) and a hash of the code that
+computes the cached results. A snapshot whose version differs from the
+running one is ignored (and replaced by the next write).
+"""
+
+# Packages whose code computes the cached results
+CODE_PACKAGES = ("core", "utils")
+
+_code_hash = None
+
+def code_version() -> str:
+    """Hash of the source files of CODE_PACKAGES, computed once."""
+    global _code_hash
+    if _code_hash is None:
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        digest = hashlib.sha256()
+        for package in CODE_PACKAGES:
+            directory = os.path.join(root, package)
+            for name in sorted(os.listdir(directory)):
+                if name.endswith(".py"):
+                    digest.update(f"{package}/{name}\0".encode())
+                    with open(os.path.join(directory, name), "rb") as f:
+                        digest.update(f.read())
+        _code_hash = digest.hexdigest()[:16]
+    return _code_hash
+
+def snapshot_version() -> str:
+    """Version a snapshot must carry to be loaded by this process."""
+    return f"{cache_version()}-code{code_version()}"
+
+def save_snapshot(path: str) -> int:
+    """
+    Write the entries of all registered caches to path.
+
+    Args:
+        path (str): Snapshot file
+
+    Returns:
+        int: Entries written (0 when the caches are empty and nothing is written)
+    """
+    started = time.perf_counter()
+    entries = {namespace: cache.items() for namespace, cache in caches.items()}
+    count = sum(len(items) for items in entries.values())
+    if not count:
+        return 0
+    snapshot = {
+        "version": snapshot_version(),
+        "created": time.time(),
+        "caches": {namespace: [[encode_value(key), encode_value(value)] for key, value in items]
+                   for namespace, items in entries.items()},
+    }
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "w") as f:
+            json.dump(snapshot, f, separators=(",", ":"))
+        os.replace(temporary, path)
+    except OSError as e:
+        logger.warning(f"Could not write cache snapshot {path}: {str(e)}")
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+        return 0
+    logger.info(f"Wrote {count} cache entries to {path} in {(time.perf_counter() - started) * 1000:.0f} ms")
+    return count
+
+def load_snapshot(path: str) -> int:
+    """
+    Load the entries of a snapshot written with the current version into the registered caches.
+
+    Args:
+        path (str): Snapshot file
+
+    Returns:
+        int: Entries loaded (0 when there is no usable snapshot)
+    """
+    if not os.path.isfile(path):
+        return 0
+    started = time.perf_counter()
+    try:
+        with open(path) as f:
+            snapshot: Dict = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not read cache snapshot {path}: {str(e)}")
+        return 0
+    version = snapshot_version()
+    if snapshot.get("version") != version:
+        logger.info(f"Ignoring cache snapshot {path}: written by {snapshot.get('version')}, running {version}")
+        return 0
+    count = 0
+    for namespace, items in snapshot.get("caches", {}).items():
+        cache = caches.get(namespace)
+        if cache is None:
+            continue
+        cache.load((decode_value(key), decode_value(value)) for key, value in items)
+        count += len(items)
+    logger.info(f"Loaded {count} cache entries from {path} in {(time.perf_counter() - started) * 1000:.0f} ms")
+    return count
@@ -0,0 +1,85 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+from typing import Callable, Dict
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+"""
+Shared Read-Only Tables
+
+Precomputed arrays that every worker process needs (e.g. the Delta-T and
+leap-second tables) are written once to a directory of .npy files and
+memory-mapped by every process, like the longitude series. The mapped pages
+live in the OS page cache, so N workers on a host hold one copy instead of
+N private ones, and a worker that starts after the tables exist skips
+building them.
+
+Each set of tables is stored under its name and a hash of the settings it
+was built with, so tables built with other settings are never mapped. The
+first process to need a missing set builds and writes it (to a temporary
+directory that is then renamed, so concurrent builders never expose a
+partial set), or a preload step writes it before the workers start (see
+tools/build_tables.py).
+"""
+
+# Metadata file of a table set: the settings version and the array names
+META_FILE = "tables.json"
+
+def table_path(directory: str, name: str, version: str) -> str:
+    """Directory of the table set name built with version."""
+    return os.path.join(directory, f"{name}-{hashlib.sha256(version.encode()).hexdigest()[:12]}")
+
+def write_tables(path: str, version: str, arrays: Dict[str, np.ndarray]) -> bool:
+    """
+    Write a table set unless it exists.
+
+    Returns:
+        bool: Whether the set exists now (written here or by another process)
+    """
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(temporary, exist_ok=True)
+        for array_name, array in arrays.items():
+            np.save(os.path.join(temporary, f"{array_name}.npy"), np.ascontiguousarray(array))
+        with open(os.path.join(temporary, META_FILE), "w") as f:
+            json.dump({"version": version, "arrays": list(arrays)}, f)
+        os.rename(temporary, path)
+    except OSError as e:
+        shutil.rmtree(temporary, ignore_errors=True)
+        if not os.path.isdir(path):
+            logger.warning(f"Could not write shared tables {path}: {str(e)}")
+            return False
+    return True
+
+def shared_tables(directory: str, name: str, version: str, build: Callable[[], Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    """
+    Memory-mapped arrays of a table set, built and written first if missing.
+
+    Args:
+        directory (str): Directory holding the table sets
+        name (str): Name of the table set
+        version (str): Settings the arrays depend on
+        build: Returns the arrays by name
+
+    Returns:
+        dict: Array name -> read-only array; private arrays from build() if
+            the set can neither be mapped nor written
+    """
+    path = table_path(directory, name, version)
+    if not os.path.isdir(path):
+        arrays = build()
+        if not write_tables(path, version, arrays):
+            return arrays
+    try:
+        with open(os.path.join(path, META_FILE)) as f:
+            meta = json.load(f)
+        if meta["version"] != version:
+            raise ValueError(f"built with {meta['version']}")
+        return {array_name: np.load(os.path.join(path, f"{array_name}.npy"), mmap_mode="r") for array_name in meta["arrays"]}
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Could not map shared tables {path}: {str(e)}")
+        return build()
@@ -0,0 +1,114 @@
+import copy
+from datetime import tzinfo
+from io import BytesIO
+import logging
+import threading
+from functools import lru_cache
+from typing import Optional
+import pytz
+from config import TIMEZONE_IN_MEMORY
+from utils.astronomy import location_cell
+
+"""
+Timezone Resolution
+
+Maps coordinates to IANA timezones through timezonefinder's polygon index.
+The index is imported and opened only on first use (or through
+warm_up_timezones), so it adds nothing to startup time, and results are
+cached per location cell so repeat lookups are a dictionary hit. The index
+files are read through the OS page cache, which all worker processes share,
+unless TIMEZONE_IN_MEMORY loads a private copy (~55 MB) into each process
+for faster uncached lookups. File-backed lookups take turns on the shared
+file handles; in-memory lookups run in parallel, each thread reading the
+one copy through its own views.
+"""
+
+logger = logging.getLogger(__name__)
+
+# Timezone results are cached per cell of this size (degrees). A 0.01° cell
+# keeps the observer within ~800 m of the cell centre, so only locations that
+# close to a timezone border can resolve to the neighbouring zone.
+TIMEZONE_CELL_DEG = 0.01
+
+_finder = None
+_finder_lock = threading.Lock()
+
+# The file-backed index reads through seekable file handles, so its lookups
+# take turns
+_lookup_lock = threading.Lock()
+
+# Per-thread views of the in-memory index (see _thread_finder)
+_thread_finders = threading.local()
+
+def _get_finder():
+    """Load the timezone polygon index on first use."""
+    global _finder
+    if _finder is None:
+        with _finder_lock:
+            if _finder is None:
+                from timezonefinder import TimezoneFinder
+                logger.info("Loading timezone polygon index")
+                _finder = TimezoneFinder(in_memory=TIMEZONE_IN_MEMORY)
+    return _finder
+
+def _thread_finder():
+    """
+    The in-memory index as seen by the calling thread.
+
+    The index is a set of BytesIO buffers whose read position is shared, so
+    each thread gets a shallow copy with its own BytesIO over the same bytes
+    (getvalue() does not copy them) and needs no lock.
+    """
+    finder = getattr(_thread_finders, "finder", None)
+    if finder is None:
+        shared = _get_finder()
+        finder = copy.copy(shared)
+        for name in shared.binary_data_attributes:
+            setattr(finder, name, BytesIO(getattr(shared, name).getvalue()))
+        _thread_finders.finder = finder
+    return finder
+
+def warm_up_timezones() -> None:
+    """Load the timezone index ahead of the first request."""
+    _get_finder()
+
+@lru_cache(maxsize=100000)
+def _timezone_for_cell(cell_lat: float, cell_lon: float) -> str:
+    name: Optional[str]
+    if TIMEZONE_IN_MEMORY:
+        name = _thread_finder().timezone_at(lat=cell_lat, lng=cell_lon)
+    else:
+        finder = _get_finder()
+        with _lookup_lock:
+            name = finder.timezone_at(lat=cell_lat, lng=cell_lon)
+    if name is None:
+        # Outside every polygon: fall back to the nautical zone for the longitude
+        offset = round(cell_lon / 15)
+        name = "Etc/GMT" if offset == 0 else f"Etc/GMT{-offset:+d}"
+    return name
+
+def get_timezone_name(lat: float, lon: float) -> str:
+    """
+    Resolve the IANA timezone name for a location.
+
+    Args:
+        lat: latitude in degrees
+        lon: longitude in degrees
+
+    Returns:
+        str: IANA timezone name, e.g. "Asia/Kolkata"
+    """
+    return _timezone_for_cell(*location_cell(lat, lon, TIMEZONE_CELL_DEG))
+
+def get_timezone(lat: float, lon: float) -> tzinfo:
+    """
+    Resolve the timezone for a location.
+
+    Args:
+        lat: latitude in degrees
+        lon: longitude in degrees
+
+    Returns:
+        tzinfo: pytz timezone for the location
+    """
+    return pytz.timezone(get_timezone_name(lat, lon))